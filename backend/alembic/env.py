@@ -36,6 +36,25 @@ config.set_main_option(
 )
 
 
+# Индексы по выражениям с COLLATE: autogenerate не умеет сравнивать
+# их с отражёнными из базы и каждый раз предлагает пересоздать.
+EXPRESSION_INDEXES = (
+    "ix_contacts_org_lower_name",
+    "ix_contacts_org_lower_email",
+)
+
+
+def include_object(object, name, type_, reflected, compare_to):
+    """
+    Trigram-индексы создаются миграцией, только если в базе есть
+    pg_trgm, и не описаны в моделях: autogenerate их не сравнивает.
+    Так же пропускаются EXPRESSION_INDEXES.
+    """
+    if type_ != "index":
+        return True
+    return not (name.endswith("_trgm") or name in EXPRESSION_INDEXES)
+
+
 def run_migrations_offline() -> None:
     """Run migrations in 'offline' mode.
 
@@ -54,6 +73,7 @@ def run_migrations_offline() -> None:
         target_metadata=target_metadata,
         literal_binds=True,
         dialect_opts={"paramstyle": "named"},
+        include_object=include_object,
     )
 
     with context.begin_transaction():
@@ -75,7 +95,9 @@ def run_migrations_online() -> None:
 
     with connectable.connect() as connection:
         context.configure(
-            connection=connection, target_metadata=target_metadata
+            connection=connection,
+            target_metadata=target_metadata,
+            include_object=include_object,
         )
 
         with context.begin_transaction():
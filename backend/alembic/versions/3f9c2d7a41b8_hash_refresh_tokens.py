@@ -0,0 +1,63 @@
+"""hash refresh tokens
+
+Revision ID: 3f9c2d7a41b8
+Revises: 60cbf091fbee
+Create Date: 2026-10-18 10:02:14.512301
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '3f9c2d7a41b8'
+down_revision: Union[str, Sequence[str], None] = '60cbf091fbee'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column(
+        'refresh_tokens',
+        sa.Column('token_hash', sa.String(length=64), nullable=True)
+    )
+    op.execute(
+        "UPDATE refresh_tokens "
+        "SET token_hash = encode(sha256(convert_to(token, 'UTF8')), 'hex')"
+    )
+    op.alter_column('refresh_tokens', 'token_hash', nullable=False)
+    op.create_index(
+        op.f('ix_refresh_tokens_token_hash'),
+        'refresh_tokens',
+        ['token_hash'],
+        unique=True
+    )
+    op.drop_constraint(
+        'refresh_tokens_token_key',
+        'refresh_tokens',
+        type_='unique'
+    )
+    op.drop_column('refresh_tokens', 'token')
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    # Исходные токены по хешу не восстановить — выданные токены удаляются.
+    op.execute("DELETE FROM refresh_tokens")
+    op.add_column(
+        'refresh_tokens',
+        sa.Column('token', sa.String(), nullable=False)
+    )
+    op.create_unique_constraint(
+        'refresh_tokens_token_key',
+        'refresh_tokens',
+        ['token']
+    )
+    op.drop_index(
+        op.f('ix_refresh_tokens_token_hash'),
+        table_name='refresh_tokens'
+    )
+    op.drop_column('refresh_tokens', 'token_hash')
@@ -0,0 +1,54 @@
+"""refresh tokens reaper indexes
+
+Revision ID: 7b1e4c9d2f60
+Revises: 3f9c2d7a41b8
+Create Date: 2026-10-18 11:20:37.104882
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '7b1e4c9d2f60'
+down_revision: Union[str, Sequence[str], None] = '3f9c2d7a41b8'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    with op.get_context().autocommit_block():
+        op.create_index(
+            'ix_refresh_tokens_expires_at',
+            'refresh_tokens',
+            ['expires_at'],
+            unique=False,
+            postgresql_where=sa.text('revoked = false'),
+            postgresql_concurrently=True,
+        )
+        op.create_index(
+            'ix_refresh_tokens_revoked',
+            'refresh_tokens',
+            ['id'],
+            unique=False,
+            postgresql_where=sa.text('revoked = true'),
+            postgresql_concurrently=True,
+        )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    with op.get_context().autocommit_block():
+        op.drop_index(
+            'ix_refresh_tokens_revoked',
+            table_name='refresh_tokens',
+            postgresql_concurrently=True,
+        )
+        op.drop_index(
+            'ix_refresh_tokens_expires_at',
+            table_name='refresh_tokens',
+            postgresql_concurrently=True,
+        )
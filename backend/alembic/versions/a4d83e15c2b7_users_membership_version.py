@@ -0,0 +1,36 @@
+"""users membership version
+
+Revision ID: a4d83e15c2b7
+Revises: 7b1e4c9d2f60
+Create Date: 2026-10-18 12:41:09.337215
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'a4d83e15c2b7'
+down_revision: Union[str, Sequence[str], None] = '7b1e4c9d2f60'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column(
+        'users',
+        sa.Column(
+            'membership_version',
+            sa.Integer(),
+            server_default='0',
+            nullable=False
+        )
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_column('users', 'membership_version')
@@ -0,0 +1,99 @@
+"""contacts phone normalized
+
+Revision ID: a9c4e2f7d031
+Revises: f7a3d2c8b516
+Create Date: 2026-10-18 19:02:44.581307
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'a9c4e2f7d031'
+down_revision: Union[str, Sequence[str], None] = 'f7a3d2c8b516'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+BACKFILL_BATCH_SIZE = 10000
+
+# SQL-версия models.constants.normalize_phone на момент миграции.
+# «доб» записано escape-последовательностями в обоих регистрах: флаг
+# 'i' не учитывает регистр кириллицы в локали C.
+EXTENSION = r'(ext|[\u0434\u0414][\u043e\u041e][\u0431\u0411]|[x;,#]).*$'
+NORMALIZED_PHONE = f"""
+    regexp_replace(
+        regexp_replace(
+            regexp_replace(phone, '{EXTENSION}', '', 'i'),
+            '[^0-9]', '', 'g'
+        ),
+        '^00', ''
+    )
+"""
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column(
+        'contacts',
+        sa.Column('phone_normalized', sa.String(length=15), nullable=True)
+    )
+    with op.get_context().autocommit_block():
+        # Заполняем пачками по id с фиксацией после каждой, чтобы не
+        # держать блокировки строк всей таблицы до конца миграции.
+        batch = BACKFILL_BATCH_SIZE
+        op.execute(f"""
+        DO $$
+        DECLARE
+            last_id integer := 0;
+            max_id integer;
+        BEGIN
+            SELECT max(id) INTO max_id FROM contacts;
+            WHILE last_id < coalesce(max_id, 0) LOOP
+                UPDATE contacts c
+                SET phone_normalized = CASE
+                    WHEN length(n.digits) BETWEEN 1 AND 15 THEN n.digits
+                END
+                FROM (
+                    SELECT id, {NORMALIZED_PHONE} AS digits
+                    FROM contacts
+                    WHERE id > last_id AND id <= last_id + {batch}
+                ) n
+                WHERE c.id = n.id;
+                last_id := last_id + {batch};
+                COMMIT;
+            END LOOP;
+        END $$
+        """)
+        op.create_index(
+            'ix_contacts_organization_phone_normalized',
+            'contacts',
+            ['organization_id', 'phone_normalized'],
+            unique=False,
+            postgresql_concurrently=True,
+        )
+        op.drop_index(
+            'ix_contacts_organization_phone',
+            table_name='contacts',
+            postgresql_concurrently=True,
+        )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    with op.get_context().autocommit_block():
+        op.create_index(
+            'ix_contacts_organization_phone',
+            'contacts',
+            ['organization_id', 'phone'],
+            unique=False,
+            postgresql_concurrently=True,
+        )
+        op.drop_index(
+            'ix_contacts_organization_phone_normalized',
+            table_name='contacts',
+            postgresql_concurrently=True,
+        )
+    op.drop_column('contacts', 'phone_normalized')
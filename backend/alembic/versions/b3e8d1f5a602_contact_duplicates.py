@@ -0,0 +1,93 @@
+"""contact duplicates
+
+Revision ID: b3e8d1f5a602
+Revises: a9c4e2f7d031
+Create Date: 2026-10-18 20:14:09.337162
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'b3e8d1f5a602'
+down_revision: Union[str, Sequence[str], None] = 'a9c4e2f7d031'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table(
+        'contact_duplicates',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('organization_id', sa.Integer(), nullable=False),
+        sa.Column('contact_id', sa.Integer(), nullable=False),
+        sa.Column('duplicate_id', sa.Integer(), nullable=False),
+        sa.Column('score', sa.Float(), nullable=False),
+        sa.Column(
+            'reasons',
+            postgresql.ARRAY(sa.String(length=16)),
+            nullable=False
+        ),
+        sa.Column(
+            'status',
+            sa.Enum('NEW', 'CONFIRMED', 'DISMISSED', name='duplicatestatus'),
+            nullable=False
+        ),
+        sa.Column('created_at', sa.DateTime(), nullable=False),
+        sa.CheckConstraint(
+            'contact_id < duplicate_id',
+            name='ck_contact_duplicates_order'
+        ),
+        sa.ForeignKeyConstraint(
+            ['contact_id'],
+            ['contacts.id'],
+            ondelete='CASCADE'
+        ),
+        sa.ForeignKeyConstraint(
+            ['duplicate_id'],
+            ['contacts.id'],
+            ondelete='CASCADE'
+        ),
+        sa.ForeignKeyConstraint(
+            ['organization_id'],
+            ['organizations.id'],
+            ondelete='CASCADE'
+        ),
+        sa.PrimaryKeyConstraint('id'),
+        sa.UniqueConstraint(
+            'contact_id',
+            'duplicate_id',
+            name='uq_contact_duplicates_pair'
+        )
+    )
+    op.create_index(
+        'ix_contact_duplicates_org_status_score',
+        'contact_duplicates',
+        ['organization_id', 'status', 'score', 'id'],
+        unique=False
+    )
+    op.create_index(
+        'ix_contact_duplicates_duplicate_id',
+        'contact_duplicates',
+        ['duplicate_id'],
+        unique=False
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index(
+        'ix_contact_duplicates_duplicate_id',
+        table_name='contact_duplicates'
+    )
+    op.drop_index(
+        'ix_contact_duplicates_org_status_score',
+        table_name='contact_duplicates'
+    )
+    op.drop_table('contact_duplicates')
+    op.execute('DROP TYPE duplicatestatus')
@@ -0,0 +1,49 @@
+"""contacts suggest prefix indexes
+
+Revision ID: c4f9a1e7b238
+Revises: b3e8d1f5a602
+Create Date: 2026-10-18 21:40:26.118904
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'c4f9a1e7b238'
+down_revision: Union[str, Sequence[str], None] = 'b3e8d1f5a602'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+PREFIX_COLUMNS = ('name', 'email')
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    with op.get_context().autocommit_block():
+        for column in PREFIX_COLUMNS:
+            op.create_index(
+                f'ix_contacts_org_lower_{column}',
+                'contacts',
+                [
+                    'organization_id',
+                    sa.text(f'lower({column}) COLLATE "C"'),
+                    'id'
+                ],
+                unique=False,
+                postgresql_concurrently=True,
+            )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    with op.get_context().autocommit_block():
+        for column in PREFIX_COLUMNS:
+            op.drop_index(
+                f'ix_contacts_org_lower_{column}',
+                table_name='contacts',
+                postgresql_concurrently=True,
+                if_exists=True,
+            )
@@ -0,0 +1,100 @@
+"""tenant list indexes
+
+Revision ID: c81f5a3e6d92
+Revises: a4d83e15c2b7
+Create Date: 2026-10-18 14:05:12.518340
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'c81f5a3e6d92'
+down_revision: Union[str, Sequence[str], None] = 'a4d83e15c2b7'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    with op.get_context().autocommit_block():
+        op.create_index(
+            'ix_deals_org_created_at',
+            'deals',
+            ['organization_id', 'created_at', 'id'],
+            unique=False,
+            postgresql_concurrently=True,
+        )
+        op.create_index(
+            'ix_deals_org_owner_created_at',
+            'deals',
+            ['organization_id', 'owner_id', 'created_at', 'id'],
+            unique=False,
+            postgresql_concurrently=True,
+        )
+        op.create_index(
+            'ix_deals_org_status_stage',
+            'deals',
+            ['organization_id', 'status', 'stage'],
+            unique=False,
+            postgresql_include=['amount'],
+            postgresql_concurrently=True,
+        )
+        op.create_index(
+            'ix_tasks_deal_due_date',
+            'tasks',
+            ['deal_id', 'due_date', 'id'],
+            unique=False,
+            postgresql_concurrently=True,
+        )
+        op.create_index(
+            'ix_activities_deal_created_at',
+            'activities',
+            ['deal_id', 'created_at', 'id'],
+            unique=False,
+            postgresql_concurrently=True,
+        )
+        op.drop_index(
+            'ix_tasks_deal_id',
+            table_name='tasks',
+            postgresql_concurrently=True,
+        )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    with op.get_context().autocommit_block():
+        op.create_index(
+            'ix_tasks_deal_id',
+            'tasks',
+            ['deal_id'],
+            unique=False,
+            postgresql_concurrently=True,
+        )
+        op.drop_index(
+            'ix_activities_deal_created_at',
+            table_name='activities',
+            postgresql_concurrently=True,
+        )
+        op.drop_index(
+            'ix_tasks_deal_due_date',
+            table_name='tasks',
+            postgresql_concurrently=True,
+        )
+        op.drop_index(
+            'ix_deals_org_status_stage',
+            table_name='deals',
+            postgresql_concurrently=True,
+        )
+        op.drop_index(
+            'ix_deals_org_owner_created_at',
+            table_name='deals',
+            postgresql_concurrently=True,
+        )
+        op.drop_index(
+            'ix_deals_org_created_at',
+            table_name='deals',
+            postgresql_concurrently=True,
+        )
@@ -0,0 +1,51 @@
+"""contacts keyset indexes
+
+Revision ID: d2a6b9f4e013
+Revises: c81f5a3e6d92
+Create Date: 2026-10-18 15:32:48.207614
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'd2a6b9f4e013'
+down_revision: Union[str, Sequence[str], None] = 'c81f5a3e6d92'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    with op.get_context().autocommit_block():
+        op.create_index(
+            'ix_contacts_org_owner_name',
+            'contacts',
+            ['organization_id', 'owner_id', 'name', 'id'],
+            unique=False,
+            postgresql_concurrently=True,
+        )
+        op.create_index(
+            'ix_contacts_org_owner_created_at',
+            'contacts',
+            ['organization_id', 'owner_id', 'created_at', 'id'],
+            unique=False,
+            postgresql_concurrently=True,
+        )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    with op.get_context().autocommit_block():
+        op.drop_index(
+            'ix_contacts_org_owner_created_at',
+            table_name='contacts',
+            postgresql_concurrently=True,
+        )
+        op.drop_index(
+            'ix_contacts_org_owner_name',
+            table_name='contacts',
+            postgresql_concurrently=True,
+        )
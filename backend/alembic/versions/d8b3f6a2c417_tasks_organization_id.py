@@ -0,0 +1,95 @@
+"""tasks organization id
+
+Revision ID: d8b3f6a2c417
+Revises: c4f9a1e7b238
+Create Date: 2026-10-18 21:14:06.302518
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'd8b3f6a2c417'
+down_revision: Union[str, Sequence[str], None] = 'c4f9a1e7b238'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+BACKFILL_BATCH_SIZE = 10000
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column(
+        'tasks',
+        sa.Column('organization_id', sa.Integer(), nullable=True)
+    )
+    op.create_foreign_key(
+        op.f('tasks_organization_id_fkey'),
+        'tasks',
+        'organizations',
+        ['organization_id'],
+        ['id'],
+        ondelete='CASCADE'
+    )
+    with op.get_context().autocommit_block():
+        # Заполняем пачками по id с фиксацией после каждой, чтобы не
+        # держать блокировки строк всей таблицы до конца миграции.
+        # Последний UPDATE дописывает задачи, созданные во время обхода.
+        batch = BACKFILL_BATCH_SIZE
+        op.execute(f"""
+        DO $$
+        DECLARE
+            last_id integer := 0;
+            max_id integer;
+        BEGIN
+            SELECT max(id) INTO max_id FROM tasks;
+            WHILE last_id < coalesce(max_id, 0) LOOP
+                UPDATE tasks t SET organization_id = d.organization_id
+                FROM deals d
+                WHERE d.id = t.deal_id
+                    AND t.id > last_id AND t.id <= last_id + {batch};
+                last_id := last_id + {batch};
+                COMMIT;
+            END LOOP;
+            UPDATE tasks t SET organization_id = d.organization_id
+            FROM deals d
+            WHERE d.id = t.deal_id AND t.organization_id IS NULL;
+        END $$
+        """)
+        op.create_index(
+            'ix_tasks_org_due_date',
+            'tasks',
+            ['organization_id', 'due_date', 'id'],
+            unique=False,
+            postgresql_concurrently=True,
+        )
+    # SET NOT NULL опирается на проверенный CHECK и не перечитывает
+    # таблицу под эксклюзивной блокировкой.
+    op.execute(
+        'ALTER TABLE tasks ADD CONSTRAINT tasks_organization_id_not_null '
+        'CHECK (organization_id IS NOT NULL) NOT VALID'
+    )
+    op.execute(
+        'ALTER TABLE tasks VALIDATE CONSTRAINT tasks_organization_id_not_null'
+    )
+    op.alter_column('tasks', 'organization_id', nullable=False)
+    op.drop_constraint('tasks_organization_id_not_null', 'tasks')
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    with op.get_context().autocommit_block():
+        op.drop_index(
+            'ix_tasks_org_due_date',
+            table_name='tasks',
+            postgresql_concurrently=True,
+        )
+    op.drop_constraint(
+        op.f('tasks_organization_id_fkey'),
+        'tasks',
+        type_='foreignkey'
+    )
+    op.drop_column('tasks', 'organization_id')
@@ -0,0 +1,54 @@
+"""contacts trigram search
+
+Revision ID: e5f1c7a9b324
+Revises: d2a6b9f4e013
+Create Date: 2026-10-18 17:05:12.418530
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'e5f1c7a9b324'
+down_revision: Union[str, Sequence[str], None] = 'd2a6b9f4e013'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+TRIGRAM_COLUMNS = ('name', 'email', 'phone')
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    if not op.get_context().as_sql and not op.get_bind().execute(sa.text(
+        "SELECT EXISTS (SELECT 1 FROM pg_available_extensions "
+        "WHERE name = 'pg_trgm')"
+    )).scalar():
+        # Без pg_trgm поиск по контактам остаётся на ILIKE.
+        return
+    op.execute('CREATE EXTENSION IF NOT EXISTS pg_trgm')
+    with op.get_context().autocommit_block():
+        for column in TRIGRAM_COLUMNS:
+            op.create_index(
+                f'ix_contacts_{column}_trgm',
+                'contacts',
+                [column],
+                unique=False,
+                postgresql_using='gin',
+                postgresql_ops={column: 'gin_trgm_ops'},
+                postgresql_concurrently=True,
+            )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    with op.get_context().autocommit_block():
+        for column in TRIGRAM_COLUMNS:
+            op.drop_index(
+                f'ix_contacts_{column}_trgm',
+                table_name='contacts',
+                postgresql_concurrently=True,
+                if_exists=True,
+            )
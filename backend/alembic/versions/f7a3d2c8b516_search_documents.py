@@ -0,0 +1,187 @@
+"""search documents
+
+Revision ID: f7a3d2c8b516
+Revises: e5f1c7a9b324
+Create Date: 2026-10-18 18:21:37.904215
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'f7a3d2c8b516'
+down_revision: Union[str, Sequence[str], None] = 'e5f1c7a9b324'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# Сущность -> (таблица, SELECT документов из new_rows); копия
+# models.search.SEARCH_SOURCES на момент миграции.
+SEARCH_SOURCES = {
+    'contact': (
+        'contacts',
+        "SELECT r.organization_id, r.id, r.owner_id, NULL::integer, "
+        "r.name, concat_ws(' ', r.email, r.phone) FROM new_rows r"
+    ),
+    'deal': (
+        'deals',
+        "SELECT r.organization_id, r.id, r.owner_id, r.id, r.title, NULL "
+        "FROM new_rows r"
+    ),
+    'task': (
+        'tasks',
+        "SELECT d.organization_id, r.id, d.owner_id, r.deal_id, r.title, "
+        "r.description FROM new_rows r JOIN deals d ON d.id = r.deal_id"
+    ),
+    'comment': (
+        'activities',
+        "SELECT d.organization_id, r.id, d.owner_id, r.deal_id, "
+        "left(coalesce(r.payload->>'text', r.payload::text, ''), 200), "
+        "coalesce(r.payload->>'text', r.payload::text) "
+        "FROM new_rows r JOIN deals d ON d.id = r.deal_id "
+        "WHERE r.type = 'COMMENT'"
+    ),
+}
+OPERATIONS = (
+    ('INSERT', 'NEW TABLE AS new_rows'),
+    ('UPDATE', 'NEW TABLE AS new_rows'),
+    ('DELETE', 'OLD TABLE AS old_rows'),
+)
+BACKFILL_BATCH_SIZE = 10000
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table(
+        'search_documents',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('organization_id', sa.Integer(), nullable=False),
+        sa.Column('entity_type', sa.String(length=16), nullable=False),
+        sa.Column('entity_id', sa.Integer(), nullable=False),
+        sa.Column('owner_id', sa.Integer(), nullable=True),
+        sa.Column('deal_id', sa.Integer(), nullable=True),
+        sa.Column('title', sa.Text(), nullable=False),
+        sa.Column('body', sa.Text(), nullable=True),
+        sa.Column(
+            'document',
+            postgresql.TSVECTOR(),
+            sa.Computed(
+                "setweight(to_tsvector('simple', title), 'A') || "
+                "setweight(to_tsvector('simple', coalesce(body, '')), 'B') "
+                "|| array_to_tsvector(ARRAY['#' || organization_id::text])",
+                persisted=True
+            ),
+            nullable=True
+        ),
+        sa.Column('updated_at', sa.DateTime(), nullable=False),
+        sa.ForeignKeyConstraint(
+            ['organization_id'],
+            ['organizations.id'],
+            ondelete='CASCADE'
+        ),
+        sa.PrimaryKeyConstraint('id'),
+        sa.UniqueConstraint(
+            'entity_type',
+            'entity_id',
+            name='uq_search_documents_entity'
+        )
+    )
+    for entity, (table, source) in SEARCH_SOURCES.items():
+        function = f'search_documents_sync_{table}'
+        op.execute(f"""
+        CREATE OR REPLACE FUNCTION {function}() RETURNS trigger
+        LANGUAGE plpgsql AS $$
+        BEGIN
+            IF TG_OP = 'DELETE' THEN
+                DELETE FROM search_documents d USING old_rows o
+                WHERE d.entity_type = '{entity}' AND d.entity_id = o.id;
+            ELSE
+                INSERT INTO search_documents (organization_id, entity_id,
+                    owner_id, deal_id, title, body, entity_type, updated_at)
+                SELECT s.*, '{entity}', now() FROM ({source}) s
+                ON CONFLICT (entity_type, entity_id) DO UPDATE SET
+                    owner_id = EXCLUDED.owner_id,
+                    title = EXCLUDED.title,
+                    body = EXCLUDED.body,
+                    updated_at = EXCLUDED.updated_at
+                WHERE (search_documents.owner_id, search_documents.title,
+                       search_documents.body)
+                    IS DISTINCT FROM
+                    (EXCLUDED.owner_id, EXCLUDED.title, EXCLUDED.body);
+            END IF;
+            RETURN NULL;
+        END $$
+        """)
+        for operation, transition in OPERATIONS:
+            op.execute(
+                f"CREATE TRIGGER {function}_{operation.lower()} "
+                f"AFTER {operation} ON {table} REFERENCING {transition} "
+                f"FOR EACH STATEMENT EXECUTE FUNCTION {function}()"
+            )
+    with op.get_context().autocommit_block():
+        # Существующие строки индексируются тем же SELECT, что и в
+        # триггере: new_rows подменяется пачкой строк таблицы по id, и
+        # каждая пачка фиксируется отдельно, чтобы не держать одну
+        # транзакцию на всю таблицу. Триггеры к этому моменту уже
+        # зафиксированы, поэтому строка, записанная во время заполнения,
+        # не пропадёт из индекса, а документы, которые триггер успел
+        # добавить сам, не перезаписываются.
+        batch = BACKFILL_BATCH_SIZE
+        for entity, (table, source) in SEARCH_SOURCES.items():
+            rows = (
+                f"(SELECT * FROM {table} "
+                f"WHERE id > last_id AND id <= last_id + {batch})"
+            )
+            op.execute(f"""
+            DO $$
+            DECLARE
+                last_id integer := 0;
+                max_id integer;
+            BEGIN
+                SELECT max(id) INTO max_id FROM {table};
+                WHILE last_id < coalesce(max_id, 0) LOOP
+                    INSERT INTO search_documents (organization_id,
+                        entity_id, owner_id, deal_id, title, body,
+                        entity_type, updated_at)
+                    SELECT s.*, '{entity}', now()
+                    FROM ({source.replace('new_rows', rows)}) s
+                    ON CONFLICT (entity_type, entity_id) DO NOTHING;
+                    last_id := last_id + {batch};
+                    COMMIT;
+                END LOOP;
+            END $$
+            """)
+        # Индекс строится по уже заполненной таблице. Лексема
+        # "#<organization_id>" в document ограничивает поиск
+        # организацией внутри самого GIN-индекса: её список документов
+        # пересекается со списками слов запроса, и совпадения других
+        # организаций не читаются.
+        op.create_index(
+            'ix_search_documents_document',
+            'search_documents',
+            ['document'],
+            unique=False,
+            postgresql_using='gin',
+            postgresql_concurrently=True,
+        )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    for table, _ in SEARCH_SOURCES.values():
+        function = f'search_documents_sync_{table}'
+        for operation, _ in OPERATIONS:
+            op.execute(
+                f"DROP TRIGGER IF EXISTS {function}_{operation.lower()} "
+                f"ON {table}"
+            )
+        op.execute(f'DROP FUNCTION IF EXISTS {function}()')
+    op.drop_index(
+        'ix_search_documents_document',
+        table_name='search_documents',
+        postgresql_using='gin'
+    )
+    op.drop_table('search_documents')
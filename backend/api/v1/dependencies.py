@@ -1,50 +1,166 @@
-from typing import AsyncGenerator, Annotated
+import math
+import time
+from typing import AsyncGenerator, Annotated, Callable
 
-from fastapi import Depends, Header, HTTPException, status
+from fastapi import Depends, Header, HTTPException, Request, Response, status
+from fastapi.routing import APIRoute
+from fastapi.responses import StreamingResponse
 from fastapi.security import OAuth2PasswordBearer
 from jose import JWTError, jwt
 from sqlalchemy.ext.asyncio import AsyncSession
-from repositories.database import session_factory
+from repositories.database import replica_session_factory, session_factory
 
+from repositories.cache import (
+    auth_cache,
+    restore,
+    snapshot
+)
 from repositories.config import settings
 from repositories.user_rep import UserRepository
 from repositories.member_rep import OrganizationMemberRepository
 from models import UserModel, OrganizationMemberModel
-from models.constants import Permission
+from models.constants import MemberRole, Permission
 
 
-async def get_db_session() -> AsyncGenerator[AsyncSession, None]:
+READ_ONLY_METHODS = ("GET", "HEAD", "OPTIONS")
+# Cookie с моментом (unix time), до которого клиент читает из primary.
+PRIMARY_UNTIL_COOKIE = "crm_primary_until"
+
+
+def reads_from_primary(request: Request) -> bool:
+    """
+    Клиент недавно выполнял запись и должен читать из primary.
+
+    Значение из cookie принимается, только если оно не дальше
+    REPLICA_STICKINESS_SECONDS от текущего момента: поддельная cookie
+    закрепляет за primary лишь самого клиента и ненадолго.
+    """
+    try:
+        primary_until = float(request.cookies.get(PRIMARY_UNTIL_COOKIE, ""))
+    except ValueError:
+        return False
+    now = time.time()
+    return now < primary_until <= now + settings.REPLICA_STICKINESS_SECONDS
+
+
+def mark_primary_sticky(response: Response) -> None:
+    """Читать из primary, пока реплика может отставать от записи."""
+    if settings.REPLICA_STICKINESS_SECONDS <= 0:
+        return
+    response.set_cookie(
+        PRIMARY_UNTIL_COOKIE,
+        f"{time.time() + settings.REPLICA_STICKINESS_SECONDS:.3f}",
+        max_age=math.ceil(settings.REPLICA_STICKINESS_SECONDS),
+        httponly=True,
+        samesite="lax",
+    )
+
+
+async def get_db_session(
+    request: Request,
+) -> AsyncGenerator[AsyncSession, None]:
+    """
+    Сессия БД для запроса.
+
+    Читающие запросы получают сессию реплики, пишущие — primary.
+    После записи UnitOfWorkRoute выставляет клиенту cookie
+    PRIMARY_UNTIL_COOKIE, и его чтения REPLICA_STICKINESS_SECONDS идут
+    в primary, чтобы сразу видеть свои изменения. Состояние хранит
+    клиент, поэтому закрепление работает при любом числе процессов
+    и экземпляров приложения.
+    """
+    use_replica = (
+        request.method in READ_ONLY_METHODS
+        and not reads_from_primary(request)
+    )
+    factory = replica_session_factory if use_replica else session_factory
+    async with factory() as session:
+        request.state.db_session = session
+        yield session
+
+
+async def get_primary_db_session() -> AsyncGenerator[AsyncSession, None]:
+    """
+    Сессия primary для чтений, результат которых кэшируется в памяти
+    процесса (auth_cache, count_cache, индексы подсказок, номера
+    телефонов): данные отстающей реплики, попав в кэш после сброса,
+    жили бы там весь TTL. Соединение берётся из пула только при первом
+    запросе к БД, поэтому попадание в кэш primary не нагружает.
+    """
     async with session_factory() as session:
         yield session
 
 
+class UnitOfWorkRoute(APIRoute):
+    """
+    Одна транзакция на запрос.
+
+    Репозитории только делают flush, а транзакция сессии из get_db_session
+    фиксируется здесь — после успешного ответа эндпоинта, но до отправки
+    ответа клиенту. При исключении или ответе с ошибкой сессия
+    закрывается без commit, и все изменения запроса откатываются.
+
+    Потоковые ответы читают данные из открытой транзакции уже после
+    возврата из эндпоинта, поэтому для них commit не выполняется:
+    такие эндпоинты только читают, а сессию закрывает get_db_session.
+    """
+
+    def get_route_handler(self) -> Callable:
+        handler = super().get_route_handler()
+
+        async def unit_of_work_handler(request: Request) -> Response:
+            response = await handler(request)
+            session = getattr(request.state, "db_session", None)
+            if (
+                session is not None
+                and not isinstance(response, StreamingResponse)
+                and response.status_code < 400
+                and session.in_transaction()
+            ):
+                await session.commit()
+                if request.method not in READ_ONLY_METHODS:
+                    mark_primary_sticky(response)
+            return response
+
+        return unit_of_work_handler
+
+
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="/api/v1/auth/login")
 
 
-async def get_current_user(
+async def get_token_payload(
     token: Annotated[str, Depends(oauth2_scheme)],
-    db: AsyncSession = Depends(get_db_session),
-) -> UserModel:
+) -> dict:
     try:
         payload = jwt.decode(
             token,
             settings.SECRET_KEY,
             algorithms=[settings.ALGORITHM]
         )
-        user_id = payload.get("sub")
-        if user_id is None:
-            raise HTTPException(
-                status_code=status.HTTP_401_UNAUTHORIZED,
-                detail="Неверный токен",
-                headers={"WWW-Authenticate": "Bearer"},
-            )
     except JWTError:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Неверный токен",
             headers={"WWW-Authenticate": "Bearer"},
         )
+    if payload.get("sub") is None:
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Неверный токен",
+            headers={"WWW-Authenticate": "Bearer"},
+        )
+    return payload
+
 
+async def get_current_user(
+    payload: dict = Depends(get_token_payload),
+    db: AsyncSession = Depends(get_primary_db_session),
+) -> UserModel:
+    user_id = payload["sub"]
+    cache_key = (int(user_id), None)
+    cached = auth_cache.get(cache_key)
+    if cached is not None:
+        return restore(UserModel, cached)
     user_repo = UserRepository(db)
     user = await user_repo.get_by_id(int(user_id))
     if not user:
@@ -53,6 +169,7 @@ async def get_current_user(
             detail="Пользователь не найден",
             headers={"WWW-Authenticate": "Bearer"},
         )
+    auth_cache.set(cache_key, snapshot(user))
     return user
 
 
@@ -65,12 +182,63 @@ async def get_organization_id(x_organization_id: int = Header(None)) -> int:
     return x_organization_id
 
 
+def member_from_claims(
+    payload: dict,
+    user_id: int,
+    membership_version: int | None,
+    organization_id: int,
+) -> OrganizationMemberModel | None:
+    """
+    Членство из claims access-токена.
+
+    Возвращает None, если claims нет или версия членств в токене
+    отличается от membership_version — тогда членство читается из БД.
+    """
+    roles = payload.get("orgs")
+    if roles is None or payload.get("mv") != membership_version:
+        return None
+    role = roles.get(str(organization_id))
+    if role is None:
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Вы не являетесь участником этой организации."
+        )
+    return OrganizationMemberModel(
+        user_id=user_id,
+        organization_id=organization_id,
+        role=MemberRole(role),
+    )
+
+
 async def get_current_member(
+    payload: dict = Depends(get_token_payload),
     current_user: UserModel = Depends(get_current_user),
     organization_id: int = Depends(get_organization_id),
-    db: AsyncSession = Depends(get_db_session),
+    db: AsyncSession = Depends(get_primary_db_session),
 ) -> OrganizationMemberModel:
-    """Возвращает объект участника организации."""
+    """
+    Возвращает объект участника организации.
+
+    Версия членств для claims токена читается из primary на каждом
+    запросе (один столбец по первичному ключу), а не из auth_cache:
+    кэш других процессов не сбрасывается, и пониженный или удалённый
+    участник сохранял бы доступ по старому токену до истечения TTL.
+    Членство без claims берётся из auth_cache, поэтому в других
+    процессах его изменение видно не позже AUTH_CACHE_TTL_SECONDS.
+    """
+    if payload.get("orgs") is not None:
+        member = member_from_claims(
+            payload,
+            current_user.id,
+            await UserRepository(db).get_membership_version(current_user.id),
+            organization_id
+        )
+        if member is not None:
+            return member
+    cache_key = (current_user.id, organization_id)
+    cached = auth_cache.get(cache_key)
+    if cached is not None:
+        return restore(OrganizationMemberModel, cached)
     repo = OrganizationMemberRepository(db)
     member = await repo.get_member(current_user.id, organization_id)
     if not member:
@@ -78,6 +246,7 @@ async def get_current_member(
             status_code=status.HTTP_403_FORBIDDEN,
             detail="Вы не являетесь участником этой организации."
         )
+    auth_cache.set(cache_key, snapshot(member))
     return member
 
 
@@ -5,6 +5,8 @@ from .routes import (
     deals,
     organizations,
     contacts,
+    search,
+    system,
     tasks
 )
 
@@ -17,3 +19,5 @@ api_router.include_router(organizations.router)
 api_router.include_router(contacts.router)
 api_router.include_router(deals.router)
 api_router.include_router(tasks.router)
+api_router.include_router(search.router)
+api_router.include_router(system.router)
@@ -5,7 +5,8 @@ from api.v1.dependencies import (
     get_db_session,
     get_current_user,
     get_organization_id,
-    require_permission_dep
+    require_permission_dep,
+    UnitOfWorkRoute
 )
 from services.deals_service import DealService
 from repositories.deals_rep import DealsRepository
@@ -13,7 +14,11 @@ from models import OrganizationMemberModel
 from models.constants import Permission
 
 
-router = APIRouter(prefix="/analytics/deals", tags=["Аналитика"])
+router = APIRouter(
+    prefix="/analytics/deals",
+    tags=["Аналитика"],
+    route_class=UnitOfWorkRoute,
+)
 
 
 @router.get(
@@ -1,7 +1,10 @@
 from fastapi import APIRouter, Depends, HTTPException
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from api.v1.dependencies import get_db_session
+from api.v1.dependencies import (
+    get_db_session,
+    UnitOfWorkRoute
+)
 from services.auth_service import AuthService
 from api.v1.schemas.auth_schemas import (
     AuthRegisterSchema,
@@ -11,7 +14,11 @@ from api.v1.schemas.auth_schemas import (
 )
 
 
-router = APIRouter(prefix="/auth", tags=["Аутентификация"])
+router = APIRouter(
+    prefix="/auth",
+    tags=["Аутентификация"],
+    route_class=UnitOfWorkRoute,
+)
 
 
 @router.post(
@@ -34,7 +41,7 @@ async def register(
     except ValueError as e:
         raise HTTPException(status_code=400, detail=str(e))
 
-    access_token = auth_service.create_access_token(user.id)
+    access_token = await auth_service.issue_access_token(user.id)
     return {
         "access_token": access_token,
         "refresh_token": refresh_token,
@@ -78,7 +85,7 @@ async def login(
     user = await auth_service.authenticate_user(data.email, data.password)
     if not user:
         raise HTTPException(status_code=401, detail="Неверный email или пароль")
-    access = auth_service.create_access_token(user.id)
+    access = await auth_service.issue_access_token(user.id)
     refresh = await auth_service.create_refresh_token(user.id)
     return {
         "access_token": access,
@@ -1,20 +1,39 @@
-from fastapi import APIRouter, Depends, Query
+from typing import Literal
+
+from fastapi import APIRouter, Depends, Query, Request, Response
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from api.v1.dependencies import (
     get_db_session,
     get_current_user,
     get_organization_id,
-    require_permission_dep
+    get_primary_db_session,
+    require_permission_dep,
+    UnitOfWorkRoute
+)
+from api.v1.schemas.contacts_schemas import (
+    ContactsSchema,
+    ContactCreateSchema,
+    ContactDuplicateReviewSchema,
+    ContactDuplicateSchema,
+    ContactImportReportSchema,
+    ContactSuggestSchema,
 )
-from api.v1.schemas.contacts_schemas import ContactsSchema, ContactCreateSchema
+from services.contact_duplicates_service import ContactDuplicateService
+from services.contact_import import ContactImporter
 from services.contacts_service import ContactService
+from services.list_counts import CountMode
 from repositories.contacts_rep import ContactsRepository
+from repositories.duplicates_rep import ContactDuplicatesRepository
 from models import OrganizationMemberModel
-from models.constants import Permission
+from models.constants import DuplicateStatus, MemberRole, Permission
 
 
-router = APIRouter(prefix="/contacts", tags=["Контакты"])
+router = APIRouter(
+    prefix="/contacts",
+    tags=["Контакты"],
+    route_class=UnitOfWorkRoute,
+)
 
 
 @router.get(
@@ -23,28 +42,129 @@ router = APIRouter(prefix="/contacts", tags=["Контакты"])
     summary="Получение контактов",
 )
 async def get_user_contacts(
+    response: Response,
     current_user=Depends(get_current_user),
     organization_id: int = Depends(get_organization_id),
     member: OrganizationMemberModel = Depends(
         require_permission_dep(Permission.READ_CONTACT)
     ),
     db: AsyncSession = Depends(get_db_session),
+    primary_db: AsyncSession = Depends(get_primary_db_session),
     page: int = Query(1, ge=1),
     page_size: int = Query(20, ge=1, le=100),
     search: str | None = Query(None),
-    owner_id: int | None = Query(None)
+    owner_id: int | None = Query(None),
+    order_by: str = "name",
+    order: str = "asc",
+    cursor: str | None = None,
+    count: CountMode | None = None,
 ):
-    """Получить контакты организации, текущего пользователя."""
+    """
+    Получить контакты организации, текущего пользователя.
+
+    search ищет по имени, email и телефону и должен быть не короче
+    CONTACT_SEARCH_MIN_LENGTH символов; order_by=relevance сортирует
+    найденное по похожести на запрос. Для постраничного обхода без
+    OFFSET передайте в cursor значение заголовка X-Next-Cursor
+    предыдущего ответа. С count=exact или count=estimated в заголовке
+    X-Total-Count возвращается итог.
+    """
     contact_repo = ContactsRepository(db)
-    contact_service = ContactService(contact_repo)
-    return await contact_service.get_user_contacts(
+    contact_service = ContactService(
+        contact_repo,
+        primary_repo=ContactsRepository(primary_db)
+    )
+    contacts, next_cursor = await contact_service.get_user_contacts_page(
         organization_id=organization_id,
         user_id=current_user.id,
         member=member,
         page=page,
         page_size=page_size,
         search=search,
-        owner_id=owner_id
+        owner_id=owner_id,
+        order_by=order_by,
+        order=order,
+        cursor=cursor,
+    )
+    if next_cursor is not None:
+        response.headers["X-Next-Cursor"] = next_cursor
+    if count is not None:
+        response.headers["X-Total-Count"] = (
+            await contact_service.count_user_contacts(
+                organization_id=organization_id,
+                user_id=current_user.id,
+                member=member,
+                mode=count,
+                search=search,
+                owner_id=owner_id,
+            )
+        )
+    return contacts
+
+
+@router.get(
+    "/suggest",
+    response_model=list[ContactSuggestSchema],
+    summary="Подсказки контактов",
+)
+async def suggest_contacts(
+    q: str = Query(..., max_length=100),
+    limit: int = Query(10, ge=1, le=50),
+    current_user=Depends(get_current_user),
+    organization_id: int = Depends(get_organization_id),
+    member: OrganizationMemberModel = Depends(
+        require_permission_dep(Permission.READ_CONTACT)
+    ),
+    db: AsyncSession = Depends(get_db_session),
+    primary_db: AsyncSession = Depends(get_primary_db_session),
+):
+    """
+    Подсказать контакты для поля выбора по мере ввода.
+
+    Возвращает до limit контактов, имя, слово имени или email которых
+    начинается с q.
+    """
+    contact_repo = ContactsRepository(db)
+    contact_service = ContactService(
+        contact_repo,
+        primary_repo=ContactsRepository(primary_db)
+    )
+    return await contact_service.suggest_contacts(
+        organization_id=organization_id,
+        user_id=current_user.id,
+        member=member,
+        prefix=q,
+        limit=limit,
+    )
+
+
+@router.get(
+    "/lookup",
+    response_model=list[ContactsSchema],
+    summary="Поиск контактов по номеру телефона",
+)
+async def lookup_contacts_by_phone(
+    phone: str = Query(..., max_length=50),
+    current_user=Depends(get_current_user),
+    organization_id: int = Depends(get_organization_id),
+    member: OrganizationMemberModel = Depends(
+        require_permission_dep(Permission.READ_CONTACT)
+    ),
+    primary_db: AsyncSession = Depends(get_primary_db_session),
+):
+    """
+    Определить контакт по номеру входящего звонка.
+
+    phone принимается в любом формате записи: "+1 (555) 010-2000"
+    и "15550102000" находят один и тот же контакт.
+    """
+    contact_repo = ContactsRepository(primary_db)
+    contact_service = ContactService(contact_repo)
+    return await contact_service.lookup_phone(
+        organization_id=organization_id,
+        user_id=current_user.id,
+        member=member,
+        phone=phone,
     )
 
 
@@ -72,3 +192,107 @@ async def create_contact(
         current_user_id=current_user.id,
         organization_id=organization_id,
     )
+
+
+@router.post(
+    "/import",
+    response_model=ContactImportReportSchema,
+    summary="Импорт контактов",
+)
+async def import_contacts(
+    request: Request,
+    format: Literal["csv", "ndjson"] = "csv",
+    current_user=Depends(get_current_user),
+    organization_id: int = Depends(get_organization_id),
+    member: OrganizationMemberModel = Depends(
+        require_permission_dep(Permission.WRITE_CONTACT)
+    ),
+    db: AsyncSession = Depends(get_db_session),
+):
+    """
+    Импортировать контакты из тела запроса в формате CSV или NDJSON.
+
+    Контакт с уже существующим в организации email обновляется
+    (MEMBER обновляет только свои контакты), некорректные строки
+    пропускаются и перечисляются в отчёте.
+    """
+    importer = ContactImporter(ContactsRepository(db))
+    return await importer.run(
+        organization_id=organization_id,
+        owner_id=current_user.id,
+        data=await request.body(),
+        format=format,
+        own_only=member.role not in (
+            MemberRole.OWNER,
+            MemberRole.ADMIN,
+            MemberRole.MANAGER
+        ),
+    )
+
+
+@router.get(
+    "/duplicates",
+    response_model=list[ContactDuplicateSchema],
+    summary="Вероятные дубликаты контактов",
+)
+async def get_contact_duplicates(
+    response: Response,
+    status: DuplicateStatus = DuplicateStatus.NEW,
+    limit: int = Query(50, ge=1, le=200),
+    cursor: str | None = None,
+    current_user=Depends(get_current_user),
+    organization_id: int = Depends(get_organization_id),
+    member: OrganizationMemberModel = Depends(
+        require_permission_dep(Permission.READ_CONTACT)
+    ),
+    db: AsyncSession = Depends(get_db_session),
+):
+    """
+    Пары контактов, найденные задачей поиска дубликатов, по убыванию
+    оценки похожести.
+
+    Для следующей страницы передайте в cursor значение заголовка
+    X-Next-Cursor предыдущего ответа.
+    """
+    duplicate_service = ContactDuplicateService(
+        ContactDuplicatesRepository(db)
+    )
+    pairs, next_cursor = await duplicate_service.get_duplicates_page(
+        organization_id=organization_id,
+        user_id=current_user.id,
+        member=member,
+        status=status,
+        limit=limit,
+        cursor=cursor,
+    )
+    if next_cursor is not None:
+        response.headers["X-Next-Cursor"] = next_cursor
+    return pairs
+
+
+@router.patch(
+    "/duplicates/{duplicate_pair_id}",
+    response_model=ContactDuplicateSchema,
+    summary="Решение по паре дубликатов",
+)
+async def review_contact_duplicate(
+    duplicate_pair_id: int,
+    body: ContactDuplicateReviewSchema,
+    current_user=Depends(get_current_user),
+    organization_id: int = Depends(get_organization_id),
+    member: OrganizationMemberModel = Depends(
+        require_permission_dep(Permission.WRITE_CONTACT)
+    ),
+    db: AsyncSession = Depends(get_db_session),
+):
+    """Подтвердить или отклонить пару контактов-дубликатов."""
+    duplicate_service = ContactDuplicateService(
+        ContactDuplicatesRepository(db)
+    )
+    return await duplicate_service.review_duplicate(
+        duplicate_pair_id=duplicate_pair_id,
+        organization_id=organization_id,
+        user_id=current_user.id,
+        member=member,
+        status=body.status,
+    )
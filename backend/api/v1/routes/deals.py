@@ -1,13 +1,16 @@
-from typing import Optional
+from typing import Literal, Optional
 
-from fastapi import APIRouter, Depends, Query, HTTPException
+from fastapi import APIRouter, Depends, Query, HTTPException, Response
+from fastapi.responses import StreamingResponse
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from api.v1.dependencies import (
     get_db_session,
+    get_primary_db_session,
     get_current_user,
     get_organization_id,
-    require_permission_dep
+    require_permission_dep,
+    UnitOfWorkRoute
 )
 from api.v1.schemas.activities_schemas import (
     ActivitiesSchema,
@@ -15,18 +18,31 @@ from api.v1.schemas.activities_schemas import (
 )
 from api.v1.schemas.deals_schemas import (
     DealsSchema,
+    DealBatchCreateSchema,
+    DealBulkResultSchema,
+    DealBulkUpdateSchema,
     DealCreateSchema,
     DealUpdateSchema
 )
 from services.activity_service import ActivityService
 from services.deals_service import DealService
+from services.list_counts import CountMode
 from repositories.activities_rep import ActivitiesRepository
 from repositories.deals_rep import DealsRepository
 from models import OrganizationMemberModel
 from models.constants import Permission
 
 
-router = APIRouter(prefix="/deals", tags=["Сделки"])
+EXPORT_MEDIA_TYPES = {
+    "ndjson": "application/x-ndjson",
+    "csv": "text/csv; charset=utf-8",
+}
+
+router = APIRouter(
+    prefix="/deals",
+    tags=["Сделки"],
+    route_class=UnitOfWorkRoute,
+)
 
 
 @router.get(
@@ -35,26 +51,39 @@ router = APIRouter(prefix="/deals", tags=["Сделки"])
     summary="Получение сделок",
 )
 async def get_user_deals(
+    response: Response,
     current_user=Depends(get_current_user),
     organization_id: int = Depends(get_organization_id),
     member: OrganizationMemberModel = Depends(
         require_permission_dep(Permission.READ_DEAL)
     ),
     db: AsyncSession = Depends(get_db_session),
-    page: int = 1,
-    page_size: int = 20,
+    primary_db: AsyncSession = Depends(get_primary_db_session),
+    page: int = Query(1, ge=1),
+    page_size: int = Query(20, ge=1, le=100),
+    cursor: Optional[str] = None,
     status: Optional[list[str]] = Query(None),
     min_amount: Optional[float] = None,
     max_amount: Optional[float] = None,
     stage: Optional[str] = None,
     owner_id: Optional[int] = None,
     order_by: str = "created_at",
-    order: str = "desc"
+    order: str = "desc",
+    count: Optional[CountMode] = None,
 ):
-    """Получить сделки организации, текущего пользователя."""
+    """
+    Получить сделки организации, текущего пользователя.
+
+    Для постраничного обхода без OFFSET передайте в cursor значение
+    заголовка X-Next-Cursor предыдущего ответа. С count=exact или
+    count=estimated в заголовке X-Total-Count возвращается итог.
+    """
     deal_repo = DealsRepository(db)
-    deal_service = DealService(deal_repo)
-    return await deal_service.get_user_deals(
+    deal_service = DealService(
+        deal_repo,
+        primary_repo=DealsRepository(primary_db)
+    )
+    deals, next_cursor = await deal_service.get_user_deals_page(
         user_id=current_user.id,
         organization_id=organization_id,
         page=page,
@@ -67,6 +96,73 @@ async def get_user_deals(
         order_by=order_by,
         order=order,
         user_role=member.role,
+        cursor=cursor,
+    )
+    if next_cursor is not None:
+        response.headers["X-Next-Cursor"] = next_cursor
+    if count is not None:
+        response.headers["X-Total-Count"] = (
+            await deal_service.count_user_deals(
+                user_id=current_user.id,
+                organization_id=organization_id,
+                user_role=member.role,
+                mode=count,
+                status=status,
+                min_amount=min_amount,
+                max_amount=max_amount,
+                stage=stage,
+                owner_id=owner_id,
+            )
+        )
+    return deals
+
+
+@router.get(
+    "/export",
+    summary="Выгрузка сделок",
+    response_class=StreamingResponse,
+)
+async def export_deals(
+    current_user=Depends(get_current_user),
+    organization_id: int = Depends(get_organization_id),
+    member: OrganizationMemberModel = Depends(
+        require_permission_dep(Permission.READ_DEAL)
+    ),
+    db: AsyncSession = Depends(get_db_session),
+    format: Literal["ndjson", "csv"] = "ndjson",
+    status: Optional[list[str]] = Query(None),
+    min_amount: Optional[float] = None,
+    max_amount: Optional[float] = None,
+    stage: Optional[str] = None,
+    owner_id: Optional[int] = None,
+    order_by: str = "created_at",
+    order: str = "desc",
+):
+    """
+    Выгрузить все сделки организации потоком NDJSON или CSV.
+
+    Фильтры и видимость сделок те же, что у списка; строки читаются
+    одним запросом через серверный курсор.
+    """
+    deal_service = DealService(DealsRepository(db))
+    return StreamingResponse(
+        deal_service.export_deals(
+            user_id=current_user.id,
+            organization_id=organization_id,
+            user_role=member.role,
+            format=format,
+            order_by=order_by,
+            order=order,
+            status=status,
+            min_amount=min_amount,
+            max_amount=max_amount,
+            stage=stage,
+            owner_id=owner_id,
+        ),
+        media_type=EXPORT_MEDIA_TYPES[format],
+        headers={
+            "Content-Disposition": f'attachment; filename="deals.{format}"'
+        },
     )
 
 
@@ -97,6 +193,62 @@ async def create_deal(
     )
 
 
+@router.post(
+    "/batch",
+    response_model=list[DealsSchema],
+    summary="Пакетное создание сделок",
+)
+async def create_deals(
+    body: DealBatchCreateSchema,
+    current_user=Depends(get_current_user),
+    organization_id: int = Depends(get_organization_id),
+    member: OrganizationMemberModel = Depends(
+        require_permission_dep(Permission.WRITE_DEAL)
+    ),
+    db: AsyncSession = Depends(get_db_session),
+):
+    """Создать до DEAL_BATCH_MAX_SIZE сделок одним запросом."""
+    deal_repo = DealsRepository(db)
+    deal_service = DealService(deal_repo)
+    return await deal_service.create_deals(
+        deals=body.deals,
+        current_user_id=current_user.id,
+        organization_id=organization_id,
+    )
+
+
+@router.patch(
+    "/batch",
+    response_model=list[DealBulkResultSchema],
+    summary="Пакетная смена статуса и стадии сделок",
+)
+async def transition_deals(
+    body: DealBulkUpdateSchema,
+    current_user=Depends(get_current_user),
+    organization_id: int = Depends(get_organization_id),
+    member: OrganizationMemberModel = Depends(
+        require_permission_dep(Permission.WRITE_DEAL)
+    ),
+    db: AsyncSession = Depends(get_db_session),
+):
+    """
+    Перевести сделки в указанный статус и стадию.
+
+    Для каждой сделки возвращается, применено ли изменение и почему нет.
+    """
+    deal_repo = DealsRepository(db)
+    activity_service = ActivityService(ActivitiesRepository(db))
+    deal_service = DealService(deal_repo, activity_service)
+    return await deal_service.transition_deals(
+        deal_ids=body.deal_ids,
+        status=body.status,
+        stage=body.stage,
+        user_role=member.role,
+        organization_id=organization_id,
+        current_user_id=current_user.id
+    )
+
+
 @router.patch(
     "/{deal_id}",
     response_model=DealsSchema,
@@ -133,19 +285,33 @@ async def update_deal(
 )
 async def get_activities(
     deal_id: int,
+    response: Response,
     current_user=Depends(get_current_user),
     organization_id: int = Depends(get_organization_id),
     member: OrganizationMemberModel = Depends(
         require_permission_dep(Permission.READ_ACTIVITY)
     ),
     db: AsyncSession = Depends(get_db_session),
+    limit: int = Query(50, ge=1, le=200),
+    since: Optional[str] = None,
 ):
+    """
+    Лента активностей сделки в порядке (created_at, id).
+
+    Заголовок X-Next-Cursor ответа передаётся в since при следующем
+    опросе: тогда вернутся только записи, появившиеся после него.
+    """
     activity_repo = ActivitiesRepository(db)
     activity_service = ActivityService(activity_repo)
-    return await activity_service.get_activities_deal(
+    activities, next_cursor = await activity_service.get_activities_feed(
         deal_id=deal_id,
-        organization_id=organization_id
+        organization_id=organization_id,
+        limit=limit,
+        since=since,
     )
+    if next_cursor is not None:
+        response.headers["X-Next-Cursor"] = next_cursor
+    return activities
 
 
 @router.post(
@@ -5,7 +5,8 @@ from api.v1.dependencies import (
     get_db_session,
     get_current_user,
     get_organization_id,
-    require_permission_dep
+    require_permission_dep,
+    UnitOfWorkRoute
 )
 from repositories.organization_rep import OrganizationRepository
 from repositories.member_rep import OrganizationMemberRepository
@@ -19,7 +20,11 @@ from api.v1.schemas.organization_schemas import (
 )
 
 
-router = APIRouter(prefix="/organizations", tags=["Организации"])
+router = APIRouter(
+    prefix="/organizations",
+    tags=["Организации"],
+    route_class=UnitOfWorkRoute,
+)
 
 
 @router.get(
@@ -0,0 +1,58 @@
+from typing import Optional
+
+from fastapi import APIRouter, Depends, Query
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from api.v1.dependencies import (
+    get_db_session,
+    get_current_user,
+    get_organization_id,
+    require_permission_dep,
+    UnitOfWorkRoute
+)
+from api.v1.schemas.search_schemas import SearchHitSchema
+from services.search_service import SearchService
+from repositories.search_rep import SearchRepository
+from models import OrganizationMemberModel
+from models.constants import Permission, SearchEntity
+
+
+router = APIRouter(
+    prefix="/search",
+    tags=["Поиск"],
+    route_class=UnitOfWorkRoute,
+)
+
+
+@router.get(
+    "/",
+    response_model=list[SearchHitSchema],
+    summary="Поиск по организации",
+)
+async def search(
+    q: str = Query(..., max_length=200),
+    types: Optional[list[SearchEntity]] = Query(None),
+    limit: int = Query(20, ge=1, le=100),
+    current_user=Depends(get_current_user),
+    organization_id: int = Depends(get_organization_id),
+    member: OrganizationMemberModel = Depends(
+        require_permission_dep(Permission.READ_ORGANIZATION)
+    ),
+    db: AsyncSession = Depends(get_db_session),
+):
+    """
+    Найти контакты, сделки, задачи и комментарии по словам запроса.
+
+    Каждое слово ищется как префикс; результаты упорядочены по
+    релевантности, совпадения в заголовке весят больше. MEMBER видит
+    только свои контакты и сделки.
+    """
+    search_service = SearchService(SearchRepository(db))
+    return await search_service.search(
+        organization_id=organization_id,
+        user_id=current_user.id,
+        member=member,
+        q=q,
+        entity_types=[entity.value for entity in types or []],
+        limit=limit,
+    )
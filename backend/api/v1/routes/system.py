@@ -0,0 +1,46 @@
+import secrets
+
+from fastapi import APIRouter, Depends, Header, HTTPException, status
+
+from api.v1.dependencies import UnitOfWorkRoute
+from repositories.config import settings
+from repositories.database import pool_snapshot
+from services.token_reaper import refresh_token_reaper
+
+
+async def require_ops_token(x_ops_token: str = Header(None)) -> None:
+    """
+    Пропускает только запросы с токеном SYSTEM_OPS_TOKEN в заголовке
+    X-Ops-Token. Токен пользователя сюда не подходит: участником
+    организации может стать любой зарегистрировавшийся.
+    """
+    if not settings.SYSTEM_OPS_TOKEN or x_ops_token is None or not (
+        secrets.compare_digest(x_ops_token, settings.SYSTEM_OPS_TOKEN)
+    ):
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Permission denied"
+        )
+
+
+router = APIRouter(
+    prefix="/system",
+    tags=["Служебное"],
+    route_class=UnitOfWorkRoute,
+    dependencies=[Depends(require_ops_token)],
+)
+
+
+@router.get(
+    "/stats",
+    summary="Счётчики пула соединений и фоновых задач процесса",
+)
+async def get_stats():
+    """
+    Состояние пулов соединений и счётчики фоновых задач процесса,
+    обслужившего запрос. Требует заголовок X-Ops-Token.
+    """
+    return {
+        "pool": pool_snapshot(),
+        "refresh_token_reaper": refresh_token_reaper.stats(),
+    }
@@ -1,23 +1,34 @@
 from datetime import date
 from typing import Optional
 
-from fastapi import APIRouter, Depends
+from fastapi import APIRouter, Depends, Query, Response
+from fastapi.responses import StreamingResponse
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from api.v1.dependencies import (
     get_db_session,
     get_current_user,
     get_organization_id,
-    require_permission_dep
+    require_permission_dep,
+    UnitOfWorkRoute
+)
+from api.v1.schemas.tasks_schemas import (
+    TasksSchema,
+    TaskBatchCompleteSchema,
+    TaskBatchCreateSchema,
+    TaskCreateSchema,
 )
-from api.v1.schemas.tasks_schemas import TasksSchema, TaskCreateSchema
 from services.tasks_service import TaskService
 from repositories.tasks_rep import TasksRepository
 from models import OrganizationMemberModel
 from models.constants import Permission
 
 
-router = APIRouter(prefix="/tasks", tags=["Задачи"])
+router = APIRouter(
+    prefix="/tasks",
+    tags=["Задачи"],
+    route_class=UnitOfWorkRoute,
+)
 
 
 @router.get(
@@ -26,6 +37,7 @@ router = APIRouter(prefix="/tasks", tags=["Задачи"])
     summary="Получение задач",
 )
 async def get_user_tasks(
+    response: Response,
     current_user=Depends(get_current_user),
     organization_id: int = Depends(get_organization_id),
     member: OrganizationMemberModel = Depends(
@@ -36,17 +48,39 @@ async def get_user_tasks(
     only_open: Optional[bool] = None,
     due_before: Optional[date] = None,
     due_after: Optional[date] = None,
+    limit: int = Query(50, ge=1, le=500),
+    cursor: Optional[str] = None,
+    stream: bool = False,
 ):
-    """Получить задачи сделок организации."""
+    """
+    Получить задачи сделок организации в порядке (due_date, id).
+
+    Ответ ограничен limit задачами; следующую страницу возвращает
+    запрос с cursor из заголовка X-Next-Cursor. С stream=true все
+    задачи отдаются потоком NDJSON без ограничения limit.
+    """
     task_repo = TasksRepository(db)
     task_service = TaskService(task_repo)
-    return await task_service.get_tasks(
-        organization_id=organization_id,
-        deal_id=deal_id,
-        only_open=only_open,
-        due_before=due_before,
-        due_after=due_after
+    filters = {
+        "organization_id": organization_id,
+        "deal_id": deal_id,
+        "only_open": only_open,
+        "due_before": due_before,
+        "due_after": due_after,
+    }
+    if stream:
+        return StreamingResponse(
+            task_service.stream_tasks(**filters),
+            media_type="application/x-ndjson"
+        )
+    tasks, next_cursor = await task_service.get_tasks_page(
+        **filters,
+        limit=limit,
+        cursor=cursor,
     )
+    if next_cursor is not None:
+        response.headers["X-Next-Cursor"] = next_cursor
+    return tasks
 
 
 @router.post(
@@ -75,3 +109,53 @@ async def create_task(
         user_role=member.role,
         user_id=current_user.id,
     )
+
+
+@router.post(
+    "/batch",
+    response_model=list[TasksSchema],
+    summary="Пакетное создание задач",
+)
+async def create_tasks(
+    body: TaskBatchCreateSchema,
+    current_user=Depends(get_current_user),
+    organization_id: int = Depends(get_organization_id),
+    member: OrganizationMemberModel = Depends(
+        require_permission_dep(Permission.WRITE_TASK)
+    ),
+    db: AsyncSession = Depends(get_db_session),
+):
+    """Создать до TASK_BATCH_MAX_SIZE задач одним запросом."""
+    task_repo = TasksRepository(db)
+    task_service = TaskService(task_repo)
+    return await task_service.create_tasks(
+        tasks=body.tasks,
+        organization_id=organization_id,
+        user_role=member.role,
+        user_id=current_user.id,
+    )
+
+
+@router.post(
+    "/complete",
+    response_model=list[TasksSchema],
+    summary="Пакетное выполнение задач",
+)
+async def complete_tasks(
+    body: TaskBatchCompleteSchema,
+    current_user=Depends(get_current_user),
+    organization_id: int = Depends(get_organization_id),
+    member: OrganizationMemberModel = Depends(
+        require_permission_dep(Permission.WRITE_TASK)
+    ),
+    db: AsyncSession = Depends(get_db_session),
+):
+    """Отметить задачи выполненными и вернуть отмеченные."""
+    task_repo = TasksRepository(db)
+    task_service = TaskService(task_repo)
+    return await task_service.complete_tasks(
+        task_ids=body.task_ids,
+        organization_id=organization_id,
+        user_role=member.role,
+        user_id=current_user.id,
+    )
@@ -1,4 +1,5 @@
 from datetime import datetime
+from typing import Literal
 from pydantic import (
     BaseModel,
     Field,
@@ -7,6 +8,8 @@ from pydantic import (
     EmailStr
 )
 
+from models.constants import DuplicateStatus
+
 
 class ContactsSchema(BaseModel):
     """Схема контактов."""
@@ -33,3 +36,52 @@ class ContactCreateSchema(BaseModel):
     name: str = Field(..., min_length=1)
     email: EmailStr
     phone: str = Field(..., min_length=1)
+
+
+class ContactSuggestSchema(BaseModel):
+    """Схема подсказки контакта."""
+
+    id: int = Field(..., title="ID контакта")
+    name: str = Field(..., title="Имя контакта")
+    email: str = Field(..., title="Email контакта")
+
+
+class ContactImportErrorSchema(BaseModel):
+    """Схема ошибки строки импорта."""
+
+    row: int = Field(..., title="Номер строки файла")
+    error: str = Field(..., title="Причина отказа")
+
+
+class ContactImportReportSchema(BaseModel):
+    """Схема отчёта об импорте контактов."""
+
+    received: int = Field(..., title="Прочитано строк")
+    inserted: int = Field(..., title="Добавлено контактов")
+    updated: int = Field(..., title="Обновлено контактов")
+    failed: int = Field(..., title="Отклонено строк")
+    errors: list[ContactImportErrorSchema] = Field(
+        ...,
+        title="Ошибки строк (не больше CONTACT_IMPORT_MAX_ERRORS)"
+    )
+
+
+class ContactDuplicateSchema(BaseModel):
+    """Схема пары контактов-дубликатов."""
+
+    model_config = ConfigDict(from_attributes=True)
+
+    id: int = Field(..., title="ID пары")
+    score: float = Field(..., title="Оценка похожести от 0 до 1")
+    reasons: list[str] = Field(..., title="Совпавшие поля")
+    status: DuplicateStatus = Field(..., title="Статус проверки")
+    contact: ContactsSchema = Field(..., title="Контакт")
+    duplicate: ContactsSchema = Field(..., title="Вероятный дубликат")
+
+
+class ContactDuplicateReviewSchema(BaseModel):
+    """Схема решения по паре контактов-дубликатов."""
+
+    model_config = ConfigDict(extra="forbid")
+
+    status: Literal[DuplicateStatus.CONFIRMED, DuplicateStatus.DISMISSED]
@@ -40,6 +40,14 @@ class DealCreateSchema(BaseModel):
     currency: Currency
 
 
+class DealBatchCreateSchema(BaseModel):
+    """Схема для пакетного создания сделок."""
+
+    model_config = ConfigDict(extra="forbid")
+
+    deals: list[DealCreateSchema] = Field(..., min_length=1)
+
+
 class DealUpdateSchema(BaseModel):
     """Схема для обновления сделки."""
 
@@ -47,3 +55,21 @@ class DealUpdateSchema(BaseModel):
 
     status: Optional[StatusDeal] = None
     stage: Optional[StageDeal] = None
+
+
+class DealBulkUpdateSchema(BaseModel):
+    """Схема для пакетной смены статуса и стадии сделок."""
+
+    model_config = ConfigDict(extra="forbid")
+
+    deal_ids: list[int] = Field(..., min_length=1)
+    status: Optional[StatusDeal] = None
+    stage: Optional[StageDeal] = None
+
+
+class DealBulkResultSchema(BaseModel):
+    """Схема результата пакетной операции над одной сделкой."""
+
+    deal_id: int = Field(..., title="ID сделки")
+    success: bool = Field(..., title="Изменение применено")
+    error: Optional[str] = Field(None, title="Причина отказа")
@@ -0,0 +1,14 @@
+from typing import Optional
+from pydantic import BaseModel, Field
+
+from models.constants import SearchEntity
+
+
+class SearchHitSchema(BaseModel):
+    """Схема результата поиска."""
+
+    type: SearchEntity = Field(..., title="Тип сущности")
+    id: int = Field(..., title="ID сущности")
+    deal_id: Optional[int] = Field(None, title="ID сделки")
+    title: str = Field(..., title="Заголовок")
+    rank: float = Field(..., title="Релевантность")
@@ -36,3 +36,19 @@ class TaskCreateSchema(BaseModel):
         if value < date.today():
             raise ValueError("Дата выполнения не может быть в прошлом")
         return value
+
+
+class TaskBatchCreateSchema(BaseModel):
+    """Схема пакетного создания задач."""
+
+    model_config = ConfigDict(extra="forbid")
+
+    tasks: list[TaskCreateSchema] = Field(..., min_length=1)
+
+
+class TaskBatchCompleteSchema(BaseModel):
+    """Схема пакетного выполнения задач."""
+
+    model_config = ConfigDict(extra="forbid")
+
+    task_ids: list[int] = Field(..., min_length=1)
@@ -1,11 +1,34 @@
+import asyncio
+from contextlib import asynccontextmanager, suppress
+
 from fastapi import FastAPI, Request, status
 from fastapi.responses import JSONResponse
 from fastapi.exceptions import RequestValidationError
 
 from api.v1.router import api_router
+from repositories.config import settings
+from services.password_hasher import password_hasher
+from services.token_reaper import refresh_token_reaper
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    reaper_task = None
+    if settings.REFRESH_TOKEN_REAPER_INTERVAL_SECONDS > 0:
+        reaper_task = asyncio.create_task(
+            refresh_token_reaper.run_forever(
+                settings.REFRESH_TOKEN_REAPER_INTERVAL_SECONDS
+            )
+        )
+    yield
+    if reaper_task is not None:
+        reaper_task.cancel()
+        with suppress(asyncio.CancelledError):
+            await reaper_task
+    password_hasher.shutdown()
 
 
-app = FastAPI(title="CRM System")
+app = FastAPI(title="CRM System", lifespan=lifespan)
 app.include_router(api_router, prefix="/api")
 
 
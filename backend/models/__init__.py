@@ -5,7 +5,14 @@ from .core import (
     UserModel,
     RefreshTokenModel,
 )
-from .crm import ContactModel, DealModel, TaskModel, ActivityModel
+from .crm import (
+    ContactModel,
+    ContactDuplicateModel,
+    DealModel,
+    TaskModel,
+    ActivityModel,
+)
+from .search import SearchDocumentModel
 from .event import * # noqa
 
 __all__ = [
@@ -18,4 +25,6 @@ __all__ = [
     'DealModel',
     'TaskModel',
     'ActivityModel',
+    'ContactDuplicateModel',
+    'SearchDocumentModel',
 ]
\ No newline at end of file
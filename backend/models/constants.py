@@ -1,12 +1,38 @@
+import re
 from enum import Enum
+from typing import Optional
 
 
 LENGTH_NAME_ORGANIZATION = 200
 LENGTH_EMAIL = 100
 LENGTH_NAME_USER = 100
 LENGTH_PHONE = 30
+LENGTH_PHONE_E164 = 15
 LENGTH_TITLE_DEAL = 200
 LENGTH_TITLE_TASK = 200
+EMAIL_PATTERN = r'^[^@]+@[^@]+\.[^@]+$'
+# Начало добавочного номера: всё после него в номер не входит.
+PHONE_EXTENSION_PATTERN = r'(ext|доб|[x;,#]).*$'
+
+
+def normalize_phone(phone: Optional[str]) -> Optional[str]:
+    """
+    Номер телефона цифрами E.164 без «+».
+
+    "+1 (555) 010-2000", "1-555-010-2000" и "001 555 010 2000" дают
+    "15550102000". Добавочный номер отбрасывается; национальный формат
+    без кода страны не преобразуется. Для номера без цифр или длиннее
+    15 цифр возвращает None.
+    """
+    if not phone:
+        return None
+    phone = re.sub(PHONE_EXTENSION_PATTERN, '', phone, flags=re.IGNORECASE)
+    digits = re.sub(r'[^0-9]', '', phone)
+    if digits.startswith('00'):
+        digits = digits[2:]
+    if not digits or len(digits) > LENGTH_PHONE_E164:
+        return None
+    return digits
 
 
 class MemberRole(str, Enum):
@@ -110,3 +136,20 @@ class ActivityType(str, Enum):
     STAGE_CHANGE = "stage_change"
     TASK_CREATED = "task_created"
     SYSTEM = "system"
+
+
+class SearchEntity(str, Enum):
+    """Сущности, по которым работает полнотекстовый поиск."""
+
+    CONTACT = "contact"
+    DEAL = "deal"
+    TASK = "task"
+    COMMENT = "comment"
+
+
+class DuplicateStatus(str, Enum):
+    """Статусы пары контактов-дубликатов."""
+
+    NEW = "new"
+    CONFIRMED = "confirmed"
+    DISMISSED = "dismissed"
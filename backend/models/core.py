@@ -9,15 +9,19 @@ from sqlalchemy import (
     func,
     ForeignKey,
     Enum as SQLEnum,
-    UniqueConstraint
+    Index,
+    UniqueConstraint,
+    text
 )
 from sqlalchemy.orm import Mapped, mapped_column, relationship, validates
 
+from repositories.config import settings
 from repositories.database import Base
 from .constants import (
     MemberRole,
     Permission,
     LENGTH_NAME_ORGANIZATION,
+    EMAIL_PATTERN,
     LENGTH_EMAIL,
     LENGTH_NAME_USER,
 )
@@ -33,7 +37,12 @@ class RefreshTokenModel(Base):
     user_id: Mapped[int] = mapped_column(
         ForeignKey("users.id", ondelete="CASCADE")
     )
-    token: Mapped[str] = mapped_column(nullable=False, unique=True)
+    token_hash: Mapped[str] = mapped_column(
+        String(64),
+        nullable=False,
+        unique=True,
+        index=True
+    )
     expires_at: Mapped[datetime] = mapped_column(nullable=False)
     created_at: Mapped[datetime] = mapped_column(default=datetime.utcnow)
     revoked: Mapped[bool] = mapped_column(default=False)
@@ -43,6 +52,19 @@ class RefreshTokenModel(Base):
         back_populates="refresh_tokens"
     )
 
+    __table_args__ = (
+        Index(
+            'ix_refresh_tokens_expires_at',
+            'expires_at',
+            postgresql_where=text('revoked = false')
+        ),
+        Index(
+            'ix_refresh_tokens_revoked',
+            'id',
+            postgresql_where=text('revoked = true')
+        ),
+    )
+
 
 class UserModel(Base):
     __tablename__ = 'users'
@@ -54,6 +76,11 @@ class UserModel(Base):
         nullable=False
     )
     hashed_password: Mapped[str] = mapped_column(String(256), nullable=False)
+    membership_version: Mapped[int] = mapped_column(
+        default=0,
+        server_default='0',
+        nullable=False
+    )
     name: Mapped[str] = mapped_column(
         String(LENGTH_NAME_USER),
         nullable=False
@@ -88,24 +115,39 @@ class UserModel(Base):
         "RefreshTokenModel", back_populates="user"
     )
 
+    @staticmethod
+    def hash_password(password: str) -> str:
+        """Хеш пароля с текущей стоимостью bcrypt."""
+        salt = bcrypt.gensalt(rounds=settings.BCRYPT_ROUNDS)
+        return bcrypt.hashpw(password.encode('utf-8'), salt).decode('utf-8')
+
+    @staticmethod
+    def verify_password(password: str, hashed_password: str) -> bool:
+        """Сверка пароля с хешем."""
+        return bcrypt.checkpw(
+            password.encode('utf-8'),
+            hashed_password.encode('utf-8')
+        )
+
     def set_password(self, password: str):
         """Хеширование пароля."""
-        salt = bcrypt.gensalt()
-        self.hashed_password = bcrypt.hashpw(
-            password.encode('utf-8'),
-            salt
-        ).decode('utf-8')
+        self.hashed_password = self.hash_password(password)
 
     def check_password(self, password: str) -> bool:
         """Проверка пароля."""
-        return bcrypt.checkpw(
-            password.encode('utf-8'),
-            self.hashed_password.encode('utf-8')
-        )
+        return self.verify_password(password, self.hashed_password)
+
+    def password_needs_rehash(self) -> bool:
+        """Хеш создан с устаревшей стоимостью bcrypt."""
+        try:
+            rounds = int(self.hashed_password.split('$')[2])
+        except (IndexError, ValueError):
+            return True
+        return rounds != settings.BCRYPT_ROUNDS
 
     @validates('email')
     def validate_email(self, key, email):
-        if not re.match(r'^[^@]+@[^@]+\.[^@]+$', email):
+        if not re.match(EMAIL_PATTERN, email):
             raise ValueError("Invalid email format")
         return email
 
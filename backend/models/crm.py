@@ -3,8 +3,10 @@ from typing import TYPE_CHECKING
 import re
 
 from sqlalchemy import (
+    CheckConstraint,
     DateTime,
     Date,
+    Float,
     Index,
     String,
     Text,
@@ -14,19 +16,23 @@ from sqlalchemy import (
     UniqueConstraint
 )
 from sqlalchemy.orm import Mapped, mapped_column, relationship, validates
-from sqlalchemy.dialects.postgresql import JSONB
+from sqlalchemy.dialects.postgresql import ARRAY, JSONB
 
 from repositories.database import Base
 from .constants import (
     ActivityType,
     Currency,
+    DuplicateStatus,
     StatusDeal,
     StageDeal,
+    EMAIL_PATTERN,
     LENGTH_EMAIL,
     LENGTH_NAME_USER,
     LENGTH_PHONE,
+    LENGTH_PHONE_E164,
     LENGTH_TITLE_DEAL,
     LENGTH_TITLE_TASK,
+    normalize_phone,
 )
 
 if TYPE_CHECKING:
@@ -52,6 +58,10 @@ class ContactModel(Base):
         nullable=False
     )
     phone: Mapped[str] = mapped_column(String(LENGTH_PHONE), nullable=True)
+    phone_normalized: Mapped[str] = mapped_column(
+        String(LENGTH_PHONE_E164),
+        nullable=True
+    )
     created_at: Mapped[datetime] = mapped_column(
         DateTime,
         default=func.now(),
@@ -76,15 +86,55 @@ class ContactModel(Base):
             name='uq_organization_contact_email'
         ),
         Index('ix_contacts_organization_name', 'organization_id', 'name'),
-        Index('ix_contacts_organization_phone', 'organization_id', 'phone'),
+        Index(
+            'ix_contacts_organization_phone_normalized',
+            'organization_id',
+            'phone_normalized'
+        ),
+        Index(
+            'ix_contacts_org_owner_name',
+            'organization_id',
+            'owner_id',
+            'name',
+            'id'
+        ),
+        Index(
+            'ix_contacts_org_owner_created_at',
+            'organization_id',
+            'owner_id',
+            'created_at',
+            'id'
+        ),
     )
 
     @validates('email')
     def validate_email(self, key, email):
-        if not re.match(r'^[^@]+@[^@]+\.[^@]+$', email):
+        if not re.match(EMAIL_PATTERN, email):
             raise ValueError("Invalid email format")
         return email
 
+    @validates('phone')
+    def validate_phone(self, key, phone):
+        self.phone_normalized = normalize_phone(phone)
+        return phone
+
+
+# Подсказки вне кэша: lower(name) или lower(email) LIKE 'prefix%'
+# внутри организации в порядке ключа. С collation "C" индекс служит
+# и диапазоном для LIKE, и готовым порядком для ORDER BY ... LIMIT.
+Index(
+    'ix_contacts_org_lower_name',
+    ContactModel.organization_id,
+    func.lower(ContactModel.name).collate('C'),
+    ContactModel.id,
+)
+Index(
+    'ix_contacts_org_lower_email',
+    ContactModel.organization_id,
+    func.lower(ContactModel.email).collate('C'),
+    ContactModel.id,
+)
+
 
 class DealModel(Base):
     __tablename__ = 'deals'
@@ -147,6 +197,29 @@ class DealModel(Base):
         cascade="all, delete-orphan"
     )
 
+    __table_args__ = (
+        Index(
+            'ix_deals_org_created_at',
+            'organization_id',
+            'created_at',
+            'id'
+        ),
+        Index(
+            'ix_deals_org_owner_created_at',
+            'organization_id',
+            'owner_id',
+            'created_at',
+            'id'
+        ),
+        Index(
+            'ix_deals_org_status_stage',
+            'organization_id',
+            'status',
+            'stage',
+            postgresql_include=['amount']
+        ),
+    )
+
     @validates('status')
     def validate_won_status(self, key, status):
         if status == StatusDeal.WON and self.amount <= 0:
@@ -162,6 +235,12 @@ class TaskModel(Base):
         ForeignKey('deals.id', ondelete='CASCADE'),
         nullable=False
     )
+    # Копия deals.organization_id: список задач организации читается
+    # по ix_tasks_org_due_date без соединения со сделками.
+    organization_id: Mapped[int] = mapped_column(
+        ForeignKey('organizations.id', ondelete='CASCADE'),
+        nullable=False,
+    )
     title: Mapped[str] = mapped_column(
         String(LENGTH_TITLE_TASK),
         nullable=False
@@ -181,7 +260,13 @@ class TaskModel(Base):
     )
 
     __table_args__ = (
-        Index('ix_tasks_deal_id', 'deal_id'),
+        Index('ix_tasks_deal_due_date', 'deal_id', 'due_date', 'id'),
+        Index(
+            'ix_tasks_org_due_date',
+            'organization_id',
+            'due_date',
+            'id'
+        ),
         Index('ix_tasks_due_date', 'due_date'),
         Index('ix_tasks_is_done', 'is_done'),
     )
@@ -222,3 +307,81 @@ class ActivityModel(Base):
         'UserModel',
         back_populates='activities'
     )
+
+    __table_args__ = (
+        Index(
+            'ix_activities_deal_created_at',
+            'deal_id',
+            'created_at',
+            'id'
+        ),
+    )
+
+
+class ContactDuplicateModel(Base):
+    """
+    Пара контактов организации, похожих на дубликаты.
+
+    Строки со статусом NEW пересчитывает задача поиска дубликатов
+    (services.contact_dedup); проверенные пары она не трогает.
+    """
+
+    __tablename__ = 'contact_duplicates'
+
+    id: Mapped[int] = mapped_column(primary_key=True)
+    organization_id: Mapped[int] = mapped_column(
+        ForeignKey('organizations.id', ondelete='CASCADE'),
+        nullable=False
+    )
+    contact_id: Mapped[int] = mapped_column(
+        ForeignKey('contacts.id', ondelete='CASCADE'),
+        nullable=False
+    )
+    duplicate_id: Mapped[int] = mapped_column(
+        ForeignKey('contacts.id', ondelete='CASCADE'),
+        nullable=False
+    )
+    score: Mapped[float] = mapped_column(Float, nullable=False)
+    reasons: Mapped[list[str]] = mapped_column(
+        ARRAY(String(16)),
+        nullable=False
+    )
+    status: Mapped[DuplicateStatus] = mapped_column(
+        SQLEnum(DuplicateStatus),
+        default=DuplicateStatus.NEW,
+        nullable=False
+    )
+    created_at: Mapped[datetime] = mapped_column(
+        DateTime,
+        default=func.now(),
+        nullable=False
+    )
+
+    contact: Mapped['ContactModel'] = relationship(
+        'ContactModel',
+        foreign_keys=[contact_id]
+    )
+    duplicate: Mapped['ContactModel'] = relationship(
+        'ContactModel',
+        foreign_keys=[duplicate_id]
+    )
+
+    __table_args__ = (
+        UniqueConstraint(
+            'contact_id',
+            'duplicate_id',
+            name='uq_contact_duplicates_pair'
+        ),
+        CheckConstraint(
+            'contact_id < duplicate_id',
+            name='ck_contact_duplicates_order'
+        ),
+        Index(
+            'ix_contact_duplicates_org_status_score',
+            'organization_id',
+            'status',
+            'score',
+            'id'
+        ),
+        Index('ix_contact_duplicates_duplicate_id', 'duplicate_id'),
+    )
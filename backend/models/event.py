@@ -1,7 +1,20 @@
 from fastapi import HTTPException
-from sqlalchemy import event, select
+from sqlalchemy import event, inspect, select, update
+from sqlalchemy.orm import Session, object_session
+from sqlalchemy.orm.util import identity_key
+from sqlalchemy.orm.attributes import set_committed_value
 
-from .core import UserModel
+from repositories.cache import (
+    add_contact_suggestion_on_commit,
+    flush_auth_invalidations,
+    flush_contact_phone_invalidations,
+    flush_contact_suggest_changes,
+    invalidate_auth_on_commit,
+    invalidate_contact_phone_on_commit,
+    invalidate_contact_suggestions_on_commit,
+    invalidate_counts,
+)
+from .core import OrganizationMemberModel, UserModel
 from .crm import ContactModel, DealModel
 
 
@@ -34,4 +47,114 @@ def prevent_user_delete_if_has_contacts_with_deals(mapper, connection, target):
         raise HTTPException(
             status_code=400,
             detail="Нельзя удалить пользователя — у его контактов есть сделки."
-        )
\ No newline at end of file
+        )
+
+@event.listens_for(OrganizationMemberModel, "after_insert")
+@event.listens_for(OrganizationMemberModel, "after_update")
+@event.listens_for(OrganizationMemberModel, "after_delete")
+def bump_membership_version(mapper, connection, target):
+    """
+    Любое изменение членства увеличивает версию членств пользователя:
+    access-токены со старой версией перестают авторизовать по claims.
+    """
+    version = connection.execute(
+        update(UserModel)
+        .where(UserModel.id == target.user_id)
+        .values(membership_version=UserModel.membership_version + 1)
+        .returning(UserModel.membership_version)
+    ).scalar_one_or_none()
+    session = object_session(target)
+    user = session.identity_map.get(
+        identity_key(UserModel, target.user_id)
+    ) if session else None
+    if user is not None and version is not None:
+        set_committed_value(user, 'membership_version', version)
+    invalidate_auth_on_commit(session, target.user_id)
+
+
+@event.listens_for(UserModel, "after_update")
+@event.listens_for(UserModel, "after_delete")
+def invalidate_user_cache(mapper, connection, target):
+    invalidate_auth_on_commit(object_session(target), target.id)
+
+
+@event.listens_for(ContactModel, "after_insert")
+@event.listens_for(ContactModel, "after_update")
+@event.listens_for(ContactModel, "after_delete")
+@event.listens_for(DealModel, "after_insert")
+@event.listens_for(DealModel, "after_update")
+@event.listens_for(DealModel, "after_delete")
+def invalidate_list_counts(mapper, connection, target):
+    """Итоги списков организации устаревают при любом изменении строк."""
+    invalidate_counts(mapper.local_table.name, target.organization_id)
+
+
+@event.listens_for(ContactModel, "after_insert")
+def add_contact_suggestion(mapper, connection, target):
+    """Новый контакт попадает в индекс подсказок после коммита."""
+    add_contact_suggestion_on_commit(
+        object_session(target),
+        target.organization_id,
+        target.id,
+        target.owner_id,
+        target.name,
+        target.email
+    )
+
+
+@event.listens_for(ContactModel, "after_update")
+@event.listens_for(ContactModel, "after_delete")
+def invalidate_contact_suggestions(mapper, connection, target):
+    """Изменённый или удалённый контакт перестраивает индекс подсказок."""
+    invalidate_contact_suggestions_on_commit(
+        object_session(target),
+        target.organization_id
+    )
+
+
+@event.listens_for(ContactModel, "after_insert")
+@event.listens_for(ContactModel, "after_update")
+@event.listens_for(ContactModel, "after_delete")
+def invalidate_contact_phone(mapper, connection, target):
+    """
+    Сбросить кэш поиска по старому и новому номеру контакта сейчас
+    и после коммита транзакции.
+    """
+    history = inspect(target).attrs.phone_normalized.history
+    for phone in {target.phone_normalized, *history.deleted}:
+        if phone is not None:
+            invalidate_contact_phone_on_commit(
+                object_session(target),
+                target.organization_id,
+                phone
+            )
+
+
+@event.listens_for(Session, "after_commit")
+def flush_phone_invalidations_after_commit(session):
+    flush_contact_phone_invalidations(session, committed=True)
+
+
+@event.listens_for(Session, "after_rollback")
+def drop_phone_invalidations_after_rollback(session):
+    flush_contact_phone_invalidations(session, committed=False)
+
+
+@event.listens_for(Session, "after_commit")
+def flush_auth_invalidations_after_commit(session):
+    flush_auth_invalidations(session, committed=True)
+
+
+@event.listens_for(Session, "after_rollback")
+def drop_auth_invalidations_after_rollback(session):
+    flush_auth_invalidations(session, committed=False)
+
+
+@event.listens_for(Session, "after_commit")
+def flush_suggest_changes_after_commit(session):
+    flush_contact_suggest_changes(session, committed=True)
+
+
+@event.listens_for(Session, "after_rollback")
+def drop_suggest_changes_after_rollback(session):
+    flush_contact_suggest_changes(session, committed=False)
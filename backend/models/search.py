@@ -0,0 +1,167 @@
+from datetime import datetime
+
+from sqlalchemy import (
+    DDL,
+    Computed,
+    DateTime,
+    ForeignKey,
+    Index,
+    String,
+    Text,
+    UniqueConstraint,
+    event,
+    func,
+)
+from sqlalchemy.dialects.postgresql import TSVECTOR
+from sqlalchemy.orm import Mapped, mapped_column
+
+from repositories.database import Base
+from .constants import SearchEntity
+
+
+class SearchDocumentModel(Base):
+    """
+    Документ полнотекстового поиска по сущностям организации.
+
+    Строки поддерживаются триггерами на contacts, deals, tasks и
+    activities (только комментарии) и напрямую не изменяются.
+    """
+
+    __tablename__ = 'search_documents'
+
+    id: Mapped[int] = mapped_column(primary_key=True)
+    organization_id: Mapped[int] = mapped_column(
+        ForeignKey('organizations.id', ondelete='CASCADE'),
+        nullable=False
+    )
+    entity_type: Mapped[str] = mapped_column(String(16), nullable=False)
+    entity_id: Mapped[int] = mapped_column(nullable=False)
+    owner_id: Mapped[int] = mapped_column(nullable=True)
+    deal_id: Mapped[int] = mapped_column(nullable=True)
+    title: Mapped[str] = mapped_column(Text, nullable=False)
+    body: Mapped[str] = mapped_column(Text, nullable=True)
+    document: Mapped[str] = mapped_column(
+        TSVECTOR,
+        Computed(
+            "setweight(to_tsvector('simple', title), 'A') || "
+            "setweight(to_tsvector('simple', coalesce(body, '')), 'B') "
+            "|| array_to_tsvector(ARRAY['#' || organization_id::text])",
+            persisted=True
+        )
+    )
+    updated_at: Mapped[datetime] = mapped_column(
+        DateTime,
+        default=func.now(),
+        nullable=False
+    )
+
+    __table_args__ = (
+        UniqueConstraint(
+            'entity_type',
+            'entity_id',
+            name='uq_search_documents_entity'
+        ),
+        # Организация входит в document лексемой tenant_lexeme, и
+        # поиск пересекает её в индексе со словами запроса: btree_gin
+        # для составного (organization_id, document) не требуется.
+        Index(
+            'ix_search_documents_document',
+            'document',
+            postgresql_using='gin'
+        ),
+    )
+
+
+def tenant_lexeme(organization_id: int) -> str:
+    """
+    Лексема организации в document. Парсер 'simple' отбрасывает "#",
+    поэтому слова из запроса пользователя с ней не совпадают.
+    """
+    return f'#{organization_id}'
+
+
+# Откуда берутся документы: сущность -> (таблица, SELECT из new_rows
+# с колонками organization_id, entity_id, owner_id, deal_id, title, body).
+SEARCH_SOURCES = {
+    SearchEntity.CONTACT: (
+        'contacts',
+        "SELECT r.organization_id, r.id, r.owner_id, NULL::integer, "
+        "r.name, concat_ws(' ', r.email, r.phone) FROM new_rows r"
+    ),
+    SearchEntity.DEAL: (
+        'deals',
+        "SELECT r.organization_id, r.id, r.owner_id, r.id, r.title, NULL "
+        "FROM new_rows r"
+    ),
+    SearchEntity.TASK: (
+        'tasks',
+        "SELECT d.organization_id, r.id, d.owner_id, r.deal_id, r.title, "
+        "r.description FROM new_rows r JOIN deals d ON d.id = r.deal_id"
+    ),
+    SearchEntity.COMMENT: (
+        'activities',
+        "SELECT d.organization_id, r.id, d.owner_id, r.deal_id, "
+        "left(coalesce(r.payload->>'text', r.payload::text, ''), 200), "
+        "coalesce(r.payload->>'text', r.payload::text) "
+        "FROM new_rows r JOIN deals d ON d.id = r.deal_id "
+        "WHERE r.type = 'COMMENT'"
+    ),
+}
+
+
+def search_sync_ddl(entity: str, table: str, source: str) -> list[str]:
+    """
+    Функция и statement-триггеры, синхронизирующие документы entity.
+
+    Триггеры получают все изменённые строки через transition tables,
+    поэтому пакетные INSERT, UPDATE и COPY обновляют индекс одним
+    запросом на оператор, а не на строку.
+    """
+    function = f'search_documents_sync_{table}'
+    ddl = [
+        f"""
+        CREATE OR REPLACE FUNCTION {function}() RETURNS trigger
+        LANGUAGE plpgsql AS $$
+        BEGIN
+            IF TG_OP = 'DELETE' THEN
+                DELETE FROM search_documents d USING old_rows o
+                WHERE d.entity_type = '{entity}' AND d.entity_id = o.id;
+            ELSE
+                INSERT INTO search_documents (organization_id, entity_id,
+                    owner_id, deal_id, title, body, entity_type, updated_at)
+                SELECT s.*, '{entity}', now() FROM ({source}) s
+                ON CONFLICT (entity_type, entity_id) DO UPDATE SET
+                    owner_id = EXCLUDED.owner_id,
+                    title = EXCLUDED.title,
+                    body = EXCLUDED.body,
+                    updated_at = EXCLUDED.updated_at
+                WHERE (search_documents.owner_id, search_documents.title,
+                       search_documents.body)
+                    IS DISTINCT FROM
+                    (EXCLUDED.owner_id, EXCLUDED.title, EXCLUDED.body);
+            END IF;
+            RETURN NULL;
+        END $$
+        """
+    ]
+    for operation, transition in (
+        ('INSERT', 'NEW TABLE AS new_rows'),
+        ('UPDATE', 'NEW TABLE AS new_rows'),
+        ('DELETE', 'OLD TABLE AS old_rows'),
+    ):
+        ddl.append(
+            f"CREATE OR REPLACE TRIGGER {function}_{operation.lower()} "
+            f"AFTER {operation} ON {table} REFERENCING {transition} "
+            f"FOR EACH STATEMENT EXECUTE FUNCTION {function}()"
+        )
+    return ddl
+
+
+for entity, (table, source) in SEARCH_SOURCES.items():
+    for statement in search_sync_ddl(entity.value, table, source):
+        event.listen(Base.metadata, 'after_create', DDL(statement))
+    event.listen(
+        Base.metadata,
+        'after_drop',
+        DDL(f'DROP FUNCTION IF EXISTS search_documents_sync_{table}()')
+    )
@@ -1,11 +1,20 @@
-from typing import Sequence
+from datetime import datetime, timedelta
+from typing import Collection, Optional, Sequence
 
-from sqlalchemy import select
+from sqlalchemy import insert, select
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from models import (
     ActivityModel
 )
+from .config import settings
+from .pagination import (
+    decode_cursor,
+    encode_cursor,
+    parse_cursor,
+    parse_value,
+    seek_condition,
+)
 
 
 class ActivitiesRepository:
@@ -14,21 +23,130 @@ class ActivitiesRepository:
 
     async def create(self, activity: ActivityModel) -> ActivityModel:
         self.session.add(activity)
-        await self.session.commit()
-        await self.session.refresh(activity)
+        await self.session.flush()
         return activity
 
+    async def create_many(self, values: list[dict]) -> None:
+        """Добавить активности одним многострочным INSERT."""
+        await self.session.execute(insert(ActivityModel).values(values))
+
     async def get_activities(
         self,
         organization_id: int,
         deal_id: int,
+        limit: int = 50,
+        since: Optional[tuple] = None,
+        seen: Collection[int] = (),
+        floor: Optional[tuple] = None,
     ) -> Sequence[ActivityModel]:
-        """Получить списка активностей сделки."""
-        result = await self.session.execute(
+        """
+        Получить активности сделки в порядке (created_at, id).
+
+        С since (created_at, id) возвращаются записи после позиции
+        курсора и записи окна ACTIVITY_FEED_OVERLAP_SECONDS до неё,
+        которых нет в seen. created_at — время начала транзакции,
+        поэтому запись долгой транзакции может стать видна позже
+        записей с большими created_at и id, уже отданных клиенту.
+        С floor (created_at, id) записи окна не дальше floor
+        не возвращаются.
+        """
+        query = (
             select(ActivityModel)
             .where(
                 ActivityModel.deal_id == deal_id,
                 ActivityModel.deal.has(organization_id=organization_id)
             )
         )
+        if since is not None:
+            query = query.where(
+                ActivityModel.created_at >= since[0] - timedelta(
+                    seconds=settings.ACTIVITY_FEED_OVERLAP_SECONDS
+                )
+            )
+            if floor is not None:
+                query = query.where(seek_condition(
+                    (ActivityModel.created_at, ActivityModel.id),
+                    floor,
+                    False
+                ))
+            if seen:
+                query = query.where(ActivityModel.id.not_in(seen))
+        result = await self.session.execute(
+            query.order_by(
+                ActivityModel.created_at.asc(),
+                ActivityModel.id.asc()
+            ).limit(limit)
+        )
         return result.scalars().all()
+
+    @staticmethod
+    def make_cursor(
+        activities: Sequence[ActivityModel],
+        since: Optional[tuple] = None,
+        seen: Optional[dict[int, datetime]] = None,
+        floor: Optional[tuple] = None,
+    ) -> str:
+        """
+        Курсор после activities: самая дальняя позиция (created_at, id)
+        и id записей, отданных в окне перекрытия перед ней.
+
+        Если таких записей больше ACTIVITY_FEED_SEEN_LIMIT, вместо
+        списка курсор хранит границу floor — саму позицию: записи окна
+        до неё больше не возвращаются, и поздние коммиты перед ней
+        теряются, но размер курсора и условия NOT IN ограничен.
+        """
+        seen = dict(seen or {})
+        seen.update((act.id, act.created_at) for act in activities)
+        position = max(
+            [(act.created_at, act.id) for act in activities]
+            + ([tuple(since)] if since is not None else [])
+        )
+        window = position[0] - timedelta(
+            seconds=settings.ACTIVITY_FEED_OVERLAP_SECONDS
+        )
+        if floor is not None and floor[0] < window:
+            floor = None
+        seen = sorted(
+            (act_id, created_at)
+            for act_id, created_at in seen.items()
+            if created_at >= window
+            and (floor is None or (created_at, act_id) > tuple(floor))
+        )
+        if len(seen) > settings.ACTIVITY_FEED_SEEN_LIMIT:
+            floor, seen = position, []
+        data = {
+            "order_by": ActivityModel.created_at.key,
+            "order": "asc",
+            "value": position[0],
+            "id": position[1],
+            "seen": [[act_id, created_at] for act_id, created_at in seen],
+        }
+        if floor is not None:
+            data["floor"] = list(floor)
+        return encode_cursor(data)
+
+    @staticmethod
+    def parse_cursor(
+        cursor: str
+    ) -> tuple[tuple, dict[int, datetime], Optional[tuple]]:
+        """
+        Разобрать курсор ленты активностей: позиция (created_at, id),
+        отданные в окне перекрытия записи {id: created_at} и граница
+        floor (created_at, id) или None.
+        """
+        since = parse_cursor(cursor, ActivityModel.created_at, False)
+        data = decode_cursor(cursor)
+        try:
+            seen = {
+                int(act_id): datetime.fromisoformat(created_at)
+                for act_id, created_at in data.get("seen", [])
+            }
+            floor = data.get("floor")
+            if floor is not None:
+                floor = (
+                    parse_value(ActivityModel.created_at, floor[0]),
+                    int(floor[1]),
+                )
+        except (TypeError, ValueError, IndexError):
+            raise ValueError("Invalid cursor")
+        return since, seen, floor
@@ -0,0 +1,440 @@
+import hashlib
+import json
+import time
+from bisect import bisect_left, insort
+from collections import OrderedDict
+from typing import Any, Callable, Hashable, Iterable, Optional
+
+from sqlalchemy import inspect
+from sqlalchemy.orm import make_transient_to_detached
+
+from .config import settings
+
+
+_MISSING = object()
+
+
+class TTLCache:
+    """
+    Ограниченный по размеру кэш в памяти процесса.
+
+    Записи живут не дольше ttl секунд, при переполнении вытесняется
+    запись, к которой дольше всего не обращались (LRU).
+    """
+
+    def __init__(self, maxsize: int, ttl: float):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+        self._data: OrderedDict[Hashable, tuple[float, Any]] = OrderedDict()
+
+    @property
+    def enabled(self) -> bool:
+        return self.maxsize > 0 and self.ttl > 0
+
+    def get(self, key: Hashable, default: Any = None) -> Any:
+        item = self._data.get(key, _MISSING)
+        if item is _MISSING:
+            self.misses += 1
+            return default
+        expires_at, value = item
+        if expires_at <= time.monotonic():
+            del self._data[key]
+            self.misses += 1
+            return default
+        self._data.move_to_end(key)
+        self.hits += 1
+        return value
+
+    def set(self, key: Hashable, value: Any) -> None:
+        if not self.enabled:
+            return
+        self._data[key] = (time.monotonic() + self.ttl, value)
+        self._data.move_to_end(key)
+        while len(self._data) > self.maxsize:
+            self._data.popitem(last=False)
+
+    def invalidate(self, key: Hashable) -> None:
+        self._data.pop(key, None)
+
+    def invalidate_where(self, predicate: Callable[[Hashable], bool]) -> None:
+        """Удалить все записи, ключ которых удовлетворяет условию."""
+        for key in [key for key in self._data if predicate(key)]:
+            del self._data[key]
+
+    def clear(self) -> None:
+        self._data.clear()
+        self.hits = 0
+        self.misses = 0
+
+    def stats(self) -> dict:
+        """Счётчики попаданий и промахов."""
+        total = self.hits + self.misses
+        return {
+            "size": len(self._data),
+            "maxsize": self.maxsize,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_ratio": round(self.hits / total, 4) if total else None,
+        }
+
+
+class OrgPrefixIndex:
+    """
+    Отсортированный массив ключей поиска контактов одной организации.
+
+    Ключи — имя целиком, каждое слово имени и email в нижнем регистре;
+    контакты с префиксом находятся бинарным поиском.
+    """
+
+    def __init__(self, rows: Iterable[tuple] = ()):
+        self.items: dict[int, tuple[int, str, str]] = {}
+        self.keys: list[tuple[str, int]] = []
+        for item_id, owner_id, name, email in rows:
+            self.items[item_id] = (owner_id, name, email)
+            self.keys.extend(
+                (key, item_id) for key in self._keys_for(name, email)
+            )
+        self.keys.sort()
+
+    def __len__(self) -> int:
+        return len(self.items)
+
+    @staticmethod
+    def _keys_for(name: str, email: str) -> set[str]:
+        name = name.lower()
+        return {name, email.lower(), *name.split()}
+
+    def add(self, item_id: int, owner_id: int, name: str, email: str):
+        """Добавить или заменить контакт."""
+        self.remove(item_id)
+        self.items[item_id] = (owner_id, name, email)
+        for key in self._keys_for(name, email):
+            insort(self.keys, (key, item_id))
+
+    def remove(self, item_id: int) -> None:
+        item = self.items.pop(item_id, None)
+        if item is None:
+            return
+        for key in self._keys_for(item[1], item[2]):
+            index = bisect_left(self.keys, (key, item_id))
+            if index < len(self.keys) and self.keys[index] == (key, item_id):
+                del self.keys[index]
+
+    def search(
+        self,
+        prefix: str,
+        limit: int,
+        owner_id: Optional[int] = None,
+    ) -> list[tuple[int, str, str]]:
+        """
+        До limit контактов (id, name, email), у которых ключ начинается
+        с prefix; с owner_id — только контакты этого владельца.
+        """
+        prefix = prefix.lower()
+        found: dict[int, tuple[int, str, str]] = {}
+        index = bisect_left(self.keys, (prefix,))
+        while index < len(self.keys) and len(found) < limit:
+            key, item_id = self.keys[index]
+            if not key.startswith(prefix):
+                break
+            item_owner_id, name, email = self.items[item_id]
+            if owner_id is None or item_owner_id == owner_id:
+                found.setdefault(item_id, (item_id, name, email))
+            index += 1
+        return list(found.values())
+
+
+class PrefixIndexCache:
+    """
+    Префиксные индексы организаций в памяти процесса.
+
+    Индекс строится при первом обращении и живёт не дольше ttl секунд.
+    Суммарное число контактов ограничено max_items: при переполнении
+    вытесняются организации, к которым дольше всего не обращались.
+    Организация больше max_items на ttl секунд помечается как
+    слишком большая, и индекс для неё не строится.
+    """
+
+    def __init__(self, max_items: int, ttl: float):
+        self.max_items = max_items
+        self.ttl = ttl
+        self.size = 0
+        self.hits = 0
+        self.misses = 0
+        self._data: OrderedDict[int, tuple[float, OrgPrefixIndex]] = (
+            OrderedDict()
+        )
+        self._oversized: dict[int, float] = {}
+
+    def get(self, organization_id: int) -> Optional[OrgPrefixIndex]:
+        item = self._data.get(organization_id)
+        if item is None or item[0] <= time.monotonic():
+            self.invalidate(organization_id)
+            self.misses += 1
+            return None
+        self._data.move_to_end(organization_id)
+        self.hits += 1
+        return item[1]
+
+    def set(
+        self,
+        organization_id: int,
+        index: OrgPrefixIndex
+    ) -> bool:
+        """Сохранить индекс; False, если он больше всего лимита."""
+        self.invalidate(organization_id)
+        if len(index) > self.max_items:
+            self.mark_oversized(organization_id)
+            return False
+        if self.ttl <= 0:
+            return False
+        self._data[organization_id] = (time.monotonic() + self.ttl, index)
+        self.size += len(index)
+        self._evict()
+        return True
+
+    def add(
+        self,
+        organization_id: int,
+        item_id: int,
+        owner_id: int,
+        name: str,
+        email: str
+    ) -> None:
+        """Добавить контакт в индекс организации, если он построен."""
+        item = self._data.get(organization_id)
+        if item is None:
+            return
+        index = item[1]
+        self.size -= len(index)
+        index.add(item_id, owner_id, name, email)
+        self.size += len(index)
+        self._evict()
+
+    def mark_oversized(self, organization_id: int) -> None:
+        """Запомнить, что организация не влезает в max_items."""
+        if self.ttl > 0:
+            self._oversized[organization_id] = time.monotonic() + self.ttl
+
+    def is_oversized(self, organization_id: int) -> bool:
+        expires_at = self._oversized.get(organization_id)
+        if expires_at is None:
+            return False
+        if expires_at <= time.monotonic():
+            del self._oversized[organization_id]
+            return False
+        return True
+
+    def invalidate(self, organization_id: int) -> None:
+        item = self._data.pop(organization_id, None)
+        if item is not None:
+            self.size -= len(item[1])
+
+    def clear(self) -> None:
+        self._data.clear()
+        self._oversized.clear()
+        self.size = 0
+        self.hits = 0
+        self.misses = 0
+
+    def _evict(self) -> None:
+        while self.size > self.max_items and self._data:
+            _, (_, index) = self._data.popitem(last=False)
+            self.size -= len(index)
+
+    def stats(self) -> dict:
+        """Счётчики попаданий и промахов."""
+        total = self.hits + self.misses
+        return {
+            "organizations": len(self._data),
+            "oversized": len(self._oversized),
+            "size": self.size,
+            "max_items": self.max_items,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_ratio": round(self.hits / total, 4) if total else None,
+        }
+
+
+def filters_key(filters: dict) -> str:
+    """Короткий устойчивый ключ набора фильтров списка."""
+    raw = json.dumps(filters, sort_keys=True, default=str)
+    return hashlib.sha1(raw.encode()).hexdigest()
+
+
+def snapshot(instance) -> dict:
+    """Значения колонок ORM-объекта, пригодные для хранения в кэше."""
+    mapper = inspect(instance).mapper
+    return {
+        attr.key: getattr(instance, attr.key)
+        for attr in mapper.column_attrs
+    }
+
+
+def restore(model, data: dict):
+    """
+    Собрать из снимка detached-объект модели.
+
+    Объект не привязан ни к одной сессии и не приводит к запросам в БД.
+    """
+    instance = model(**data)
+    make_transient_to_detached(instance)
+    return instance
+
+
+# Кэш аутентификации: ключ (user_id, None) — пользователь,
+# (user_id, organization_id) — членство в организации.
+auth_cache = TTLCache(
+    maxsize=settings.AUTH_CACHE_MAX_SIZE,
+    ttl=settings.AUTH_CACHE_TTL_SECONDS,
+)
+
+# Ключ Session.info с пользователями, чьи записи auth_cache нужно
+# сбросить после коммита.
+PENDING_AUTH_INVALIDATIONS = "auth_invalidations"
+
+
+def invalidate_auth_on_commit(session, user_id: int) -> None:
+    """
+    Сбросить пользователя и его членства в auth_cache сейчас и ещё раз
+    после коммита session: запрос, прочитавший старую строку между
+    flush и коммитом, мог снова положить её в кэш.
+    """
+    auth_cache.invalidate_where(lambda key: key[0] == user_id)
+    if session is not None:
+        session.info.setdefault(PENDING_AUTH_INVALIDATIONS, set()).add(
+            user_id
+        )
+
+
+def flush_auth_invalidations(session, committed: bool) -> None:
+    """Выполнить отложенные до коммита сбросы auth_cache."""
+    pending = session.info.pop(PENDING_AUTH_INVALIDATIONS, ())
+    if not committed:
+        return
+    for user_id in pending:
+        invalidate_auth_on_commit(None, user_id)
+
+
+# Итоги списков для X-Total-Count: ключ (таблица, organization_id,
+# режим подсчёта, filters_key(фильтры)).
+count_cache = TTLCache(
+    maxsize=settings.COUNT_CACHE_MAX_SIZE,
+    ttl=settings.COUNT_CACHE_TTL_SECONDS,
+)
+
+
+def invalidate_counts(table: str, organization_id: int) -> None:
+    """Сбросить кэшированные итоги списка table организации."""
+    count_cache.invalidate_where(
+        lambda key: key[0] == table and key[1] == organization_id
+    )
+
+
+# Префиксные индексы контактов для подсказок: ключ — organization_id.
+contact_suggest_index = PrefixIndexCache(
+    max_items=settings.CONTACT_SUGGEST_MAX_ITEMS,
+    ttl=settings.CONTACT_SUGGEST_TTL_SECONDS,
+)
+
+# Ключ Session.info с изменениями индексов подсказок до коммита.
+PENDING_SUGGEST_CHANGES = "contact_suggest_changes"
+
+
+def add_contact_suggestion_on_commit(
+    session,
+    organization_id: int,
+    item_id: int,
+    owner_id: int,
+    name: str,
+    email: str,
+) -> None:
+    """
+    Добавить контакт в индекс подсказок после коммита session:
+    откаченная транзакция не оставляет в индексе несуществующий контакт.
+    """
+    session.info.setdefault(PENDING_SUGGEST_CHANGES, []).append(
+        (organization_id, (item_id, owner_id, name, email))
+    )
+
+
+def invalidate_contact_suggestions_on_commit(
+    session,
+    organization_id: int
+) -> None:
+    """
+    Сбросить индекс подсказок организации сейчас и ещё раз после
+    коммита: запрос, прочитавший контакты до коммита, мог успеть
+    построить индекс по старым данным.
+    """
+    contact_suggest_index.invalidate(organization_id)
+    if session is not None:
+        session.info.setdefault(PENDING_SUGGEST_CHANGES, []).append(
+            (organization_id, None)
+        )
+
+
+def flush_contact_suggest_changes(session, committed: bool) -> None:
+    """Применить отложенные до коммита изменения индексов подсказок."""
+    pending = session.info.pop(PENDING_SUGGEST_CHANGES, ())
+    if not committed:
+        return
+    for organization_id, item in pending:
+        if item is None:
+            contact_suggest_index.invalidate(organization_id)
+        else:
+            contact_suggest_index.add(organization_id, *item)
+
+
+# Контакты по номеру телефона: ключ (organization_id, phone_normalized),
+# значение — {owner_id или None: непустой список контактов}.
+contact_phone_cache = TTLCache(
+    maxsize=settings.CONTACT_PHONE_CACHE_MAX_SIZE,
+    ttl=settings.CONTACT_PHONE_CACHE_TTL_SECONDS,
+)
+
+
+# Ключ Session.info с номерами, которые нужно сбросить после коммита.
+PENDING_PHONE_INVALIDATIONS = "contact_phone_invalidations"
+
+
+def invalidate_contact_phones(organization_id: int) -> None:
+    """Сбросить кэшированные номера телефонов организации."""
+    contact_phone_cache.invalidate_where(
+        lambda key: key[0] == organization_id
+    )
+
+
+def invalidate_contact_phone_on_commit(
+    session,
+    organization_id: int,
+    phone_normalized: Optional[str] = None,
+) -> None:
+    """
+    Сбросить номер (без phone_normalized — все номера организации)
+    сейчас и ещё раз после коммита session: запрос, прочитавший данные
+    до коммита, мог успеть положить в кэш старый результат.
+    """
+    if phone_normalized is None:
+        invalidate_contact_phones(organization_id)
+    else:
+        contact_phone_cache.invalidate((organization_id, phone_normalized))
+    if session is not None:
+        session.info.setdefault(PENDING_PHONE_INVALIDATIONS, set()).add(
+            (organization_id, phone_normalized)
+        )
+
+
+def flush_contact_phone_invalidations(session, committed: bool) -> None:
+    """Выполнить отложенные до коммита сбросы номеров сессии."""
+    pending = session.info.pop(PENDING_PHONE_INVALIDATIONS, ())
+    if not committed:
+        return
+    for organization_id, phone_normalized in pending:
+        invalidate_contact_phone_on_commit(
+            None,
+            organization_id,
+            phone_normalized
+        )
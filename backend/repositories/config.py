@@ -11,15 +11,108 @@ class Settings:
     ACCESS_TOKEN_EXPIRE_MINUTES: int = int(
         os.getenv("ACCESS_TOKEN_EXPIRE_MINUTES", 60)
     )
+    ACCESS_TOKEN_MEMBERSHIP_CLAIMS: bool = os.getenv(
+        'ACCESS_TOKEN_MEMBERSHIP_CLAIMS', 'false'
+    ).lower() in ('1', 'true', 'yes')
     DB_HOST: str = os.getenv('DB_HOST', 'localhost')
     DB_PORT: str = os.getenv('DB_PORT', '5432')
     DB_USER: str = os.getenv('POSTGRES_USER', 'postgres')
     DB_PASS: str = os.getenv('POSTGRES_PASSWORD', 'password')
     DB_NAME: str = os.getenv('POSTGRES_DB', 'crm_db')
+    DB_REPLICA_HOST: str = os.getenv('DB_REPLICA_HOST', '')
+    DB_REPLICA_PORT: str = os.getenv('DB_REPLICA_PORT', DB_PORT)
+    REPLICA_STICKINESS_SECONDS: float = float(
+        os.getenv('REPLICA_STICKINESS_SECONDS', 5)
+    )
+    DB_POOL_SIZE: int = int(os.getenv('DB_POOL_SIZE', 5))
+    DB_MAX_OVERFLOW: int = int(os.getenv('DB_MAX_OVERFLOW', 10))
+    DB_POOL_TIMEOUT: float = float(os.getenv('DB_POOL_TIMEOUT', 30))
+    DB_POOL_RECYCLE: int = int(os.getenv('DB_POOL_RECYCLE', 1800))
+    DB_POOL_PRE_PING: bool = os.getenv(
+        'DB_POOL_PRE_PING', 'false'
+    ).lower() in ('1', 'true', 'yes')
+    DB_STATEMENT_CACHE_SIZE: int = int(
+        os.getenv('DB_STATEMENT_CACHE_SIZE', 100)
+    )
+    DB_PGBOUNCER: bool = os.getenv(
+        'DB_PGBOUNCER', 'false'
+    ).lower() in ('1', 'true', 'yes')
+    BCRYPT_ROUNDS: int = int(os.getenv('BCRYPT_ROUNDS', 12))
+    PASSWORD_HASH_WORKERS: int = int(os.getenv('PASSWORD_HASH_WORKERS', 4))
+    PASSWORD_HASH_QUEUE_LIMIT: int = int(
+        os.getenv('PASSWORD_HASH_QUEUE_LIMIT', 64)
+    )
+    REFRESH_TOKEN_REAPER_INTERVAL_SECONDS: float = float(
+        os.getenv('REFRESH_TOKEN_REAPER_INTERVAL_SECONDS', 3600)
+    )
+    REFRESH_TOKEN_REAPER_BATCH_SIZE: int = int(
+        os.getenv('REFRESH_TOKEN_REAPER_BATCH_SIZE', 1000)
+    )
+    REFRESH_TOKEN_REAPER_PAUSE_SECONDS: float = float(
+        os.getenv('REFRESH_TOKEN_REAPER_PAUSE_SECONDS', 0.1)
+    )
+    # Токен служебных эндпоинтов (/system/*) для мониторинга; пока он
+    # не задан, эндпоинты недоступны.
+    SYSTEM_OPS_TOKEN: str = os.getenv('SYSTEM_OPS_TOKEN', '')
+    AUTH_CACHE_MAX_SIZE: int = int(os.getenv('AUTH_CACHE_MAX_SIZE', 10000))
+    AUTH_CACHE_TTL_SECONDS: float = float(
+        os.getenv('AUTH_CACHE_TTL_SECONDS', 30)
+    )
+    COUNT_CACHE_MAX_SIZE: int = int(os.getenv('COUNT_CACHE_MAX_SIZE', 1000))
+    COUNT_CACHE_TTL_SECONDS: float = float(
+        os.getenv('COUNT_CACHE_TTL_SECONDS', 10)
+    )
+    COUNT_ESTIMATE_CAP: int = int(os.getenv('COUNT_ESTIMATE_CAP', 10000))
+    CONTACT_IMPORT_BATCH_SIZE: int = int(
+        os.getenv('CONTACT_IMPORT_BATCH_SIZE', 5000)
+    )
+    CONTACT_IMPORT_MAX_ERRORS: int = int(
+        os.getenv('CONTACT_IMPORT_MAX_ERRORS', 1000)
+    )
+    CONTACT_SEARCH_MIN_LENGTH: int = int(
+        os.getenv('CONTACT_SEARCH_MIN_LENGTH', 3)
+    )
+    CONTACT_SUGGEST_MAX_ITEMS: int = int(
+        os.getenv('CONTACT_SUGGEST_MAX_ITEMS', 200000)
+    )
+    CONTACT_SUGGEST_TTL_SECONDS: float = float(
+        os.getenv('CONTACT_SUGGEST_TTL_SECONDS', 600)
+    )
+    CONTACT_PHONE_CACHE_MAX_SIZE: int = int(
+        os.getenv('CONTACT_PHONE_CACHE_MAX_SIZE', 50000)
+    )
+    CONTACT_PHONE_CACHE_TTL_SECONDS: float = float(
+        os.getenv('CONTACT_PHONE_CACHE_TTL_SECONDS', 300)
+    )
+    CONTACT_PHONE_LOOKUP_LIMIT: int = int(
+        os.getenv('CONTACT_PHONE_LOOKUP_LIMIT', 20)
+    )
+    CONTACT_DEDUP_MAX_BLOCK_SIZE: int = int(
+        os.getenv('CONTACT_DEDUP_MAX_BLOCK_SIZE', 100)
+    )
+    CONTACT_DEDUP_MIN_SCORE: float = float(
+        os.getenv('CONTACT_DEDUP_MIN_SCORE', 0.7)
+    )
+    SEARCH_MIN_LENGTH: int = int(os.getenv('SEARCH_MIN_LENGTH', 2))
+    SEARCH_MAX_TERMS: int = int(os.getenv('SEARCH_MAX_TERMS', 8))
+    DEAL_BATCH_MAX_SIZE: int = int(os.getenv('DEAL_BATCH_MAX_SIZE', 500))
+    ACTIVITY_FEED_OVERLAP_SECONDS: float = float(
+        os.getenv('ACTIVITY_FEED_OVERLAP_SECONDS', 60)
+    )
+    ACTIVITY_FEED_SEEN_LIMIT: int = int(
+        os.getenv('ACTIVITY_FEED_SEEN_LIMIT', 500)
+    )
+    TASK_BATCH_MAX_SIZE: int = int(os.getenv('TASK_BATCH_MAX_SIZE', 500))
 
     @property
     def database_url(self) -> str:
         return f'postgresql+asyncpg://{self.DB_USER}:{self.DB_PASS}@{self.DB_HOST}:{self.DB_PORT}/{self.DB_NAME}'
 
+    @property
+    def replica_database_url(self) -> str | None:
+        if not self.DB_REPLICA_HOST:
+            return None
+        return f'postgresql+asyncpg://{self.DB_USER}:{self.DB_PASS}@{self.DB_REPLICA_HOST}:{self.DB_REPLICA_PORT}/{self.DB_NAME}'
+
 
 settings = Settings()
@@ -1,11 +1,63 @@
-from typing import Sequence
+import time
+from typing import Optional, Sequence
 
-from sqlalchemy import select, or_
+from sqlalchemy import (
+    Boolean,
+    Select,
+    String,
+    asc,
+    column,
+    desc,
+    func,
+    literal,
+    literal_column,
+    or_,
+    select,
+    table,
+    text,
+    union_all,
+)
+from sqlalchemy.dialects.postgresql import ARRAY, insert
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from models import (
     ContactModel,
 )
+from .pagination import (
+    count_rows,
+    make_cursor,
+    parse_cursor,
+    seek_condition,
+)
+
+
+# Временная таблица, через которую COPY загружает импортируемые контакты.
+IMPORT_STAGING = table(
+    "contacts_import",
+    column("name"),
+    column("email"),
+    column("phone"),
+    column("phone_normalized"),
+)
+
+# Колонки, по которым разрешена сортировка списка контактов.
+CONTACT_ORDER_COLUMNS = {
+    "name": ContactModel.name,
+    "created_at": ContactModel.created_at,
+}
+
+# Колонки поиска; при наличии pg_trgm их обслуживают GIN-индексы.
+CONTACT_SEARCH_COLUMNS = (
+    ContactModel.name,
+    ContactModel.email,
+    ContactModel.phone,
+)
+
+# Как часто перепроверять, установлено ли в базе расширение pg_trgm:
+# процесс, запущенный до миграции, включает trigram-поиск без рестарта.
+TRIGRAM_CHECK_INTERVAL_SECONDS = 60
+# (момент проверки по time.monotonic(), установлено ли pg_trgm).
+_trigram_state: Optional[tuple[float, bool]] = None
 
 
 class ContactsRepository:
@@ -14,20 +66,42 @@ class ContactsRepository:
 
     async def create(self, contact: ContactModel) -> ContactModel:
         self.session.add(contact)
-        await self.session.commit()
-        await self.session.refresh(contact)
+        await self.session.flush()
         return contact
 
-    async def get_contacts_by_user(
+    async def trigram_enabled(self) -> bool:
+        """
+        Доступны ли в базе операторы и индексы pg_trgm; результат
+        перепроверяется раз в TRIGRAM_CHECK_INTERVAL_SECONDS.
+        """
+        global _trigram_state
+        now = time.monotonic()
+        if (
+            _trigram_state is None
+            or now - _trigram_state[0] >= TRIGRAM_CHECK_INTERVAL_SECONDS
+        ):
+            result = await self.session.execute(text(
+                "SELECT EXISTS "
+                "(SELECT 1 FROM pg_extension WHERE extname = 'pg_trgm')"
+            ))
+            _trigram_state = (now, result.scalar_one())
+        return _trigram_state[1]
+
+    def _filtered_contacts_query(
         self,
         organization_id: int,
         user_id: int,
         search: str | None = None,
         owner_id: int | None = None,
-        limit: int = 20,
-        offset: int = 0
-    ) -> Sequence[ContactModel]:
-        """Получить список контактов, в которых состоит пользователь."""
+        trigram: bool = False,
+    ) -> Select:
+        """
+        Запрос контактов организации с фильтрами списка.
+
+        search ищется подстрокой в имени, email и телефоне; с trigram
+        имя дополнительно сравнивается по похожести слов (оператор %>),
+        что находит контакты и при опечатке в запросе.
+        """
         query = select(ContactModel).where(
             ContactModel.organization_id == organization_id
         )
@@ -36,12 +110,291 @@ class ContactsRepository:
         else:
             query = query.where(ContactModel.owner_id == user_id)
         if search:
-            query = query.where(
-                or_(
-                    ContactModel.name.ilike(f"%{search}%"),
-                    ContactModel.email.ilike(f"%{search}%"),
+            conditions = [
+                column.ilike(f"%{search}%")
+                for column in CONTACT_SEARCH_COLUMNS
+            ]
+            if trigram:
+                conditions.append(ContactModel.name.op("%>")(search))
+            query = query.where(or_(*conditions))
+        return query
+
+    async def get_contacts_by_user(
+        self,
+        organization_id: int,
+        user_id: int,
+        search: str | None = None,
+        owner_id: int | None = None,
+        limit: int = 20,
+        offset: int = 0,
+        order_by: str = "name",
+        order: str = "asc",
+        cursor: tuple | None = None,
+    ) -> Sequence[ContactModel]:
+        """
+        Получить список контактов, в которых состоит пользователь.
+
+        Контакты упорядочены по (order_by, id); с курсором страница
+        начинается сразу после контакта из курсора и offset не нужен.
+        order_by=relevance с search ранжирует по похожести на запрос
+        (при наличии pg_trgm) и листается только через offset.
+        """
+        trigram = bool(search) and await self.trigram_enabled()
+        query = self._filtered_contacts_query(
+            organization_id=organization_id,
+            user_id=user_id,
+            search=search,
+            owner_id=owner_id,
+            trigram=trigram,
+        )
+        if order_by == "relevance" and search:
+            if trigram:
+                query = query.order_by(
+                    func.greatest(*(
+                        func.word_similarity(search, column)
+                        for column in CONTACT_SEARCH_COLUMNS
+                    )).desc().nulls_last()
                 )
-            )
-        query = query.offset(offset).limit(limit)
+            query = query.order_by(
+                ContactModel.name,
+                ContactModel.id
+            ).offset(offset).limit(limit)
+            result = await self.session.execute(query)
+            return result.scalars().all()
+        order_column = CONTACT_ORDER_COLUMNS.get(order_by, ContactModel.name)
+        descending = order == "desc"
+        if cursor is not None:
+            query = query.where(seek_condition(
+                (order_column, ContactModel.id),
+                cursor,
+                descending,
+            ))
+        else:
+            query = query.offset(offset)
+        direction = desc if descending else asc
+        query = query.order_by(
+            direction(order_column),
+            direction(ContactModel.id)
+        ).limit(limit)
         result = await self.session.execute(query)
         return result.scalars().all()
+
+    async def count_contacts(
+        self,
+        organization_id: int,
+        user_id: int,
+        search: str | None = None,
+        owner_id: int | None = None,
+        cap: int | None = None,
+    ) -> int:
+        """Число контактов списка с теми же фильтрами."""
+        return await count_rows(
+            self.session,
+            self._filtered_contacts_query(
+                organization_id=organization_id,
+                user_id=user_id,
+                search=search,
+                owner_id=owner_id,
+                trigram=bool(search) and await self.trigram_enabled(),
+            ),
+            cap
+        )
+
+    async def get_suggest_rows(
+        self,
+        organization_id: int,
+        limit: int
+    ) -> Sequence[tuple]:
+        """(id, owner_id, name, email) контактов организации для подсказок."""
+        result = await self.session.execute(
+            select(
+                ContactModel.id,
+                ContactModel.owner_id,
+                ContactModel.name,
+                ContactModel.email,
+            ).where(
+                ContactModel.organization_id == organization_id
+            ).limit(limit)
+        )
+        return result.tuples().all()
+
+    async def suggest_contacts(
+        self,
+        organization_id: int,
+        prefix: str,
+        limit: int,
+        owner_id: int | None = None,
+    ) -> Sequence[tuple]:
+        """
+        (id, name, email) контактов, имя или email которых начинается
+        с prefix; запрос для организаций вне кэша подсказок.
+
+        Как и префиксный индекс в памяти, контакты упорядочены по
+        совпавшему ключу. Имя и email ищутся отдельными ветками UNION
+        ALL, каждая читает не больше limit строк по
+        ix_contacts_org_lower_name или ix_contacts_org_lower_email.
+        Совпадение со словом в середине имени требует LIKE '% prefix%'
+        и проверяется, только если есть trigram-индекс
+        ix_contacts_name_trgm.
+        """
+        prefix = prefix.lower()
+        matches = [
+            (key, key.startswith(prefix, autoescape=True))
+            for key in (
+                func.lower(ContactModel.name).collate("C"),
+                func.lower(ContactModel.email).collate("C"),
+            )
+        ]
+        if await self.trigram_enabled():
+            matches.append((
+                func.lower(ContactModel.name).collate("C"),
+                ContactModel.name.icontains(" " + prefix, autoescape=True),
+            ))
+        branches = []
+        for key, condition in matches:
+            branch = select(
+                ContactModel.id,
+                ContactModel.name,
+                ContactModel.email,
+                key.label("key"),
+            ).where(
+                ContactModel.organization_id == organization_id,
+                condition,
+            )
+            if owner_id is not None:
+                branch = branch.where(ContactModel.owner_id == owner_id)
+            branches.append(branch.order_by(key, ContactModel.id).limit(limit))
+        found = union_all(*branches).subquery()
+        result = await self.session.execute(
+            select(found.c.id, found.c.name, found.c.email).order_by(
+                found.c.key,
+                found.c.id
+            )
+        )
+        contacts: dict[int, tuple] = {}
+        for row in result.tuples():
+            contacts.setdefault(row[0], row)
+            if len(contacts) == limit:
+                break
+        return list(contacts.values())
+
+    async def get_by_phone(
+        self,
+        organization_id: int,
+        phone_normalized: str,
+        limit: int,
+        owner_id: int | None = None,
+    ) -> Sequence[ContactModel]:
+        """
+        Контакты организации с номером phone_normalized
+        (индекс ix_contacts_organization_phone_normalized);
+        с owner_id — только контакты этого владельца.
+        """
+        query = select(ContactModel).where(
+            ContactModel.organization_id == organization_id,
+            ContactModel.phone_normalized == phone_normalized,
+        )
+        if owner_id is not None:
+            query = query.where(ContactModel.owner_id == owner_id)
+        result = await self.session.execute(
+            query.order_by(ContactModel.id).limit(limit)
+        )
+        return result.scalars().all()
+
+    @staticmethod
+    def make_cursor(contact: ContactModel, order_by: str, order: str) -> str:
+        """Курсор, указывающий на позицию сразу после контакта."""
+        return make_cursor(
+            contact,
+            CONTACT_ORDER_COLUMNS.get(order_by, ContactModel.name),
+            order == "desc"
+        )
+
+    @staticmethod
+    def parse_cursor(cursor: str, order_by: str, order: str) -> tuple:
+        """Разобрать курсор и проверить, что он выдан для той же сортировки."""
+        return parse_cursor(
+            cursor,
+            CONTACT_ORDER_COLUMNS.get(order_by, ContactModel.name),
+            order == "desc"
+        )
+
+    async def create_import_staging(self) -> None:
+        """Создать временную таблицу импорта в текущей транзакции."""
+        await self.session.execute(text(
+            "CREATE TEMP TABLE contacts_import "
+            "(name varchar, email varchar, phone varchar, "
+            "phone_normalized varchar) ON COMMIT DROP"
+        ))
+
+    async def copy_to_import_staging(self, records: list[tuple]) -> None:
+        """
+        Загрузить пачку (name, email, phone, phone_normalized)
+        во временную таблицу COPY.
+        """
+        connection = await self.session.connection()
+        raw_connection = await connection.get_raw_connection()
+        await raw_connection.driver_connection.copy_records_to_table(
+            IMPORT_STAGING.name,
+            records=records,
+            columns=[c.name for c in IMPORT_STAGING.columns],
+        )
+
+    async def merge_import_staging(
+        self,
+        organization_id: int,
+        owner_id: int,
+        own_only: bool = False,
+    ) -> tuple[int, int, list[str]]:
+        """
+        Перенести контакты из временной таблицы одним INSERT.
+
+        Существующий в организации email обновляет имя и телефон
+        контакта (ON CONFLICT по uq_organization_contact_email); с
+        own_only обновляются только контакты owner_id. Возвращает число
+        добавленных и обновлённых контактов и email строк, которые не
+        применены из-за чужого контакта с тем же email.
+        """
+        stmt = insert(ContactModel).from_select(
+            ["owner_id", "organization_id", "name", "email", "phone",
+             "phone_normalized", "created_at"],
+            select(
+                literal(owner_id),
+                literal(organization_id),
+                IMPORT_STAGING.c.name,
+                IMPORT_STAGING.c.email,
+                IMPORT_STAGING.c.phone,
+                IMPORT_STAGING.c.phone_normalized,
+                func.now(),
+            )
+        )
+        merged = stmt.on_conflict_do_update(
+            constraint="uq_organization_contact_email",
+            set_={
+                "name": stmt.excluded.name,
+                "phone": stmt.excluded.phone,
+                "phone_normalized": stmt.excluded.phone_normalized,
+            },
+            where=ContactModel.owner_id == owner_id if own_only else None,
+        ).returning(
+            ContactModel.email,
+            literal_column("xmax = 0", Boolean).label("inserted"),
+        ).cte("merged")
+        skipped = select(
+            func.coalesce(
+                func.array_agg(IMPORT_STAGING.c.email),
+                literal([], ARRAY(String)),
+            )
+        ).where(
+            IMPORT_STAGING.c.email.not_in(select(merged.c.email))
+        ).scalar_subquery()
+        result = await self.session.execute(
+            select(
+                func.count().filter(merged.c.inserted),
+                func.count().filter(~merged.c.inserted),
+                skipped,
+            )
+        )
+        inserted, updated, skipped = result.one()
+        await self.session.execute(text("DROP TABLE contacts_import"))
+        return inserted, updated, skipped
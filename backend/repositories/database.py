@@ -1,12 +1,113 @@
+import time
+from uuid import uuid4
+
+from sqlalchemy.exc import TimeoutError as PoolTimeoutError
 from sqlalchemy.ext.asyncio import create_async_engine, async_sessionmaker
 from sqlalchemy.orm import DeclarativeBase
+from sqlalchemy.pool import AsyncAdaptedQueuePool
 
 from .config import settings
 
 
 class Base(DeclarativeBase):
-    pass
+    # Значения по умолчанию на стороне БД (created_at, updated_at и т.п.)
+    # возвращаются тем же INSERT/UPDATE через RETURNING, без SELECT.
+    __mapper_args__ = {"eager_defaults": True}
+
+
+class InstrumentedQueuePool(AsyncAdaptedQueuePool):
+    """
+    Пул соединений, считающий ожидания свободного соединения.
+
+    Ожиданием считается запрос соединения в момент, когда все
+    pool_size + max_overflow соединений уже выданы.
+    """
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.checkouts = 0
+        self.waits = 0
+        self.wait_seconds = 0.0
+        self.max_wait_seconds = 0.0
+        self.timeouts = 0
+
+    def _do_get(self):
+        self.checkouts += 1
+        exhausted = (
+            self._max_overflow > -1
+            and self.checkedout() >= self.size() + self._max_overflow
+        )
+        started = time.perf_counter()
+        try:
+            return super()._do_get()
+        except PoolTimeoutError:
+            self.timeouts += 1
+            raise
+        finally:
+            if exhausted:
+                elapsed = time.perf_counter() - started
+                self.waits += 1
+                self.wait_seconds += elapsed
+                self.max_wait_seconds = max(self.max_wait_seconds, elapsed)
 
+    def snapshot(self) -> dict:
+        return {
+            "size": self.size(),
+            "max_overflow": self._max_overflow,
+            "checked_out": self.checkedout(),
+            "checked_in": self.checkedin(),
+            "overflow": self.overflow(),
+            "checkouts": self.checkouts,
+            "waits": self.waits,
+            "wait_seconds": round(self.wait_seconds, 3),
+            "max_wait_seconds": round(self.max_wait_seconds, 3),
+            "timeouts": self.timeouts,
+        }
 
-engine = create_async_engine(settings.database_url)
+
+def engine_options() -> dict:
+    """Параметры пула и драйвера asyncpg из настроек."""
+    connect_args = {
+        "prepared_statement_cache_size": settings.DB_STATEMENT_CACHE_SIZE,
+    }
+    if settings.DB_PGBOUNCER:
+        # В transaction-режиме PgBouncer подготовленные выражения
+        # не переживают транзакцию: кэши отключаются, имена уникальны.
+        connect_args = {
+            "statement_cache_size": 0,
+            "prepared_statement_cache_size": 0,
+            "prepared_statement_name_func": lambda: f"__asyncpg_{uuid4()}__",
+        }
+    return {
+        "poolclass": InstrumentedQueuePool,
+        "pool_size": settings.DB_POOL_SIZE,
+        "max_overflow": settings.DB_MAX_OVERFLOW,
+        "pool_timeout": settings.DB_POOL_TIMEOUT,
+        "pool_recycle": settings.DB_POOL_RECYCLE,
+        "pool_pre_ping": settings.DB_POOL_PRE_PING,
+        "connect_args": connect_args,
+    }
+
+
+engine = create_async_engine(settings.database_url, **engine_options())
 session_factory = async_sessionmaker(engine, expire_on_commit=False)
+
+# Реплика для читающих запросов. Без DB_REPLICA_HOST чтение идёт в primary.
+replica_engine = (
+    create_async_engine(settings.replica_database_url, **engine_options())
+    if settings.replica_database_url
+    else None
+)
+replica_session_factory = (
+    async_sessionmaker(replica_engine, expire_on_commit=False)
+    if replica_engine is not None
+    else session_factory
+)
+
+
+def pool_snapshot() -> dict:
+    """Текущее состояние пулов соединений процесса."""
+    snapshot = engine.pool.snapshot()
+    if replica_engine is not None:
+        snapshot["replica"] = replica_engine.pool.snapshot()
+    return snapshot
@@ -1,7 +1,20 @@
 from datetime import datetime, timedelta
-from typing import Optional, Sequence
+from typing import AsyncIterator, Optional, Sequence
 
-from sqlalchemy import asc, desc, select, false, func
+from sqlalchemy import (
+    Integer,
+    Select,
+    any_,
+    asc,
+    desc,
+    false,
+    func,
+    insert,
+    literal,
+    select,
+    update,
+)
+from sqlalchemy.dialects.postgresql import ARRAY
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from models import (
@@ -9,6 +22,25 @@ from models import (
     ContactModel,
 )
 from models.constants import MemberRole, StatusDeal, StageDeal
+from .pagination import (
+    STREAM_YIELD_PER,
+    count_rows,
+    make_cursor,
+    parse_cursor,
+    seek_condition,
+)
+
+
+# Колонки, по которым разрешена сортировка списка сделок.
+DEAL_ORDER_COLUMNS = {
+    "created_at": DealModel.created_at,
+    "updated_at": DealModel.updated_at,
+    "amount": DealModel.amount,
+    "title": DealModel.title,
+    "status": DealModel.status,
+    "stage": DealModel.stage,
+    "id": DealModel.id,
+}
 
 
 class DealsRepository:
@@ -17,10 +49,24 @@ class DealsRepository:
 
     async def create(self, deal: DealModel) -> DealModel:
         self.session.add(deal)
-        await self.session.commit()
-        await self.session.refresh(deal)
+        await self.session.flush()
         return deal
 
+    async def create_many(self, values: list[dict]) -> Sequence[DealModel]:
+        """
+        Добавить сделки одним многострочным INSERT ... RETURNING.
+
+        Сделки возвращаются в порядке values.
+        """
+        result = await self.session.scalars(
+            insert(DealModel).returning(
+                DealModel,
+                sort_by_parameter_order=True
+            ),
+            values
+        )
+        return result.all()
+
     async def get_by_id(
         self,
         deal_id: int
@@ -34,10 +80,31 @@ class DealsRepository:
 
     async def update(self, deal: DealModel) -> DealModel:
         self.session.add(deal)
-        await self.session.commit()
-        await self.session.refresh(deal)
+        await self.session.flush()
         return deal
 
+    async def get_by_ids_for_update(
+        self,
+        deal_ids: list[int],
+        org_id: int
+    ) -> dict[int, DealModel]:
+        """Сделки организации по id, заблокированные до конца транзакции."""
+        result = await self.session.execute(
+            select(DealModel).where(
+                DealModel.id == any_(literal(deal_ids, ARRAY(Integer))),
+                DealModel.organization_id == org_id
+            ).order_by(DealModel.id).with_for_update()
+        )
+        return {deal.id: deal for deal in result.scalars()}
+
+    async def update_many(self, deal_ids: list[int], **values) -> None:
+        """Одним UPDATE присвоить сделкам deal_ids одинаковые значения."""
+        await self.session.execute(
+            update(DealModel)
+            .where(DealModel.id == any_(literal(deal_ids, ARRAY(Integer))))
+            .values(**values)
+        )
+
     async def get_contact_in_org(self, contact_id: int, org_id: int):
         """Проверка, что контакт принадлежит организации."""
         result = await self.session.execute(
@@ -48,22 +115,34 @@ class DealsRepository:
         )
         return result.scalar_one_or_none()
 
-    async def get_deals(
+    async def get_contact_ids_in_org(
+        self,
+        contact_ids: list[int],
+        org_id: int
+    ) -> set[int]:
+        """Те из contact_ids, что принадлежат организации."""
+        result = await self.session.execute(
+            select(ContactModel.id).where(
+                ContactModel.id == any_(
+                    literal(contact_ids, ARRAY(Integer))
+                ),
+                ContactModel.organization_id == org_id
+            )
+        )
+        return set(result.scalars())
+
+    def _filtered_deals_query(
         self,
         organization_id: int,
         user_id: int,
-        page: int,
-        page_size: int,
-        status: Optional[list[str]],
-        min_amount: Optional[float],
-        max_amount: Optional[float],
-        stage: Optional[str],
-        owner_id: Optional[int],
-        order_by: str,
-        order: str,
         user_role: str,
-    ) -> Sequence[DealModel]:
-        """Получить список сделок, в которых состоит пользователь."""
+        status: Optional[list[str]] = None,
+        min_amount: Optional[float] = None,
+        max_amount: Optional[float] = None,
+        stage: Optional[str] = None,
+        owner_id: Optional[int] = None,
+    ) -> Select:
+        """Запрос сделок организации с фильтрами списка."""
         stmt = select(DealModel).where(
             DealModel.organization_id == organization_id
         )
@@ -88,14 +167,144 @@ class DealsRepository:
                 stmt = stmt.where(DealModel.stage == parsed_stage)
             except ValueError:
                 stmt = stmt.where(false())
-        order_column = getattr(DealModel, order_by, DealModel.created_at)
-        stmt = stmt.order_by(
-            desc(order_column) if order == "desc" else asc(order_column)
+        return stmt
+
+    async def get_deals(
+        self,
+        organization_id: int,
+        user_id: int,
+        page: int,
+        page_size: int,
+        status: Optional[list[str]],
+        min_amount: Optional[float],
+        max_amount: Optional[float],
+        stage: Optional[str],
+        owner_id: Optional[int],
+        order_by: str,
+        order: str,
+        user_role: str,
+        cursor: Optional[tuple] = None,
+    ) -> Sequence[DealModel]:
+        """
+        Получить список сделок, в которых состоит пользователь.
+
+        С курсором страница начинается сразу после сделки из курсора
+        и page не используется.
+        """
+        stmt = self._filtered_deals_query(
+            organization_id=organization_id,
+            user_id=user_id,
+            user_role=user_role,
+            status=status,
+            min_amount=min_amount,
+            max_amount=max_amount,
+            stage=stage,
+            owner_id=owner_id,
         )
-        stmt = stmt.offset((page - 1) * page_size).limit(page_size)
+        order_column = DEAL_ORDER_COLUMNS.get(order_by, DealModel.created_at)
+        descending = order == "desc"
+        if cursor is not None:
+            stmt = stmt.where(seek_condition(
+                (order_column, DealModel.id),
+                cursor,
+                descending,
+            ))
+        else:
+            stmt = stmt.offset((page - 1) * page_size)
+        direction = desc if descending else asc
+        stmt = stmt.order_by(
+            direction(order_column),
+            direction(DealModel.id)
+        ).limit(page_size)
         result = await self.session.execute(stmt)
         return result.scalars().all()
 
+    async def stream_deals(
+        self,
+        organization_id: int,
+        user_id: int,
+        user_role: str,
+        status: Optional[list[str]] = None,
+        min_amount: Optional[float] = None,
+        max_amount: Optional[float] = None,
+        stage: Optional[str] = None,
+        owner_id: Optional[int] = None,
+        order_by: str = "created_at",
+        order: str = "desc",
+    ) -> AsyncIterator[DealModel]:
+        """
+        Все сделки списка одним запросом через серверный курсор.
+
+        Фильтры и видимость те же, что у get_deals; строки читаются
+        пачками по STREAM_YIELD_PER.
+        """
+        stmt = self._filtered_deals_query(
+            organization_id=organization_id,
+            user_id=user_id,
+            user_role=user_role,
+            status=status,
+            min_amount=min_amount,
+            max_amount=max_amount,
+            stage=stage,
+            owner_id=owner_id,
+        )
+        order_column = DEAL_ORDER_COLUMNS.get(order_by, DealModel.created_at)
+        direction = desc if order == "desc" else asc
+        result = await self.session.stream_scalars(
+            stmt.order_by(
+                direction(order_column),
+                direction(DealModel.id)
+            ).execution_options(yield_per=STREAM_YIELD_PER)
+        )
+        async for deal in result:
+            yield deal
+
+    async def count_deals(
+        self,
+        organization_id: int,
+        user_id: int,
+        user_role: str,
+        status: Optional[list[str]] = None,
+        min_amount: Optional[float] = None,
+        max_amount: Optional[float] = None,
+        stage: Optional[str] = None,
+        owner_id: Optional[int] = None,
+        cap: Optional[int] = None,
+    ) -> int:
+        """Число сделок списка с теми же фильтрами, что и get_deals."""
+        return await count_rows(
+            self.session,
+            self._filtered_deals_query(
+                organization_id=organization_id,
+                user_id=user_id,
+                user_role=user_role,
+                status=status,
+                min_amount=min_amount,
+                max_amount=max_amount,
+                stage=stage,
+                owner_id=owner_id,
+            ),
+            cap
+        )
+
+    @staticmethod
+    def make_cursor(deal: DealModel, order_by: str, order: str) -> str:
+        """Курсор, указывающий на позицию сразу после сделки."""
+        return make_cursor(
+            deal,
+            DEAL_ORDER_COLUMNS.get(order_by, DealModel.created_at),
+            order == "desc"
+        )
+
+    @staticmethod
+    def parse_cursor(cursor: str, order_by: str, order: str) -> tuple:
+        """Разобрать курсор и проверить, что он выдан для той же сортировки."""
+        return parse_cursor(
+            cursor,
+            DEAL_ORDER_COLUMNS.get(order_by, DealModel.created_at),
+            order == "desc"
+        )
+
     async def get_summary(self, organization_id: int, days: int = 30):
         """Получить сводку по сделкам для организации."""
         now = datetime.now()
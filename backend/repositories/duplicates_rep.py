@@ -0,0 +1,211 @@
+from typing import AsyncIterator, Optional, Sequence
+
+from sqlalchemy import column, delete, select, table, text
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import aliased, contains_eager, joinedload
+
+from models import ContactDuplicateModel, ContactModel
+from models.constants import DuplicateStatus
+from .pagination import (
+    STREAM_YIELD_PER,
+    make_cursor,
+    parse_cursor,
+    seek_condition,
+)
+
+
+# Колонки, которые задача поиска дубликатов загружает COPY.
+DUPLICATE_COPY_COLUMNS = (
+    "organization_id",
+    "contact_id",
+    "duplicate_id",
+    "score",
+    "reasons",
+    "status",
+    "created_at",
+)
+
+# Временная таблица, в которую пары загружаются перед переносом.
+DUPLICATE_STAGING = table(
+    "contact_duplicates_import",
+    *(column(name) for name in DUPLICATE_COPY_COLUMNS),
+)
+
+
+class ContactDuplicatesRepository:
+    def __init__(self, session: AsyncSession):
+        self.session = session
+
+    async def iter_contacts(
+        self,
+        organization_id: int,
+    ) -> AsyncIterator[tuple[int, str, str, Optional[str]]]:
+        """
+        (id, name, email, phone_normalized) всех контактов организации
+        через серверный курсор.
+        """
+        result = await self.session.stream(
+            select(
+                ContactModel.id,
+                ContactModel.name,
+                ContactModel.email,
+                ContactModel.phone_normalized,
+            ).where(
+                ContactModel.organization_id == organization_id
+            ).execution_options(yield_per=STREAM_YIELD_PER)
+        )
+        async for row in result:
+            yield tuple(row)
+
+    async def get_reviewed_pairs(
+        self,
+        organization_id: int,
+    ) -> set[tuple[int, int]]:
+        """Пары (contact_id, duplicate_id), уже проверенные вручную."""
+        result = await self.session.execute(
+            select(
+                ContactDuplicateModel.contact_id,
+                ContactDuplicateModel.duplicate_id,
+            ).where(
+                ContactDuplicateModel.organization_id == organization_id,
+                ContactDuplicateModel.status != DuplicateStatus.NEW,
+            )
+        )
+        return set(result.tuples().all())
+
+    async def delete_new(self, organization_id: int) -> int:
+        """Удалить непроверенные пары организации перед пересчётом."""
+        result = await self.session.execute(
+            delete(ContactDuplicateModel).where(
+                ContactDuplicateModel.organization_id == organization_id,
+                ContactDuplicateModel.status == DuplicateStatus.NEW,
+            )
+        )
+        return result.rowcount
+
+    async def create_staging(self) -> None:
+        """Создать временную таблицу пар в текущей транзакции."""
+        await self.session.execute(text(
+            f"CREATE TEMP TABLE {DUPLICATE_STAGING.name} ON COMMIT DROP "
+            f"AS SELECT {', '.join(DUPLICATE_COPY_COLUMNS)} "
+            f"FROM {ContactDuplicateModel.__tablename__} WITH NO DATA"
+        ))
+
+    async def copy_to_staging(self, records: list[tuple]) -> None:
+        """
+        Загрузить пачку пар во временную таблицу COPY; кортежи в
+        порядке DUPLICATE_COPY_COLUMNS.
+        """
+        connection = await self.session.connection()
+        raw_connection = await connection.get_raw_connection()
+        await raw_connection.driver_connection.copy_records_to_table(
+            DUPLICATE_STAGING.name,
+            records=records,
+            columns=list(DUPLICATE_COPY_COLUMNS),
+        )
+
+    async def merge_staging(self) -> int:
+        """
+        Перенести пары из временной таблицы одним INSERT.
+
+        Пара, которую успели проверить вручную после чтения
+        get_reviewed_pairs, уже есть в contact_duplicates и
+        пропускается (ON CONFLICT по uq_contact_duplicates_pair).
+        Возвращает число добавленных пар.
+        """
+        result = await self.session.execute(
+            insert(ContactDuplicateModel).from_select(
+                list(DUPLICATE_COPY_COLUMNS),
+                select(*DUPLICATE_STAGING.c)
+            ).on_conflict_do_nothing(
+                constraint="uq_contact_duplicates_pair"
+            )
+        )
+        await self.session.execute(
+            text(f"DROP TABLE {DUPLICATE_STAGING.name}")
+        )
+        return result.rowcount
+
+    async def get_duplicates(
+        self,
+        organization_id: int,
+        status: DuplicateStatus = DuplicateStatus.NEW,
+        owner_id: Optional[int] = None,
+        limit: int = 50,
+        cursor: Optional[tuple] = None,
+    ) -> Sequence[ContactDuplicateModel]:
+        """
+        Пары организации с обоими контактами, по убыванию оценки.
+
+        С owner_id — только пары, где оба контакта принадлежат ему.
+        """
+        contact = aliased(ContactModel)
+        duplicate = aliased(ContactModel)
+        query = select(ContactDuplicateModel).join(
+            contact,
+            ContactDuplicateModel.contact.of_type(contact)
+        ).join(
+            duplicate,
+            ContactDuplicateModel.duplicate.of_type(duplicate)
+        ).options(
+            contains_eager(ContactDuplicateModel.contact.of_type(contact)),
+            contains_eager(
+                ContactDuplicateModel.duplicate.of_type(duplicate)
+            ),
+        ).where(
+            ContactDuplicateModel.organization_id == organization_id,
+            ContactDuplicateModel.status == status,
+        )
+        if owner_id is not None:
+            query = query.where(
+                contact.owner_id == owner_id,
+                duplicate.owner_id == owner_id,
+            )
+        if cursor is not None:
+            query = query.where(seek_condition(
+                (ContactDuplicateModel.score, ContactDuplicateModel.id),
+                cursor,
+                True,
+            ))
+        result = await self.session.execute(
+            query.order_by(
+                ContactDuplicateModel.score.desc(),
+                ContactDuplicateModel.id.desc()
+            ).limit(limit)
+        )
+        return result.scalars().all()
+
+    async def get_duplicate(
+        self,
+        duplicate_pair_id: int,
+        organization_id: int,
+    ) -> Optional[ContactDuplicateModel]:
+        """Пара организации вместе с обоими контактами."""
+        result = await self.session.execute(
+            select(ContactDuplicateModel).options(
+                joinedload(ContactDuplicateModel.contact),
+                joinedload(ContactDuplicateModel.duplicate),
+            ).where(
+                ContactDuplicateModel.id == duplicate_pair_id,
+                ContactDuplicateModel.organization_id == organization_id,
+            )
+        )
+        return result.scalar_one_or_none()
+
+    async def update(
+        self,
+        pair: ContactDuplicateModel
+    ) -> ContactDuplicateModel:
+        self.session.add(pair)
+        await self.session.flush()
+        return pair
+
+    @staticmethod
+    def make_cursor(pair: ContactDuplicateModel) -> str:
+        """Курсор, указывающий на позицию сразу после пары."""
+        return make_cursor(pair, ContactDuplicateModel.score, True)
+
+    @staticmethod
+    def parse_cursor(cursor: str) -> tuple:
+        return parse_cursor(cursor, ContactDuplicateModel.score, True)
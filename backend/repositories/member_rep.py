@@ -1,7 +1,7 @@
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import select
 
-from models import OrganizationMemberModel
+from models import OrganizationMemberModel, UserModel
 from models.constants import MemberRole, Permission
 
 
@@ -14,8 +14,7 @@ class OrganizationMemberRepository:
         member: OrganizationMemberModel
     ) -> OrganizationMemberModel:
         self.session.add(member)
-        await self.session.commit()
-        await self.session.refresh(member)
+        await self.session.flush()
         return member
 
     async def get_member(
@@ -31,6 +30,35 @@ class OrganizationMemberRepository:
         )
         return result.scalars().first()
 
+    async def get_membership_claims(
+        self,
+        user_id: int
+    ) -> tuple[int, dict[str, str]]:
+        """
+        Версия членств пользователя и его роли по организациям
+        для записи в access-токен.
+        """
+        result = await self.session.execute(
+            select(
+                UserModel.membership_version,
+                OrganizationMemberModel.organization_id,
+                OrganizationMemberModel.role,
+            )
+            .outerjoin(
+                OrganizationMemberModel,
+                OrganizationMemberModel.user_id == UserModel.id
+            )
+            .where(UserModel.id == user_id)
+        )
+        rows = result.all()
+        version = rows[0].membership_version if rows else 0
+        roles = {
+            str(row.organization_id): row.role.value
+            for row in rows
+            if row.organization_id is not None
+        }
+        return version, roles
+
     async def check_permission(
         self,
         member: OrganizationMemberModel,
@@ -25,25 +25,17 @@ class OrganizationRepository:
         Создаёт организацию и добавляет владельца с ролью 'OWNER'.
         """
         org = OrganizationModel(name=name)
-        self.session.add(org)
-        await self.session.commit()
-        await self.session.flush()
         membership = OrganizationMemberModel(
             user_id=owner.id,
-            organization_id=org.id,
+            organization=org,
             role=MemberRole.OWNER
         )
-        self.session.add(membership)
-        await self.session.flush()
         permission = OrganizationMemberPermissionModel(
-            member_id=membership.id,
+            member=membership,
             permission=Permission.ALL_PERMISSIONS,
         )
-        self.session.add(permission)
-        await self.session.commit()
-        await self.session.refresh(org)
-        await self.session.refresh(membership)
-        await self.session.refresh(permission)
+        self.session.add_all([org, membership, permission])
+        await self.session.flush()
         return org
 
     async def get_organizations_by_user(
@@ -0,0 +1,169 @@
+import base64
+import binascii
+import json
+from datetime import date, datetime
+from enum import Enum
+from typing import Any, Sequence
+
+from sqlalchemy import (
+    DateTime,
+    Date,
+    Enum as SQLEnum,
+    Select,
+    and_,
+    func,
+    literal,
+    literal_column,
+    select,
+    or_,
+    tuple_,
+)
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import InstrumentedAttribute
+
+
+# Сколько строк за раз читается из серверного курсора при стриминге.
+STREAM_YIELD_PER = 1000
+
+
+def encode_cursor(data: dict) -> str:
+    """Упаковать позицию страницы в непрозрачную строку."""
+    raw = json.dumps(data, separators=(",", ":"), default=_to_json)
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str) -> dict:
+    """
+    Распаковать курсор, выданный encode_cursor.
+
+    Любой повреждённый или чужой курсор приводит к ValueError.
+    """
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        data = json.loads(base64.urlsafe_b64decode(padded.encode()))
+    except (binascii.Error, UnicodeDecodeError, json.JSONDecodeError):
+        raise ValueError("Invalid cursor")
+    if not isinstance(data, dict):
+        raise ValueError("Invalid cursor")
+    return data
+
+
+def make_cursor(
+    row: Any,
+    column: InstrumentedAttribute,
+    descending: bool,
+) -> str:
+    """Курсор на позицию сразу после row при сортировке (column, id)."""
+    return encode_cursor({
+        "order_by": column.key,
+        "order": "desc" if descending else "asc",
+        "value": getattr(row, column.key),
+        "id": row.id,
+    })
+
+
+def parse_cursor(
+    cursor: str,
+    column: InstrumentedAttribute,
+    descending: bool,
+) -> tuple[Any, int]:
+    """
+    Значения (column, id) из курсора make_cursor.
+
+    Курсор, выданный для другой сортировки, считается недействительным.
+    """
+    data = decode_cursor(cursor)
+    if (
+        data.get("order_by") != column.key
+        or data.get("order") != ("desc" if descending else "asc")
+        or "value" not in data
+        or not isinstance(data.get("id"), int)
+    ):
+        raise ValueError("Invalid cursor")
+    return parse_value(column, data["value"]), data["id"]
+
+
+def _to_json(value: Any) -> Any:
+    if isinstance(value, Enum):
+        return value.value
+    if isinstance(value, (datetime, date)):
+        return value.isoformat()
+    raise TypeError(f"Unsupported cursor value: {value!r}")
+
+
+def parse_value(column: InstrumentedAttribute, raw: Any) -> Any:
+    """Привести значение из курсора к типу колонки."""
+    column_type = column.property.columns[0].type
+    try:
+        if raw is None:
+            return None
+        if isinstance(column_type, SQLEnum):
+            return column_type.enum_class(raw)
+        if isinstance(column_type, DateTime):
+            return datetime.fromisoformat(raw)
+        if isinstance(column_type, Date):
+            return date.fromisoformat(raw)
+        return column_type.python_type(raw)
+    except (TypeError, ValueError):
+        raise ValueError("Invalid cursor")
+
+
+def seek_condition(
+    columns: Sequence[InstrumentedAttribute],
+    values: Sequence[Any],
+    descending: bool,
+):
+    """
+    Условие «строго после курсора» для сортировки по columns.
+
+    Сравнение кортежей (a, id) < (:a, :id) PostgreSQL выполняет по
+    составному индексу с теми же колонками.
+    """
+    row = tuple_(*columns)
+    bound = tuple_(*(
+        literal(value, column.type) for column, value in zip(columns, values)
+    ))
+    return row < bound if descending else row > bound
+
+
+def seek_condition_nulls_last(
+    column: InstrumentedAttribute,
+    id_column: InstrumentedAttribute,
+    value: Any,
+    last_id: int,
+):
+    """
+    Условие «строго после курсора» для (column ASC NULLS LAST, id ASC).
+
+    Для колонки, допускающей NULL: строки с NULL идут в конце списка.
+    """
+    if value is None:
+        return and_(column.is_(None), id_column > last_id)
+    return or_(
+        seek_condition((column, id_column), (value, last_id), False),
+        column.is_(None),
+    )
+
+
+async def count_rows(
+    session: AsyncSession,
+    query: Select,
+    cap: int | None = None,
+) -> int:
+    """
+    Число строк запроса списка.
+
+    С cap подсчёт останавливается на cap + 1 строке: результат больше
+    cap означает «не меньше cap + 1», а стоимость не зависит от размера
+    таблицы.
+    """
+    query = query.with_only_columns(
+        literal_column("1"),
+        maintain_column_froms=True
+    ).order_by(None)
+    if cap is not None:
+        query = query.limit(cap + 1)
+    result = await session.execute(
+        select(func.count()).select_from(query.subquery())
+    )
+    return result.scalar_one()
@@ -1,11 +1,27 @@
 from datetime import datetime
+import hashlib
 
-from sqlalchemy import delete, select
+from sqlalchemy import (
+    DateTime,
+    String,
+    and_,
+    delete,
+    false,
+    insert,
+    literal,
+    select,
+    update
+)
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from models.core import RefreshTokenModel
 
 
+def hash_token(token: str) -> str:
+    """В БД хранится только SHA-256 от refresh-токена."""
+    return hashlib.sha256(token.encode('utf-8')).hexdigest()
+
+
 class RefreshTokenRepository:
     def __init__(self, session: AsyncSession):
         self.session = session
@@ -16,28 +32,33 @@ class RefreshTokenRepository:
                 RefreshTokenModel.user_id == user_id
             )
         )
-        await self.session.commit()
 
-    async def create_token(
+    async def replace_for_user(
         self,
         user_id: int,
         token: str,
         expires_at: datetime
     ):
-        refresh = RefreshTokenModel(
-            user_id=user_id,
-            token=token,
-            expires_at=expires_at,
-            revoked=False
+        """Удалить токены пользователя и выдать новый одной транзакцией."""
+        await self.session.execute(
+            delete(RefreshTokenModel).where(
+                RefreshTokenModel.user_id == user_id
+            )
+        )
+        await self.session.execute(
+            insert(RefreshTokenModel).values(
+                user_id=user_id,
+                token_hash=hash_token(token),
+                expires_at=expires_at,
+                created_at=datetime.utcnow(),
+                revoked=False
+            )
         )
-        self.session.add(refresh)
-        await self.session.commit()
-        return refresh
 
     async def get_valid(self, token: str):
         result = await self.session.execute(
             select(RefreshTokenModel).where(
-                RefreshTokenModel.token == token,
+                RefreshTokenModel.token_hash == hash_token(token),
                 RefreshTokenModel.revoked == False,
                 RefreshTokenModel.expires_at > datetime.utcnow()
             )
@@ -45,8 +66,90 @@ class RefreshTokenRepository:
         return result.scalar_one_or_none()
 
     async def revoke(self, token: str):
-        obj = await self.get_valid(token)
-        if not obj:
-            return
-        obj.revoked = True
-        await self.session.commit()
+        await self.session.execute(
+            update(RefreshTokenModel)
+            .where(
+                RefreshTokenModel.token_hash == hash_token(token),
+                RefreshTokenModel.revoked == False,
+            )
+            .values(revoked=True)
+        )
+
+    async def rotate(
+        self,
+        token: str,
+        new_token: str,
+        expires_at: datetime
+    ) -> int | None:
+        """
+        Отозвать действующий токен и выдать новый одним запросом.
+
+        UPDATE ... RETURNING блокирует строку старого токена, поэтому при
+        одновременном предъявлении одного токена второй запрос не найдёт
+        неотозванную строку и новый токен не получит.
+        Возвращает id пользователя или None, если токен недействителен.
+        """
+        now = datetime.utcnow()
+        revoked = (
+            update(RefreshTokenModel)
+            .where(
+                RefreshTokenModel.token_hash == hash_token(token),
+                RefreshTokenModel.revoked == False,
+                RefreshTokenModel.expires_at > now
+            )
+            .values(revoked=True)
+            .returning(RefreshTokenModel.user_id)
+            .cte("revoked")
+        )
+        result = await self.session.execute(
+            insert(RefreshTokenModel)
+            .from_select(
+                [
+                    "user_id",
+                    "token_hash",
+                    "expires_at",
+                    "created_at",
+                    "revoked"
+                ],
+                select(
+                    revoked.c.user_id,
+                    literal(hash_token(new_token), String),
+                    literal(expires_at, DateTime),
+                    literal(now, DateTime),
+                    false(),
+                )
+            )
+            .returning(RefreshTokenModel.user_id)
+        )
+        return result.scalar_one_or_none()
+
+    async def delete_stale_batch(self, batch_size: int) -> int:
+        """
+        Удалить не больше batch_size отозванных или истёкших токенов.
+
+        Строки, занятые другими транзакциями, пропускаются.
+        """
+        conditions = (
+            RefreshTokenModel.revoked == True,
+            and_(
+                RefreshTokenModel.revoked == False,
+                RefreshTokenModel.expires_at < datetime.utcnow()
+            ),
+        )
+        deleted = 0
+        for condition in conditions:
+            ids = (
+                select(RefreshTokenModel.id)
+                .where(condition)
+                .limit(batch_size - deleted)
+                .with_for_update(skip_locked=True)
+            )
+            result = await self.session.execute(
+                delete(RefreshTokenModel)
+                .where(RefreshTokenModel.id.in_(ids))
+                .execution_options(synchronize_session=False)
+            )
+            deleted += result.rowcount
+            if deleted >= batch_size:
+                break
+        return deleted
@@ -0,0 +1,67 @@
+from typing import Optional, Sequence
+
+from sqlalchemy import cast, func, literal, or_, select
+from sqlalchemy.dialects.postgresql import TSQUERY
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from models import SearchDocumentModel
+from models.constants import SearchEntity
+from models.search import tenant_lexeme
+
+
+# Сущности, которые MEMBER видит в организации целиком; контакты и
+# сделки — только свои, как и в списках.
+SHARED_ENTITIES = (SearchEntity.TASK.value, SearchEntity.COMMENT.value)
+
+
+class SearchRepository:
+    def __init__(self, session: AsyncSession):
+        self.session = session
+
+    async def search(
+        self,
+        organization_id: int,
+        tsquery: str,
+        limit: int = 20,
+        entity_types: Optional[list[str]] = None,
+        owner_id: Optional[int] = None,
+    ) -> Sequence[tuple]:
+        """
+        Документы организации, подходящие под tsquery, по убыванию ранга.
+
+        С owner_id контакты и сделки ограничены этим владельцем.
+        Возвращает (entity_type, entity_id, deal_id, title, rank).
+        """
+        query = func.to_tsquery('simple', tsquery)
+        rank = func.ts_rank(SearchDocumentModel.document, query)
+        # Лексема организации в условии @@ сужает выборку в самом
+        # GIN-индексе; в ранг она не входит.
+        tenant = cast(literal(f"'{tenant_lexeme(organization_id)}'"), TSQUERY)
+        stmt = select(
+            SearchDocumentModel.entity_type,
+            SearchDocumentModel.entity_id,
+            SearchDocumentModel.deal_id,
+            SearchDocumentModel.title,
+            rank.label('rank'),
+        ).where(
+            SearchDocumentModel.organization_id == organization_id,
+            SearchDocumentModel.document.bool_op('@@')(
+                query.op('&&')(tenant)
+            ),
+        )
+        if entity_types:
+            stmt = stmt.where(
+                SearchDocumentModel.entity_type.in_(entity_types)
+            )
+        if owner_id is not None:
+            stmt = stmt.where(or_(
+                SearchDocumentModel.owner_id == owner_id,
+                SearchDocumentModel.entity_type.in_(SHARED_ENTITIES),
+            ))
+        result = await self.session.execute(
+            stmt.order_by(
+                rank.desc(),
+                SearchDocumentModel.id.desc()
+            ).limit(limit)
+        )
+        return result.tuples().all()
@@ -1,13 +1,28 @@
 from datetime import date
-from typing import Sequence, Optional
+from typing import AsyncIterator, Sequence, Optional
 
-from sqlalchemy import select
+from sqlalchemy import (
+    Integer,
+    Select,
+    any_,
+    insert,
+    literal,
+    select,
+    update,
+)
+from sqlalchemy.dialects.postgresql import ARRAY
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from models import (
     TaskModel,
     DealModel,
 )
+from .pagination import (
+    STREAM_YIELD_PER,
+    make_cursor,
+    parse_cursor,
+    seek_condition_nulls_last,
+)
 
 
 class TasksRepository:
@@ -17,10 +32,67 @@ class TasksRepository:
     async def create(self, data: dict) -> TaskModel:
         obj = TaskModel(**data)
         self.session.add(obj)
-        await self.session.commit()
-        await self.session.refresh(obj)
+        await self.session.flush()
         return obj
 
+    async def create_many(self, values: list[dict]) -> Sequence[TaskModel]:
+        """
+        Добавить задачи одним многострочным INSERT ... RETURNING.
+
+        Задачи возвращаются в порядке values.
+        """
+        result = await self.session.scalars(
+            insert(TaskModel).returning(
+                TaskModel,
+                sort_by_parameter_order=True
+            ),
+            values
+        )
+        return result.all()
+
+    async def complete_many(
+        self,
+        task_ids: list[int],
+        org_id: int,
+        owner_id: Optional[int] = None,
+    ) -> Sequence[TaskModel]:
+        """
+        Отметить выполненными задачи организации одним UPDATE.
+
+        С owner_id затрагиваются только задачи сделок этого владельца.
+        Возвращает задачи, которые нашлись.
+        """
+        query = (
+            update(TaskModel)
+            .where(
+                TaskModel.id == any_(literal(task_ids, ARRAY(Integer))),
+                TaskModel.organization_id == org_id,
+            )
+            .values(is_done=True)
+            .returning(TaskModel)
+        )
+        if owner_id is not None:
+            query = query.where(
+                TaskModel.deal_id == DealModel.id,
+                DealModel.owner_id == owner_id
+            )
+        result = await self.session.scalars(query)
+        return sorted(result.all(), key=lambda task: task.id)
+
+    async def get_deal_owners_in_org(
+        self,
+        deal_ids: list[int],
+        org_id: int
+    ) -> dict[int, int]:
+        """Владельцы тех сделок из deal_ids, что принадлежат организации."""
+        result = await self.session.execute(
+            select(DealModel.id, DealModel.owner_id).where(
+                DealModel.id == any_(literal(deal_ids, ARRAY(Integer))),
+                DealModel.organization_id == org_id
+            )
+        )
+        return dict(result.tuples().all())
+
     async def get_deal_in_org(self, deal_id: int, org_id: int):
         """Проверка, что сделка принадлежит организации."""
         result = await self.session.execute(
@@ -31,25 +103,100 @@ class TasksRepository:
         )
         return result.scalar_one_or_none()
 
-    async def get_tasks(
+    def _tasks_query(
         self,
         organization_id: int,
         deal_id: Optional[int] = None,
         only_open: Optional[bool] = None,
         due_before: Optional[date] = None,
         due_after: Optional[date] = None,
-    ) -> Sequence[TaskModel]:
-        """Получить список задач организации."""
-        query = select(TaskModel).join(DealModel).where(
-            DealModel.organization_id == organization_id
+    ) -> Select:
+        """
+        Задачи организации с фильтрами в порядке (due_date, id).
+
+        Без deal_id порядок отдаёт ix_tasks_org_due_date, с deal_id —
+        ix_tasks_deal_due_date.
+        """
+        query = select(TaskModel).where(
+            TaskModel.organization_id == organization_id
         )
         if deal_id:
-            query = query.where(DealModel.id == deal_id)
+            query = query.where(TaskModel.deal_id == deal_id)
         if only_open is True:
             query = query.where(TaskModel.is_done.is_(False))
         if due_after is not None:
             query = query.where(TaskModel.due_date >= due_after)
         if due_before is not None:
             query = query.where(TaskModel.due_date <= due_before)
-        result = await self.session.execute(query)
+        return query.order_by(
+            TaskModel.due_date.asc().nulls_last(),
+            TaskModel.id.asc()
+        )
+
+    async def get_tasks(
+        self,
+        organization_id: int,
+        deal_id: Optional[int] = None,
+        only_open: Optional[bool] = None,
+        due_before: Optional[date] = None,
+        due_after: Optional[date] = None,
+        limit: int = 50,
+        cursor: Optional[tuple] = None,
+    ) -> Sequence[TaskModel]:
+        """
+        Получить страницу задач организации.
+
+        С курсором страница начинается сразу после задачи из курсора.
+        """
+        query = self._tasks_query(
+            organization_id=organization_id,
+            deal_id=deal_id,
+            only_open=only_open,
+            due_before=due_before,
+            due_after=due_after,
+        )
+        if cursor is not None:
+            query = query.where(seek_condition_nulls_last(
+                TaskModel.due_date,
+                TaskModel.id,
+                *cursor
+            ))
+        result = await self.session.execute(query.limit(limit))
         return result.scalars().all()
+
+    async def stream_tasks(
+        self,
+        organization_id: int,
+        deal_id: Optional[int] = None,
+        only_open: Optional[bool] = None,
+        due_before: Optional[date] = None,
+        due_after: Optional[date] = None,
+    ) -> AsyncIterator[TaskModel]:
+        """
+        Все задачи организации через серверный курсор.
+
+        Строки читаются пачками по STREAM_YIELD_PER, поэтому память
+        не растёт с числом задач.
+        """
+        query = self._tasks_query(
+            organization_id=organization_id,
+            deal_id=deal_id,
+            only_open=only_open,
+            due_before=due_before,
+            due_after=due_after,
+        )
+        result = await self.session.stream_scalars(
+            query.execution_options(yield_per=STREAM_YIELD_PER)
+        )
+        async for task in result:
+            yield task
+
+    @staticmethod
+    def make_cursor(task: TaskModel) -> str:
+        """Курсор, указывающий на позицию сразу после задачи."""
+        return make_cursor(task, TaskModel.due_date, False)
+
+    @staticmethod
+    def parse_cursor(cursor: str) -> tuple:
+        """Разобрать курсор списка задач."""
+        return parse_cursor(cursor, TaskModel.due_date, False)
@@ -20,15 +20,23 @@ class UserRepository:
         )
         return result.scalar_one_or_none()
 
+    async def get_membership_version(self, user_id: int) -> int | None:
+        result = await self.session.execute(
+            select(UserModel.membership_version).where(UserModel.id == user_id)
+        )
+        return result.scalar_one_or_none()
+
     async def create_user(
         self,
         email: str,
-        password: str,
+        hashed_password: str,
         name: str
     ) -> UserModel:
-        user = UserModel(email=email, name=name)
-        user.set_password(password)
+        user = UserModel(
+            email=email,
+            name=name,
+            hashed_password=hashed_password
+        )
         self.session.add(user)
-        await self.session.commit()
-        await self.session.refresh(user)
+        await self.session.flush()
         return user
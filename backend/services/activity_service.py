@@ -1,3 +1,5 @@
+from fastapi import HTTPException
+
 
 from models import ActivityModel
 from models.constants import ActivityType
@@ -18,15 +20,57 @@ class ActivityService:
         self,
         deal_id: int,
         organization_id: int,
+        limit: int = 50,
     ) -> list[ActivitiesSchema]:
         """Получить активности сделки."""
+        activities, _ = await self.get_activities_feed(
+            deal_id=deal_id,
+            organization_id=organization_id,
+            limit=limit,
+        )
+        return activities
+
+    async def get_activities_feed(
+        self,
+        deal_id: int,
+        organization_id: int,
+        limit: int = 50,
+        since: str | None = None,
+    ) -> tuple[list[ActivitiesSchema], str | None]:
+        """
+        Новые активности сделки и курсор для следующего опроса.
+
+        Если новых записей нет, возвращается переданный since, чтобы
+        клиент продолжал опрос с той же позиции. Записи, закоммиченные
+        позже уже отданных, но с более ранним created_at, приходят при
+        следующем опросе (см. ActivitiesRepository.get_activities).
+        """
+        seek, seen, floor = None, {}, None
+        if since is not None:
+            try:
+                seek, seen, floor = self.activity_repo.parse_cursor(since)
+            except ValueError:
+                raise HTTPException(400, "Invalid cursor")
         activities = await self.activity_repo.get_activities(
             organization_id=organization_id,
-            deal_id=deal_id
+            deal_id=deal_id,
+            limit=limit,
+            since=seek,
+            seen=list(seen),
+            floor=floor,
+        )
+        next_cursor = since
+        if activities:
+            next_cursor = self.activity_repo.make_cursor(
+                activities,
+                since=seek,
+                seen=seen,
+                floor=floor,
+            )
+        return (
+            [ActivitiesSchema.model_validate(act) for act in activities],
+            next_cursor
         )
-        return [
-            ActivitiesSchema.model_validate(act) for act in activities
-            ]
 
     async def create_activity(
         self,
@@ -46,6 +90,14 @@ class ActivityService:
         )
         return ActivitiesSchema.model_validate(activity)
 
+    async def create_activities(self, activities: list[dict]) -> None:
+        """
+        Создать пакет активностей.
+
+        Каждый элемент содержит deal_id, type, payload и author_id.
+        """
+        await self.activity_repo.create_many(activities)
+
     async def create_activity_comment(
         self,
         deal_id: int,
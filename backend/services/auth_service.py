@@ -7,9 +7,11 @@ from sqlalchemy.ext.asyncio import AsyncSession
 
 from repositories.config import settings
 from models import UserModel
+from repositories.member_rep import OrganizationMemberRepository
 from repositories.user_rep import UserRepository
 from repositories.organization_rep import OrganizationRepository
 from repositories.refresh_token_rep import RefreshTokenRepository
+from services.password_hasher import password_hasher
 
 
 class AuthService:
@@ -28,7 +30,8 @@ class AuthService:
         existing_org = await self.org_repo.get_by_name(organization_name)
         if existing_org:
             raise ValueError(f"Организация с названием '{organization_name}' уже существует")
-        user = await self.user_repo.create_user(email, password, name)
+        hashed_password = await password_hasher.hash_password(password)
+        user = await self.user_repo.create_user(email, hashed_password, name)
         await self.org_repo.create_organization(organization_name, user)
         refresh_token = await self.create_refresh_token(user.id)
         return user, refresh_token
@@ -41,15 +44,34 @@ class AuthService:
         user = await self.user_repo.get_by_email(email)
         if not user:
             return None
-        if not user.check_password(password):
+        # Завершаем читающую транзакцию, чтобы соединение вернулось в пул
+        # на время ожидания очереди bcrypt и проверки пароля. Запись
+        # нового хеша UnitOfWorkRoute зафиксирует в новой транзакции.
+        await self.session.commit()
+        if not await password_hasher.verify_password(
+            password,
+            user.hashed_password
+        ):
             return None
+        if user.password_needs_rehash():
+            user.hashed_password = await password_hasher.hash_password(
+                password
+            )
         return user
 
-    def create_access_token(self, user_id: int) -> str:
+    def create_access_token(
+        self,
+        user_id: int,
+        memberships: Optional[dict[str, str]] = None,
+        membership_version: Optional[int] = None,
+    ) -> str:
         expire = datetime.now() + timedelta(
             minutes=settings.ACCESS_TOKEN_EXPIRE_MINUTES
         )
         payload = {"sub": str(user_id), "exp": expire}
+        if memberships is not None:
+            payload["orgs"] = memberships
+            payload["mv"] = membership_version
         token = jwt.encode(
             payload,
             settings.SECRET_KEY,
@@ -57,21 +79,32 @@ class AuthService:
         )
         return token
 
+    async def issue_access_token(self, user_id: int) -> str:
+        """Access-токен, при включённой настройке — с ролями в claims."""
+        if not settings.ACCESS_TOKEN_MEMBERSHIP_CLAIMS:
+            return self.create_access_token(user_id)
+        version, memberships = await OrganizationMemberRepository(
+            self.session
+        ).get_membership_claims(user_id)
+        return self.create_access_token(user_id, memberships, version)
+
     async def create_refresh_token(self, user_id: int) -> str:
-        await self.refresh_repo.delete_by_user(user_id)
         token = secrets.token_urlsafe(64)
         expires = datetime.now() + timedelta(days=30)
-        await self.refresh_repo.create_token(user_id, token, expires)
+        await self.refresh_repo.replace_for_user(user_id, token, expires)
         return token
 
     async def refresh_access_token(
         self,
         refresh_token: str
     ) -> Tuple[str, str]:
-        stored = await self.refresh_repo.get_valid(refresh_token)
-        if not stored or stored.expires_at < datetime.now():
+        new_refresh = secrets.token_urlsafe(64)
+        expires = datetime.now() + timedelta(days=30)
+        user_id = await self.refresh_repo.rotate(
+            refresh_token,
+            new_refresh,
+            expires
+        )
+        if user_id is None:
             raise ValueError("Refresh token is invalid or expired")
-        stored.revoked = True
-        await self.session.commit()
-        refresh = await self.create_refresh_token(stored.user_id)
-        return (self.create_access_token(stored.user_id), refresh)
+        return (await self.issue_access_token(user_id), new_refresh)
@@ -0,0 +1,278 @@
+import argparse
+import asyncio
+import json
+import logging
+import re
+import time
+from collections import defaultdict
+from datetime import datetime
+from difflib import SequenceMatcher
+from itertools import combinations, islice
+from typing import Optional
+
+from models.constants import DuplicateStatus
+from repositories.config import settings
+from repositories.database import session_factory
+from repositories.duplicates_rep import ContactDuplicatesRepository
+
+
+logger = logging.getLogger(__name__)
+
+# Веса совпадения имени, email и телефона в оценке пары.
+NAME_WEIGHT = 0.45
+EMAIL_WEIGHT = 0.35
+PHONE_WEIGHT = 0.2
+# Сходство, начиная с которого поле попадает в причины пары.
+REASON_SIMILARITY = 0.85
+# Сколько пар загружается одним COPY.
+COPY_BATCH_SIZE = 10000
+
+_SOUNDEX_CODES = {
+    letter: digit
+    for letters, digit in (
+        ("bfpv", "1"),
+        ("cgjkqsxz", "2"),
+        ("dt", "3"),
+        ("l", "4"),
+        ("mn", "5"),
+        ("r", "6"),
+    )
+    for letter in letters
+}
+_word_re = re.compile(r"\w+")
+
+# Контакт в памяти задачи: (имя, email, локальная часть email,
+# phone_normalized) после нормализации.
+Contact = tuple[str, str, str, Optional[str]]
+
+
+def soundex(word: str) -> str:
+    """
+    Код Soundex слова: "Robert" и "Rupert" дают "R163".
+
+    Слово без латинских букв кодируется своими первыми четырьмя
+    символами.
+    """
+    letters = [c for c in word.lower() if "a" <= c <= "z"]
+    if not letters:
+        return word[:4]
+    code = letters[0].upper()
+    last = _SOUNDEX_CODES.get(letters[0], "")
+    for letter in letters[1:]:
+        digit = _SOUNDEX_CODES.get(letter, "")
+        if digit and digit != last:
+            code += digit
+            if len(code) == 4:
+                break
+        if letter not in "hw":
+            last = digit
+    return code.ljust(4, "0")
+
+
+def normalize_name(name: str) -> str:
+    """Слова имени в нижнем регистре через один пробел."""
+    return " ".join(_word_re.findall(name.lower()))
+
+
+def email_local_part(email: str) -> str:
+    """
+    Локальная часть email без тега после «+» и точек:
+    "John.Doe+crm@example.com" даёт "johndoe".
+    """
+    local = email.lower().partition("@")[0]
+    return local.partition("+")[0].replace(".", "")
+
+
+def make_contact(name: str, email: str, phone: Optional[str]) -> Contact:
+    """Нормализованный контакт для blocking_keys и score_pair."""
+    email = email.lower()
+    return normalize_name(name), email, email_local_part(email), phone
+
+
+def blocking_keys(contact: Contact) -> set[str]:
+    """
+    Ключи блоков контакта: сравниваются только контакты с общим
+    ключом — локальной частью email, телефоном или Soundex слов имени.
+    """
+    name, _, local, phone = contact
+    keys = set()
+    if local:
+        keys.add("e:" + local)
+    if phone:
+        keys.add("p:" + phone)
+    words = name.split()
+    if words:
+        keys.add("n:" + " ".join(sorted(soundex(word) for word in words)))
+    return keys
+
+
+def score_pair(
+    first: Contact,
+    second: Contact,
+    min_score: float = 0.0,
+) -> Optional[tuple[float, list[str]]]:
+    """
+    Оценка похожести двух контактов от 0 до 1 и совпавшие поля.
+
+    Имя и локальная часть email сравниваются по доле общих символов
+    (difflib), что учитывает опечатки; совпадение email целиком даёт
+    1, телефон учитывается только при точном совпадении. Если пара
+    заведомо не набирает min_score, возвращает None: точное сравнение
+    строк пропускается по дешёвым верхним оценкам difflib.
+    """
+    phone = 1.0 if first[3] and first[3] == second[3] else 0.0
+    email = 1.0 if first[1] == second[1] else None
+    rest = PHONE_WEIGHT * phone + EMAIL_WEIGHT * (email or 1.0)
+    matcher = SequenceMatcher(None, first[0], second[0])
+    if NAME_WEIGHT * matcher.quick_ratio() + rest < min_score:
+        return None
+    name = matcher.ratio()
+    if email is None:
+        matcher = SequenceMatcher(None, first[2], second[2])
+        upper = NAME_WEIGHT * name + PHONE_WEIGHT * phone
+        if upper + EMAIL_WEIGHT * matcher.quick_ratio() < min_score:
+            return None
+        email = matcher.ratio()
+    score = NAME_WEIGHT * name + EMAIL_WEIGHT * email + PHONE_WEIGHT * phone
+    if score < min_score:
+        return None
+    reasons = [
+        reason
+        for reason, similarity in (
+            ("name", name),
+            ("email", email),
+            ("phone", phone),
+        )
+        if similarity >= REASON_SIMILARITY
+    ]
+    return round(score, 4), reasons
+
+
+class ContactDeduplicator:
+    """
+    Поиск вероятных дубликатов среди контактов организации.
+
+    Контакты читаются одним потоком и раскладываются по блокам
+    (blocking_keys); оцениваются только пары внутри блока, поэтому
+    работа растёт с числом контактов почти линейно, а не квадратично.
+    Блоки больше max_block_size (например, общий info@ или телефон
+    офиса) пропускаются. Найденные пары заменяют непроверенные пары
+    организации в contact_duplicates; пары, проверенные вручную во
+    время пересчёта, не перезаписываются.
+    """
+
+    def __init__(
+        self,
+        dup_repo: ContactDuplicatesRepository,
+        max_block_size: int = settings.CONTACT_DEDUP_MAX_BLOCK_SIZE,
+        min_score: float = settings.CONTACT_DEDUP_MIN_SCORE,
+    ):
+        self.dup_repo = dup_repo
+        self.max_block_size = max_block_size
+        self.min_score = min_score
+
+    async def run(self, organization_id: int) -> dict:
+        """Пересчитать дубликаты организации и вернуть отчёт."""
+        started = time.perf_counter()
+        ids: list[int] = []
+        contacts: list[Contact] = []
+        blocks: dict[str, list[int]] = defaultdict(list)
+        async for contact_id, name, email, phone in (
+            self.dup_repo.iter_contacts(organization_id)
+        ):
+            contact = make_contact(name, email, phone)
+            for key in blocking_keys(contact):
+                blocks[key].append(len(ids))
+            ids.append(contact_id)
+            contacts.append(contact)
+        reviewed = await self.dup_repo.get_reviewed_pairs(organization_id)
+        # Запоминаются только найденные пары: множество всех сравнённых
+        # пар заняло бы больше памяти, чем сами контакты, а повторно
+        # сравниваются лишь пары с несколькими общими ключами.
+        found: dict[tuple[int, int], tuple] = {}
+        compared = 0
+        oversized = 0
+        for members in blocks.values():
+            if len(members) < 2:
+                continue
+            if len(members) > self.max_block_size:
+                oversized += 1
+                continue
+            for first, second in combinations(members, 2):
+                if ids[first] > ids[second]:
+                    first, second = second, first
+                pair = (ids[first], ids[second])
+                if pair in found or pair in reviewed:
+                    continue
+                compared += 1
+                result = score_pair(
+                    contacts[first],
+                    contacts[second],
+                    self.min_score
+                )
+                if result is not None:
+                    found[pair] = result
+        now = datetime.now()
+        records = [
+            (
+                organization_id,
+                *pair,
+                score,
+                reasons,
+                DuplicateStatus.NEW.name,
+                now,
+            )
+            for pair, (score, reasons) in found.items()
+        ]
+        await self.dup_repo.delete_new(organization_id)
+        await self.dup_repo.create_staging()
+        rows = iter(records)
+        while batch := list(islice(rows, COPY_BATCH_SIZE)):
+            await self.dup_repo.copy_to_staging(batch)
+        duplicates = await self.dup_repo.merge_staging()
+        report = {
+            "contacts": len(ids),
+            "blocks": len(blocks),
+            "oversized_blocks": oversized,
+            "compared": compared,
+            "duplicates": duplicates,
+            "seconds": round(time.perf_counter() - started, 3),
+        }
+        logger.info(
+            "Дубликаты контактов организации %s: %s",
+            organization_id,
+            report
+        )
+        return report
+
+
+async def main(args):
+    for organization_id in args.organization_id:
+        async with session_factory() as session, session.begin():
+            report = await ContactDeduplicator(
+                ContactDuplicatesRepository(session),
+                max_block_size=args.max_block_size,
+                min_score=args.min_score,
+            ).run(organization_id)
+        print(json.dumps(
+            {"organization_id": organization_id, **report},
+            ensure_ascii=False
+        ))
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        description="Поиск дубликатов среди контактов организаций."
+    )
+    parser.add_argument("organization_id", type=int, nargs="+")
+    parser.add_argument(
+        "--max-block-size",
+        type=int,
+        default=settings.CONTACT_DEDUP_MAX_BLOCK_SIZE
+    )
+    parser.add_argument(
+        "--min-score",
+        type=float,
+        default=settings.CONTACT_DEDUP_MIN_SCORE
+    )
+    asyncio.run(main(parser.parse_args()))
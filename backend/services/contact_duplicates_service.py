@@ -0,0 +1,90 @@
+from typing import Optional
+
+from fastapi import HTTPException
+
+from api.v1.schemas.contacts_schemas import ContactDuplicateSchema
+from models import OrganizationMemberModel
+from models.constants import DuplicateStatus, MemberRole
+from repositories.duplicates_rep import ContactDuplicatesRepository
+
+
+class ContactDuplicateService:
+    """Сервис проверки найденных дубликатов контактов."""
+
+    def __init__(self, dup_repo: ContactDuplicatesRepository):
+        self.dup_repo = dup_repo
+
+    @staticmethod
+    def owner_filter(
+        user_id: int,
+        member: OrganizationMemberModel
+    ) -> Optional[int]:
+        """MEMBER проверяет только пары из своих контактов."""
+        if member.role in (
+            MemberRole.OWNER,
+            MemberRole.ADMIN,
+            MemberRole.MANAGER
+        ):
+            return None
+        return user_id
+
+    async def get_duplicates_page(
+        self,
+        user_id: int,
+        organization_id: int,
+        member: OrganizationMemberModel,
+        status: DuplicateStatus = DuplicateStatus.NEW,
+        limit: int = 50,
+        cursor: Optional[str] = None,
+    ) -> tuple[list[ContactDuplicateSchema], Optional[str]]:
+        """
+        Страница пар по убыванию оценки и курсор следующей страницы.
+        """
+        seek = None
+        if cursor is not None:
+            try:
+                seek = self.dup_repo.parse_cursor(cursor)
+            except ValueError:
+                raise HTTPException(400, "Invalid cursor")
+        pairs = await self.dup_repo.get_duplicates(
+            organization_id=organization_id,
+            status=status,
+            owner_id=self.owner_filter(user_id, member),
+            limit=limit,
+            cursor=seek,
+        )
+        next_cursor = None
+        if len(pairs) == limit:
+            next_cursor = self.dup_repo.make_cursor(pairs[-1])
+        return (
+            [ContactDuplicateSchema.model_validate(pair) for pair in pairs],
+            next_cursor
+        )
+
+    async def review_duplicate(
+        self,
+        duplicate_pair_id: int,
+        user_id: int,
+        organization_id: int,
+        member: OrganizationMemberModel,
+        status: DuplicateStatus,
+    ) -> ContactDuplicateSchema:
+        """
+        Подтвердить или отклонить пару; проверенную пару задача
+        поиска дубликатов больше не пересоздаёт.
+        """
+        pair = await self.dup_repo.get_duplicate(
+            duplicate_pair_id,
+            organization_id
+        )
+        if pair is None:
+            raise HTTPException(404, "Duplicate pair not found")
+        owner_id = self.owner_filter(user_id, member)
+        if owner_id is not None and {
+            pair.contact.owner_id,
+            pair.duplicate.owner_id,
+        } != {owner_id}:
+            raise HTTPException(404, "Duplicate pair not found")
+        pair.status = status
+        pair = await self.dup_repo.update(pair)
+        return ContactDuplicateSchema.model_validate(pair)
@@ -0,0 +1,207 @@
+import argparse
+import asyncio
+import csv
+import io
+import json
+import re
+from itertools import islice
+from typing import Any, Iterator
+
+from fastapi import HTTPException
+
+from models.constants import (
+    EMAIL_PATTERN,
+    LENGTH_EMAIL,
+    LENGTH_NAME_USER,
+    LENGTH_PHONE,
+    normalize_phone,
+)
+from repositories.cache import (
+    invalidate_contact_phone_on_commit,
+    invalidate_contact_suggestions_on_commit,
+    invalidate_counts,
+)
+from repositories.config import settings
+from repositories.contacts_rep import ContactsRepository
+from repositories.database import session_factory
+
+
+IMPORT_FORMATS = ("csv", "ndjson")
+
+_email_re = re.compile(EMAIL_PATTERN)
+
+
+def iter_rows(data: bytes, format: str) -> Iterator[tuple[int, Any]]:
+    """
+    Строки файла импорта с номерами, начиная с 1.
+
+    CSV должен содержать заголовок с колонками name, email и phone.
+    Строка NDJSON, не являющаяся JSON, отдаётся
+    как None.
+    """
+    try:
+        content = data.decode("utf-8-sig")
+    except UnicodeDecodeError:
+        raise ValueError("File must be UTF-8 encoded")
+    if format == "csv":
+        reader = csv.DictReader(io.StringIO(content))
+        missing = {"name", "email", "phone"} - set(reader.fieldnames or [])
+        if missing:
+            raise ValueError(
+                "Missing CSV columns: " + ", ".join(sorted(missing))
+            )
+        yield from enumerate(reader, 1)
+        return
+    for number, line in enumerate(content.splitlines(), 1):
+        if not line.strip():
+            continue
+        try:
+            yield number, json.loads(line)
+        except json.JSONDecodeError:
+            yield number, None
+
+
+def validate_row(row: Any) -> tuple[str, str, str, str | None]:
+    """
+    Проверить строку импорта по правилам ContactModel.
+
+    Возвращает (name, email, phone, phone_normalized).
+    """
+    if not isinstance(row, dict):
+        raise ValueError("Row must be a JSON object")
+    name, email, phone = (
+        str(row.get(key) or "").strip()
+        for key in ("name", "email", "phone")
+    )
+    if not name:
+        raise ValueError("Name is required")
+    if len(name) > LENGTH_NAME_USER:
+        raise ValueError(
+            f"Name is longer than {LENGTH_NAME_USER} characters"
+        )
+    if len(email) > LENGTH_EMAIL or not _email_re.match(email):
+        raise ValueError("Invalid email format")
+    if not phone:
+        raise ValueError("Phone is required")
+    if len(phone) > LENGTH_PHONE:
+        raise ValueError(f"Phone is longer than {LENGTH_PHONE} characters")
+    return name, email, phone, normalize_phone(phone)
+
+
+class ContactImporter:
+    """
+    Массовый импорт контактов организации.
+
+    Строки проверяются пачками и загружаются COPY во временную таблицу,
+    откуда переносятся в contacts одним INSERT ... ON CONFLICT.
+    """
+
+    def __init__(
+        self,
+        con_repo: ContactsRepository,
+        batch_size: int = settings.CONTACT_IMPORT_BATCH_SIZE,
+        max_errors: int = settings.CONTACT_IMPORT_MAX_ERRORS,
+    ):
+        self.con_repo = con_repo
+        self.batch_size = batch_size
+        self.max_errors = max_errors
+
+    async def run(
+        self,
+        organization_id: int,
+        owner_id: int,
+        data: bytes,
+        format: str = "csv",
+        own_only: bool = False,
+    ) -> dict:
+        """
+        Импортировать файл и вернуть отчёт.
+
+        Повтор email внутри файла считается ошибкой строки: в базу
+        попадает первое вхождение. С own_only строка с email чужого
+        контакта организации не применяется и попадает в ошибки.
+        """
+        errors = []
+        failed = 0
+        received = 0
+        first_seen: dict[str, int] = {}
+        try:
+            rows = iter_rows(data, format)
+            await self.con_repo.create_import_staging()
+            while batch := list(islice(rows, self.batch_size)):
+                records = []
+                for number, row in batch:
+                    received += 1
+                    try:
+                        record = validate_row(row)
+                        if record[1] in first_seen:
+                            raise ValueError(
+                                "Duplicate email, first seen in row "
+                                f"{first_seen[record[1]]}"
+                            )
+                    except ValueError as e:
+                        failed += 1
+                        if len(errors) < self.max_errors:
+                            errors.append({"row": number, "error": str(e)})
+                        continue
+                    first_seen[record[1]] = number
+                    records.append(record)
+                if records:
+                    await self.con_repo.copy_to_import_staging(records)
+        except ValueError as e:
+            raise HTTPException(400, str(e))
+        inserted, updated, skipped = (
+            await self.con_repo.merge_import_staging(
+                organization_id=organization_id,
+                owner_id=owner_id,
+                own_only=own_only,
+            )
+        )
+        for number in sorted(first_seen[email] for email in skipped):
+            failed += 1
+            if len(errors) < self.max_errors:
+                errors.append({
+                    "row": number,
+                    "error": "Contact with this email belongs to another user"
+                })
+        errors.sort(key=lambda error: error["row"])
+        invalidate_counts("contacts", organization_id)
+        invalidate_contact_suggestions_on_commit(
+            self.con_repo.session.sync_session,
+            organization_id
+        )
+        invalidate_contact_phone_on_commit(
+            self.con_repo.session.sync_session,
+            organization_id
+        )
+        return {
+            "received": received,
+            "inserted": inserted,
+            "updated": updated,
+            "failed": failed,
+            "errors": errors,
+        }
+
+
+async def main(args):
+    with open(args.path, "rb") as file:
+        data = file.read()
+    async with session_factory() as session, session.begin():
+        report = await ContactImporter(ContactsRepository(session)).run(
+            organization_id=args.organization_id,
+            owner_id=args.owner_id,
+            data=data,
+            format=args.format,
+        )
+    print(json.dumps(report, ensure_ascii=False, indent=2))
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        description="Импорт контактов из CSV или NDJSON."
+    )
+    parser.add_argument("path")
+    parser.add_argument("--organization-id", type=int, required=True)
+    parser.add_argument("--owner-id", type=int, required=True)
+    parser.add_argument("--format", choices=IMPORT_FORMATS, default="csv")
+    asyncio.run(main(parser.parse_args()))
@@ -1,7 +1,21 @@
+import asyncio
+
+from fastapi import HTTPException
+
+from repositories.cache import (
+    OrgPrefixIndex,
+    contact_phone_cache,
+    contact_suggest_index,
+)
+from repositories.config import settings
 from repositories.contacts_rep import ContactsRepository
-from api.v1.schemas.contacts_schemas import ContactsSchema
+from services.list_counts import CountMode, total_count
+from api.v1.schemas.contacts_schemas import (
+    ContactsSchema,
+    ContactSuggestSchema,
+)
 from models import ContactModel, OrganizationMemberModel
-from models.constants import MemberRole
+from models.constants import MemberRole, normalize_phone
 
 
 class ContactService:
@@ -10,8 +24,21 @@ class ContactService:
     def __init__(
         self,
         con_repo: ContactsRepository,
+        primary_repo: ContactsRepository | None = None,
     ):
         self.con_repo = con_repo
+        # Чтения, которые кэшируются в памяти процесса, идут в primary.
+        self.primary_repo = primary_repo or con_repo
+
+    @staticmethod
+    def check_search(search: str | None) -> None:
+        """Отклонить слишком короткий поисковый запрос."""
+        min_length = settings.CONTACT_SEARCH_MIN_LENGTH
+        if search and len(search.strip()) < min_length:
+            raise HTTPException(
+                400,
+                f"Search term must be at least {min_length} characters"
+            )
 
     async def get_user_contacts(
         self,
@@ -24,32 +51,121 @@ class ContactService:
         owner_id: int | None = None
     ) -> list[ContactsSchema]:
         """Получить организации, в которых состоит пользователь."""
+        contacts, _ = await self.get_user_contacts_page(
+            user_id=user_id,
+            organization_id=organization_id,
+            member=member,
+            page=page,
+            page_size=page_size,
+            search=search,
+            owner_id=owner_id,
+        )
+        return contacts
+
+    async def get_user_contacts_page(
+        self,
+        user_id: int,
+        organization_id: int,
+        member: OrganizationMemberModel,
+        page: int = 1,
+        page_size: int = 20,
+        search: str | None = None,
+        owner_id: int | None = None,
+        order_by: str = "name",
+        order: str = "asc",
+        cursor: str | None = None,
+    ) -> tuple[list[ContactsSchema], str | None]:
+        """
+        Страница контактов и курсор следующей страницы.
+
+        Курсор возвращается, только если страница заполнена целиком;
+        при сортировке по релевантности страницы листаются через page.
+        """
+        self.check_search(search)
         if member.role not in (
             MemberRole.OWNER,
             MemberRole.ADMIN,
             MemberRole.MANAGER
         ):
             owner_id = user_id
+        relevance = order_by == "relevance" and bool(search)
+        if relevance and cursor is not None:
+            raise HTTPException(400, "Cursor is not supported for relevance")
+        seek = None
+        if cursor is not None:
+            try:
+                seek = self.con_repo.parse_cursor(cursor, order_by, order)
+            except ValueError:
+                raise HTTPException(400, "Invalid cursor")
         contacts = await self.con_repo.get_contacts_by_user(
             organization_id=organization_id,
             user_id=user_id,
             search=search,
             owner_id=owner_id,
             limit=page_size,
-            offset=(page - 1) * page_size
+            offset=(page - 1) * page_size,
+            order_by=order_by,
+            order=order,
+            cursor=seek,
         )
-        return [
-            ContactsSchema(
-                id=field.id,
-                owner_id=field.owner_id,
-                organization_id=field.organization_id,
-                name=field.name,
-                email=field.email,
-                phone=field.phone,
-                created_at=field.created_at,
+        next_cursor = None
+        if len(contacts) == page_size and not relevance:
+            next_cursor = self.con_repo.make_cursor(
+                contacts[-1],
+                order_by,
+                order
+            )
+        return (
+            [
+                ContactsSchema(
+                    id=field.id,
+                    owner_id=field.owner_id,
+                    organization_id=field.organization_id,
+                    name=field.name,
+                    email=field.email,
+                    phone=field.phone,
+                    created_at=field.created_at,
+                )
+                for field in contacts
+            ],
+            next_cursor
+        )
+
+    async def count_user_contacts(
+        self,
+        user_id: int,
+        organization_id: int,
+        member: OrganizationMemberModel,
+        mode: CountMode,
+        search: str | None = None,
+        owner_id: int | None = None,
+    ) -> str:
+        """Итог для X-Total-Count списка контактов."""
+        self.check_search(search)
+        if member.role not in (
+            MemberRole.OWNER,
+            MemberRole.ADMIN,
+            MemberRole.MANAGER
+        ) or owner_id is None:
+            owner_id = user_id
+        filters = {"search": search, "owner_id": owner_id}
+
+        async def count(cap: int | None) -> int:
+            return await self.primary_repo.count_contacts(
+                organization_id=organization_id,
+                user_id=user_id,
+                search=search,
+                owner_id=owner_id,
+                cap=cap,
             )
-            for field in contacts
-        ]
+
+        return await total_count(
+            "contacts",
+            organization_id,
+            mode,
+            filters,
+            count
+        )
 
     async def create_contact(
         self,
@@ -69,3 +185,114 @@ class ContactService:
         )
         contact = await self.con_repo.create(contact)
         return ContactsSchema.model_validate(contact)
+
+    async def build_suggest_index(
+        self,
+        organization_id: int
+    ) -> OrgPrefixIndex | None:
+        """
+        Построить и закэшировать индекс подсказок организации;
+        None, если контактов больше CONTACT_SUGGEST_MAX_ITEMS.
+        """
+        max_items = contact_suggest_index.max_items
+        rows = await self.primary_repo.get_suggest_rows(
+            organization_id,
+            limit=max_items + 1
+        )
+        if len(rows) > max_items:
+            contact_suggest_index.mark_oversized(organization_id)
+            return None
+        index = await asyncio.to_thread(OrgPrefixIndex, rows)
+        if not contact_suggest_index.set(organization_id, index):
+            return None
+        return index
+
+    async def suggest_contacts(
+        self,
+        user_id: int,
+        organization_id: int,
+        member: OrganizationMemberModel,
+        prefix: str,
+        limit: int = 10,
+    ) -> list[ContactSuggestSchema]:
+        """
+        Подсказки контактов по префиксу имени или email.
+
+        Отвечает из префиксного индекса организации в памяти процесса;
+        индекс строится при первом запросе в пуле потоков, чтобы
+        сортировка ключей не блокировала event loop. Организации, не
+        влезающие в CONTACT_SUGGEST_MAX_ITEMS, помечаются в кэше и
+        обслуживаются запросом к БД без повторной загрузки контактов.
+        """
+        prefix = prefix.strip()
+        if not prefix:
+            return []
+        owner_id = None
+        if member.role not in (
+            MemberRole.OWNER,
+            MemberRole.ADMIN,
+            MemberRole.MANAGER
+        ):
+            owner_id = user_id
+        index = None
+        if not contact_suggest_index.is_oversized(organization_id):
+            index = contact_suggest_index.get(organization_id)
+            if index is None:
+                index = await self.build_suggest_index(organization_id)
+        if index is not None:
+            found = index.search(prefix, limit, owner_id)
+        else:
+            found = await self.con_repo.suggest_contacts(
+                organization_id=organization_id,
+                prefix=prefix,
+                limit=limit,
+                owner_id=owner_id,
+            )
+        return [
+            ContactSuggestSchema(id=item_id, name=name, email=email)
+            for item_id, name, email in found
+        ]
+
+    async def lookup_phone(
+        self,
+        user_id: int,
+        organization_id: int,
+        member: OrganizationMemberModel,
+        phone: str,
+    ) -> list[ContactsSchema]:
+        """
+        Контакты с номером телефона в любом формате записи.
+
+        Номер приводится к E.164; найденные по номеру контакты
+        кэшируются в памяти процесса, повторный звонок с того же номера
+        не ходит в БД. Пустой результат не кэшируется: только что
+        созданный контакт находится сразу после коммита.
+        """
+        phone_normalized = normalize_phone(phone)
+        if phone_normalized is None:
+            raise HTTPException(400, "Invalid phone number")
+        owner_id = None
+        if member.role not in (
+            MemberRole.OWNER,
+            MemberRole.ADMIN,
+            MemberRole.MANAGER
+        ):
+            owner_id = user_id
+        key = (organization_id, phone_normalized)
+        # По номеру хранятся результаты для всей организации (None)
+        # и для отдельных владельцев.
+        cached = contact_phone_cache.get(key) or {}
+        contacts = cached.get(owner_id)
+        if contacts is None:
+            contacts = [
+                ContactsSchema.model_validate(contact)
+                for contact in await self.primary_repo.get_by_phone(
+                    organization_id=organization_id,
+                    phone_normalized=phone_normalized,
+                    limit=settings.CONTACT_PHONE_LOOKUP_LIMIT,
+                    owner_id=owner_id,
+                )
+            ]
+            if contacts:
+                contact_phone_cache.set(key, {**cached, owner_id: contacts})
+        return contacts
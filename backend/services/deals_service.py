@@ -1,7 +1,12 @@
-from typing import Optional
+import csv
+import io
+from typing import AsyncIterator, Optional
 
 from fastapi import HTTPException
+from repositories.cache import invalidate_counts
+from repositories.config import settings
 from services.activity_service import ActivityService
+from services.list_counts import CountMode, total_count
 from models import DealModel
 from models.constants import (
     MemberRole,
@@ -9,7 +14,7 @@ from models.constants import (
     StatusDeal
 )
 from repositories.deals_rep import DealsRepository
-from api.v1.schemas.deals_schemas import DealsSchema
+from api.v1.schemas.deals_schemas import DealCreateSchema, DealsSchema
 
 
 class DealService:
@@ -18,10 +23,13 @@ class DealService:
     def __init__(
         self,
         deal_repo: DealsRepository,
-        activity_service: Optional[ActivityService] = None
+        activity_service: Optional[ActivityService] = None,
+        primary_repo: Optional[DealsRepository] = None,
     ):
         self.deal_repo = deal_repo
         self.activity_service = activity_service
+        # Чтения, которые кэшируются в памяти процесса, идут в primary.
+        self.primary_repo = primary_repo or deal_repo
 
     async def get_user_deals(
         self,
@@ -39,6 +47,49 @@ class DealService:
         owner_id: Optional[int] = None,
     ) -> list[DealsSchema]:
         """Получить сделки, в которых состоит пользователь."""
+        deals, _ = await self.get_user_deals_page(
+            user_id=user_id,
+            organization_id=organization_id,
+            page=page,
+            page_size=page_size,
+            order_by=order_by,
+            order=order,
+            user_role=user_role,
+            status=status,
+            min_amount=min_amount,
+            max_amount=max_amount,
+            stage=stage,
+            owner_id=owner_id,
+        )
+        return deals
+
+    async def get_user_deals_page(
+        self,
+        user_id: int,
+        organization_id: int,
+        page: int,
+        page_size: int,
+        order_by: str,
+        order: str,
+        user_role: str,
+        status: Optional[list[str]] = None,
+        min_amount: Optional[float] = None,
+        max_amount: Optional[float] = None,
+        stage: Optional[str] = None,
+        owner_id: Optional[int] = None,
+        cursor: Optional[str] = None,
+    ) -> tuple[list[DealsSchema], Optional[str]]:
+        """
+        Страница сделок и курсор следующей страницы.
+
+        Курсор возвращается, только если страница заполнена целиком.
+        """
+        seek = None
+        if cursor is not None:
+            try:
+                seek = self.deal_repo.parse_cursor(cursor, order_by, order)
+            except ValueError:
+                raise HTTPException(400, "Invalid cursor")
         deals = await self.deal_repo.get_deals(
             organization_id=organization_id,
             user_id=user_id,
@@ -52,8 +103,110 @@ class DealService:
             order_by=order_by,
             order=order,
             user_role=user_role,
+            cursor=seek,
+        )
+        next_cursor = None
+        if len(deals) == page_size:
+            next_cursor = self.deal_repo.make_cursor(
+                deals[-1],
+                order_by,
+                order
+            )
+        return (
+            [DealsSchema.model_validate(deal) for deal in deals],
+            next_cursor
+        )
+
+    async def export_deals(
+        self,
+        user_id: int,
+        organization_id: int,
+        user_role: str,
+        format: str = "ndjson",
+        order_by: str = "created_at",
+        order: str = "desc",
+        status: Optional[list[str]] = None,
+        min_amount: Optional[float] = None,
+        max_amount: Optional[float] = None,
+        stage: Optional[str] = None,
+        owner_id: Optional[int] = None,
+    ) -> AsyncIterator[str]:
+        """Сделки списка построчно в формате NDJSON или CSV."""
+        deals = self.deal_repo.stream_deals(
+            organization_id=organization_id,
+            user_id=user_id,
+            user_role=user_role,
+            status=status,
+            min_amount=min_amount,
+            max_amount=max_amount,
+            stage=stage,
+            owner_id=owner_id,
+            order_by=order_by,
+            order=order,
+        )
+        if format == "csv":
+            buffer = io.StringIO()
+            writer = csv.DictWriter(
+                buffer,
+                fieldnames=list(DealsSchema.model_fields)
+            )
+            writer.writeheader()
+            async for deal in deals:
+                writer.writerow(
+                    DealsSchema.model_validate(deal).model_dump(mode="json")
+                )
+                yield buffer.getvalue()
+                buffer.seek(0)
+                buffer.truncate()
+            if buffer.tell():
+                yield buffer.getvalue()
+            return
+        async for deal in deals:
+            yield DealsSchema.model_validate(deal).model_dump_json() + "\n"
+
+    async def count_user_deals(
+        self,
+        user_id: int,
+        organization_id: int,
+        user_role: str,
+        mode: CountMode,
+        status: Optional[list[str]] = None,
+        min_amount: Optional[float] = None,
+        max_amount: Optional[float] = None,
+        stage: Optional[str] = None,
+        owner_id: Optional[int] = None,
+    ) -> str:
+        """Итог для X-Total-Count списка сделок."""
+        if user_role == MemberRole.MEMBER:
+            owner_id = user_id
+        filters = {
+            "status": sorted(status or []),
+            "min_amount": min_amount,
+            "max_amount": max_amount,
+            "stage": stage,
+            "owner_id": owner_id,
+        }
+
+        async def count(cap: Optional[int]) -> int:
+            return await self.primary_repo.count_deals(
+                organization_id=organization_id,
+                user_id=user_id,
+                user_role=user_role,
+                status=status,
+                min_amount=min_amount,
+                max_amount=max_amount,
+                stage=stage,
+                owner_id=owner_id,
+                cap=cap,
+            )
+
+        return await total_count(
+            "deals",
+            organization_id,
+            mode,
+            filters,
+            count
         )
-        return [DealsSchema.model_validate(deal) for deal in deals]
 
     async def create_deal(
         self,
@@ -87,30 +240,79 @@ class DealService:
         deal = await self.deal_repo.create(deal)
         return DealsSchema.model_validate(deal)
 
-    async def update_deal(
+    async def create_deals(
         self,
-        deal_id: int,
-        user_role: str,
+        deals: list[DealCreateSchema],
+        current_user_id: int,
         organization_id: int,
+    ) -> list[DealsSchema]:
+        """
+        Создать пакет сделок.
+
+        Контакты всех сделок проверяются одним запросом, сделки
+        добавляются одним INSERT; при ошибке не создаётся ни одна.
+        """
+        if len(deals) > settings.DEAL_BATCH_MAX_SIZE:
+            raise HTTPException(
+                400,
+                f"Batch size exceeds {settings.DEAL_BATCH_MAX_SIZE} deals"
+            )
+        contact_ids = sorted({deal.contact_id for deal in deals})
+        found = await self.deal_repo.get_contact_ids_in_org(
+            contact_ids,
+            organization_id
+        )
+        missing = [i for i in contact_ids if i not in found]
+        if missing:
+            raise HTTPException(
+                status_code=400,
+                detail=(
+                    "Contacts do not belong to this organization: "
+                    + ", ".join(map(str, missing))
+                )
+            )
+        created = await self.deal_repo.create_many([
+            {
+                "organization_id": organization_id,
+                "owner_id": current_user_id,
+                "contact_id": deal.contact_id,
+                "title": deal.title,
+                "amount": deal.amount,
+                "currency": deal.currency,
+                "status": StatusDeal.NEW,
+                "stage": StageDeal.QUALIFICATION,
+            }
+            for deal in deals
+        ])
+        invalidate_counts("deals", organization_id)
+        return [DealsSchema.model_validate(deal) for deal in created]
+
+    @staticmethod
+    def check_transition(
+        deal: DealModel,
+        user_role: str,
         status: Optional[StatusDeal] = None,
         stage: Optional[StageDeal] = None,
-        current_user_id: Optional[int] = None,
-    ) -> DealsSchema:
-        """Частичное обновление сделки."""
-        deal = await self.deal_repo.get_by_id(deal_id)
-        if not deal or deal.organization_id != organization_id:
-            raise HTTPException(404, "Deal not found in organization")
-        activities_to_create = []
+    ) -> list[tuple[str, dict]]:
+        """
+        Проверить смену статуса и стадии сделки.
+
+        Возвращает активности (type, payload), которые нужно записать;
+        при нарушении правил выбрасывает HTTPException.
+        """
+        activities = []
         try:
             if status is not None and status != deal.status:
-                act_type, payload = deal.status.get_activity_change(status)
-                deal.status = status
-                activities_to_create.append({
-                    "type": act_type,
-                    "payload": payload
-                })
+                activities.append(deal.status.get_activity_change(status))
         except ValueError as e:
             raise HTTPException(400, str(e))
+        # Проверка DealModel.validate_won_status: массовый переход
+        # обновляет сделки Core UPDATE в обход валидатора модели.
+        if status == StatusDeal.WON and deal.amount <= 0:
+            raise HTTPException(
+                400,
+                "Cannot close deal with status 'won' when amount <= 0"
+            )
         if stage is not None and stage != deal.stage:
             if stage == StageDeal.CLOSED and deal.amount <= 0:
                 raise HTTPException(400, "Cannot close deal with amount <= 0")
@@ -128,24 +330,113 @@ class DealService:
                         403,
                         "Member cannot move stage backward"
                     )
-                activity_type, payload = deal.stage.get_activity_change(stage)
-                deal.stage = stage
-                activities_to_create.append({
-                    "type": activity_type,
-                    "payload": payload
-                })
+                activities.append(deal.stage.get_activity_change(stage))
+        return activities
+
+    async def update_deal(
+        self,
+        deal_id: int,
+        user_role: str,
+        organization_id: int,
+        status: Optional[StatusDeal] = None,
+        stage: Optional[StageDeal] = None,
+        current_user_id: Optional[int] = None,
+    ) -> DealsSchema:
+        """Частичное обновление сделки."""
+        deal = await self.deal_repo.get_by_id(deal_id)
+        if not deal or deal.organization_id != organization_id:
+            raise HTTPException(404, "Deal not found in organization")
+        activities = self.check_transition(deal, user_role, status, stage)
+        if status is not None:
+            deal.status = status
+        if stage is not None:
             deal.stage = stage
         deal = await self.deal_repo.update(deal)
-        for act in activities_to_create:
+        for act_type, payload in activities:
             if self.activity_service is not None:
                 await self.activity_service.create_activity(
                     deal_id=deal.id,
-                    type=act["type"],
-                    payload=act["payload"],
+                    type=act_type,
+                    payload=payload,
                     author_id=current_user_id
                 )
         return DealsSchema.model_validate(deal)
 
+    async def transition_deals(
+        self,
+        deal_ids: list[int],
+        user_role: str,
+        organization_id: int,
+        status: Optional[StatusDeal] = None,
+        stage: Optional[StageDeal] = None,
+        current_user_id: Optional[int] = None,
+    ) -> list[dict]:
+        """
+        Перевести пакет сделок в один статус и стадию.
+
+        Правила те же, что у update_deal, и проверяются для каждой
+        сделки отдельно: сделки, не прошедшие проверку, остаются без
+        изменений и попадают в отчёт с причиной. Остальные обновляются
+        одним UPDATE, их активности записываются одним INSERT.
+        """
+        if len(deal_ids) > settings.DEAL_BATCH_MAX_SIZE:
+            raise HTTPException(
+                400,
+                f"Batch size exceeds {settings.DEAL_BATCH_MAX_SIZE} deals"
+            )
+        deal_ids = list(dict.fromkeys(deal_ids))
+        deals = await self.deal_repo.get_by_ids_for_update(
+            deal_ids,
+            organization_id
+        )
+        results = []
+        changed = []
+        activities = []
+        for deal_id in deal_ids:
+            deal = deals.get(deal_id)
+            try:
+                if deal is None:
+                    raise HTTPException(404, "Deal not found in organization")
+                changes = self.check_transition(
+                    deal,
+                    user_role,
+                    status,
+                    stage
+                )
+            except HTTPException as e:
+                results.append({
+                    "deal_id": deal_id,
+                    "success": False,
+                    "error": e.detail
+                })
+                continue
+            if (
+                (status is not None and status != deal.status)
+                or (stage is not None and stage != deal.stage)
+            ):
+                changed.append(deal_id)
+            activities.extend(
+                {
+                    "deal_id": deal_id,
+                    "type": act_type,
+                    "payload": payload,
+                    "author_id": current_user_id,
+                }
+                for act_type, payload in changes
+            )
+            results.append({"deal_id": deal_id, "success": True})
+        values = {
+            key: value
+            for key, value in (("status", status), ("stage", stage))
+            if value is not None
+        }
+        if changed and values:
+            await self.deal_repo.update_many(changed, **values)
+            invalidate_counts("deals", organization_id)
+        if activities and self.activity_service is not None:
+            await self.activity_service.create_activities(activities)
+        return results
+
     async def get_summary(self, organization_id: int, days: int = 30):
         return await self.deal_repo.get_summary(organization_id, days)
 
@@ -0,0 +1,33 @@
+from typing import Awaitable, Callable, Literal, Optional
+
+from repositories.cache import count_cache, filters_key
+from repositories.config import settings
+
+
+CountMode = Literal["exact", "estimated"]
+
+
+async def total_count(
+    table: str,
+    organization_id: int,
+    mode: CountMode,
+    filters: dict,
+    count: Callable[[Optional[int]], Awaitable[int]],
+) -> str:
+    """
+    Значение заголовка X-Total-Count для списка.
+
+    exact — точный COUNT(*) по фильтрам списка. estimated — подсчёт
+    не дальше COUNT_ESTIMATE_CAP строк: при превышении возвращается
+    "<cap>+". Результат кэшируется на COUNT_CACHE_TTL_SECONDS по ключу
+    (таблица, организация, режим, фильтры).
+    """
+    key = (table, organization_id, mode, filters_key(filters))
+    cached = count_cache.get(key)
+    if cached is not None:
+        return cached
+    cap = None if mode == "exact" else settings.COUNT_ESTIMATE_CAP
+    total = await count(cap)
+    value = f"{cap}+" if cap is not None and total > cap else str(total)
+    count_cache.set(key, value)
+    return value
@@ -0,0 +1,73 @@
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+
+from fastapi import HTTPException
+
+from models import UserModel
+from repositories.config import settings
+
+
+class PasswordHasher:
+    """
+    Выполняет bcrypt в отдельном пуле потоков.
+
+    bcrypt отпускает GIL, поэтому хеширование не блокирует event loop.
+    Если в очереди уже queue_limit операций, новые запросы отклоняются
+    с 503, чтобы всплеск логинов не копил бесконечную очередь.
+    """
+
+    def __init__(self, max_workers: int, queue_limit: int):
+        self.max_workers = max_workers
+        self.queue_limit = queue_limit
+        self.pending = 0
+        self._executor: ThreadPoolExecutor | None = None
+
+    @property
+    def executor(self) -> ThreadPoolExecutor:
+        if self._executor is None:
+            self._executor = ThreadPoolExecutor(
+                max_workers=self.max_workers,
+                thread_name_prefix="password-hasher",
+            )
+        return self._executor
+
+    async def _run(self, func, *args):
+        if self.pending >= self.queue_limit:
+            raise HTTPException(
+                status_code=503,
+                detail="Сервис аутентификации перегружен, повторите позже",
+                headers={"Retry-After": "1"},
+            )
+        self.pending += 1
+        try:
+            loop = asyncio.get_running_loop()
+            return await loop.run_in_executor(self.executor, func, *args)
+        finally:
+            self.pending -= 1
+
+    async def hash_password(self, password: str) -> str:
+        """Хеш пароля."""
+        return await self._run(UserModel.hash_password, password)
+
+    async def verify_password(
+        self,
+        password: str,
+        hashed_password: str
+    ) -> bool:
+        """Проверка пароля."""
+        return await self._run(
+            UserModel.verify_password,
+            password,
+            hashed_password
+        )
+
+    def shutdown(self):
+        if self._executor is not None:
+            self._executor.shutdown(wait=True)
+            self._executor = None
+
+
+password_hasher = PasswordHasher(
+    max_workers=settings.PASSWORD_HASH_WORKERS,
+    queue_limit=settings.PASSWORD_HASH_QUEUE_LIMIT,
+)
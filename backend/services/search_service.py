@@ -0,0 +1,79 @@
+import re
+from typing import Optional
+
+from fastapi import HTTPException
+
+from models import OrganizationMemberModel
+from models.constants import MemberRole
+from repositories.config import settings
+from repositories.search_rep import SearchRepository
+from api.v1.schemas.search_schemas import SearchHitSchema
+
+
+# Символы синтаксиса tsquery, которые вырезаются из слов запроса.
+_TSQUERY_SPECIAL = re.compile(r"[&|!():*<>'\\]")
+
+
+def build_tsquery(text: str) -> str:
+    """
+    Запрос пользователя в виде tsquery: каждое слово ищется как
+    префикс, слова объединяются через И. Слова короче
+    SEARCH_MIN_LENGTH отбрасываются — префикс из одной буквы
+    совпадает почти с каждым документом.
+    """
+    words = [
+        _TSQUERY_SPECIAL.sub("", word)
+        for word in text.lower().split()
+    ]
+    words = [
+        word for word in words
+        if len(word) >= settings.SEARCH_MIN_LENGTH
+    ][:settings.SEARCH_MAX_TERMS]
+    return " & ".join(f"'{word}':*" for word in words)
+
+
+class SearchService:
+    """Сервис полнотекстового поиска по сущностям организации."""
+
+    def __init__(self, search_repo: SearchRepository):
+        self.search_repo = search_repo
+
+    async def search(
+        self,
+        organization_id: int,
+        user_id: int,
+        member: OrganizationMemberModel,
+        q: str,
+        entity_types: Optional[list[str]] = None,
+        limit: int = 20,
+    ) -> list[SearchHitSchema]:
+        """Найти контакты, сделки, задачи и комментарии организации."""
+        if len(q.strip()) < settings.SEARCH_MIN_LENGTH:
+            raise HTTPException(
+                400,
+                "Search term must be at least "
+                f"{settings.SEARCH_MIN_LENGTH} characters"
+            )
+        tsquery = build_tsquery(q)
+        if not tsquery:
+            return []
+        owner_id = None
+        if member.role == MemberRole.MEMBER:
+            owner_id = user_id
+        hits = await self.search_repo.search(
+            organization_id=organization_id,
+            tsquery=tsquery,
+            limit=limit,
+            entity_types=entity_types,
+            owner_id=owner_id,
+        )
+        return [
+            SearchHitSchema(
+                type=entity_type,
+                id=entity_id,
+                deal_id=deal_id,
+                title=title,
+                rank=rank,
+            )
+            for entity_type, entity_id, deal_id, title, rank in hits
+        ]
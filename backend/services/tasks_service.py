@@ -1,10 +1,11 @@
 from datetime import date
-from typing import Optional
+from typing import AsyncIterator, Optional
 
 from fastapi import HTTPException
+from repositories.config import settings
 from repositories.tasks_rep import TasksRepository
 from models.constants import MemberRole
-from api.v1.schemas.tasks_schemas import TasksSchema
+from api.v1.schemas.tasks_schemas import TaskCreateSchema, TasksSchema
 
 
 class TaskService:
@@ -23,41 +24,89 @@ class TaskService:
         only_open: Optional[bool] = None,
         due_before: Optional[date] = None,
         due_after: Optional[date] = None,
+        limit: int = 50,
     ) -> list[TasksSchema]:
         """Получить задачи организации."""
+        tasks, _ = await self.get_tasks_page(
+            organization_id=organization_id,
+            deal_id=deal_id,
+            only_open=only_open,
+            due_before=due_before,
+            due_after=due_after,
+            limit=limit,
+        )
+        return tasks
+
+    async def get_tasks_page(
+        self,
+        organization_id: int,
+        deal_id: Optional[int] = None,
+        only_open: Optional[bool] = None,
+        due_before: Optional[date] = None,
+        due_after: Optional[date] = None,
+        limit: int = 50,
+        cursor: Optional[str] = None,
+    ) -> tuple[list[TasksSchema], Optional[str]]:
+        """
+        Страница задач и курсор следующей страницы.
+
+        Курсор возвращается, только если страница заполнена целиком.
+        """
+        seek = None
+        if cursor is not None:
+            try:
+                seek = self.task_repo.parse_cursor(cursor)
+            except ValueError:
+                raise HTTPException(400, "Invalid cursor")
         tasks = await self.task_repo.get_tasks(
             organization_id=organization_id,
             deal_id=deal_id,
             only_open=only_open,
             due_after=due_after,
             due_before=due_before,
+            limit=limit,
+            cursor=seek,
         )
-        return [TasksSchema.model_validate(t) for t in tasks]
+        next_cursor = None
+        if len(tasks) == limit:
+            next_cursor = self.task_repo.make_cursor(tasks[-1])
+        return [TasksSchema.model_validate(t) for t in tasks], next_cursor
 
-    async def create_task(
+    async def stream_tasks(
         self,
-        deal_id: int,
+        organization_id: int,
+        deal_id: Optional[int] = None,
+        only_open: Optional[bool] = None,
+        due_before: Optional[date] = None,
+        due_after: Optional[date] = None,
+    ) -> AsyncIterator[str]:
+        """Задачи организации построчно в формате NDJSON."""
+        async for task in self.task_repo.stream_tasks(
+            organization_id=organization_id,
+            deal_id=deal_id,
+            only_open=only_open,
+            due_after=due_after,
+            due_before=due_before,
+        ):
+            yield TasksSchema.model_validate(task).model_dump_json() + "\n"
+
+    @staticmethod
+    def check_task(
+        deal_owner_id: int,
         title: str,
         description: str,
         due_date: date,
-        organization_id: int,
         user_role: str,
         user_id: int,
-    ) -> TasksSchema:
-        """Создать сделку."""
-        deal = await self.task_repo.get_deal_in_org(
-            deal_id=deal_id,
-            org_id=organization_id
-        )
-        if deal is None:
-            raise HTTPException(400, "Deal not found in organization")
+    ) -> None:
+        """Проверить поля новой задачи и право создать её в сделке."""
         if due_date < date.today():
             raise HTTPException(
                 status_code=400,
                 detail=f"Дата выполнения в прошлом: {due_date}"
             )
         if user_role == MemberRole.MEMBER:
-            if deal.owner_id != user_id:
+            if deal_owner_id != user_id:
                 raise HTTPException(
                     status_code=403,
                     detail="Вы не можете создавать задачи для чужой сделки"
@@ -85,10 +134,118 @@ class TaskService:
                 status_code=400,
                 detail="Длинна описание не может превышать 300 символов"
             )
+
+    async def create_task(
+        self,
+        deal_id: int,
+        title: str,
+        description: str,
+        due_date: date,
+        organization_id: int,
+        user_role: str,
+        user_id: int,
+    ) -> TasksSchema:
+        """Создать сделку."""
+        deal = await self.task_repo.get_deal_in_org(
+            deal_id=deal_id,
+            org_id=organization_id
+        )
+        if deal is None:
+            raise HTTPException(400, "Deal not found in organization")
+        self.check_task(
+            deal_owner_id=deal.owner_id,
+            title=title,
+            description=description,
+            due_date=due_date,
+            user_role=user_role,
+            user_id=user_id,
+        )
         task = await self.task_repo.create({
             "deal_id": deal_id,
+            "organization_id": organization_id,
             "title": title,
             "description": description,
             "due_date": due_date
         })
         return TasksSchema.model_validate(task)
+
+    async def create_tasks(
+        self,
+        tasks: list[TaskCreateSchema],
+        organization_id: int,
+        user_role: str,
+        user_id: int,
+    ) -> list[TasksSchema]:
+        """
+        Создать пакет задач.
+
+        Сделки всех задач проверяются одним запросом, задачи добавляются
+        одним INSERT; при ошибке в любой задаче не создаётся ни одна,
+        а в detail указывается её номер в пакете.
+        """
+        if len(tasks) > settings.TASK_BATCH_MAX_SIZE:
+            raise HTTPException(
+                400,
+                f"Batch size exceeds {settings.TASK_BATCH_MAX_SIZE} tasks"
+            )
+        owners = await self.task_repo.get_deal_owners_in_org(
+            sorted({task.deal_id for task in tasks}),
+            organization_id
+        )
+        for index, task in enumerate(tasks):
+            if task.deal_id not in owners:
+                raise HTTPException(
+                    400,
+                    f"Task {index}: Deal not found in organization"
+                )
+            try:
+                self.check_task(
+                    deal_owner_id=owners[task.deal_id],
+                    title=task.title,
+                    description=task.description,
+                    due_date=task.due_date,
+                    user_role=user_role,
+                    user_id=user_id,
+                )
+            except HTTPException as e:
+                raise HTTPException(
+                    e.status_code,
+                    f"Task {index}: {e.detail}"
+                )
+        created = await self.task_repo.create_many([
+            {
+                "deal_id": task.deal_id,
+                "organization_id": organization_id,
+                "title": task.title,
+                "description": task.description,
+                "due_date": task.due_date,
+            }
+            for task in tasks
+        ])
+        return [TasksSchema.model_validate(task) for task in created]
+
+    async def complete_tasks(
+        self,
+        task_ids: list[int],
+        organization_id: int,
+        user_role: str,
+        user_id: int,
+    ) -> list[TasksSchema]:
+        """
+        Отметить задачи выполненными.
+
+        MEMBER закрывает только задачи своих сделок. Возвращаются
+        задачи, которые удалось отметить; чужие и несуществующие id
+        пропускаются.
+        """
+        if len(task_ids) > settings.TASK_BATCH_MAX_SIZE:
+            raise HTTPException(
+                400,
+                f"Batch size exceeds {settings.TASK_BATCH_MAX_SIZE} tasks"
+            )
+        tasks = await self.task_repo.complete_many(
+            task_ids=list(dict.fromkeys(task_ids)),
+            org_id=organization_id,
+            owner_id=user_id if user_role == MemberRole.MEMBER else None,
+        )
+        return [TasksSchema.model_validate(task) for task in tasks]
@@ -0,0 +1,86 @@
+import asyncio
+import logging
+import time
+
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+
+from repositories.config import settings
+from repositories.database import session_factory
+from repositories.refresh_token_rep import RefreshTokenRepository
+
+
+logger = logging.getLogger(__name__)
+
+
+class RefreshTokenReaper:
+    """Фоновая очистка отозванных и истёкших refresh-токенов."""
+
+    def __init__(
+        self,
+        factory: async_sessionmaker[AsyncSession],
+        batch_size: int,
+        pause: float = 0,
+    ):
+        self.factory = factory
+        self.batch_size = batch_size
+        self.pause = pause
+        self.runs = 0
+        self.rows_removed = 0
+        self.seconds_spent = 0.0
+        self.last_run_rows = 0
+        self.last_run_seconds = 0.0
+
+    async def run_once(self) -> int:
+        """Удалять пачками, пока пачка заполняется целиком."""
+        started = time.perf_counter()
+        removed = 0
+        while True:
+            # Каждая пачка — отдельная короткая транзакция.
+            async with self.factory() as session, session.begin():
+                batch = await RefreshTokenRepository(
+                    session
+                ).delete_stale_batch(self.batch_size)
+            removed += batch
+            if batch < self.batch_size:
+                break
+            await asyncio.sleep(self.pause)
+        elapsed = time.perf_counter() - started
+        self.runs += 1
+        self.rows_removed += removed
+        self.seconds_spent += elapsed
+        self.last_run_rows = removed
+        self.last_run_seconds = elapsed
+        logger.info(
+            "Удалено refresh-токенов: %s за %.3f с", removed, elapsed
+        )
+        return removed
+
+    async def run_forever(self, interval: float):
+        while True:
+            try:
+                await self.run_once()
+            except Exception:
+                logger.exception("Ошибка очистки refresh-токенов")
+            await asyncio.sleep(interval)
+
+    def stats(self) -> dict:
+        return {
+            "runs": self.runs,
+            "rows_removed": self.rows_removed,
+            "seconds_spent": round(self.seconds_spent, 3),
+            "last_run_rows": self.last_run_rows,
+            "last_run_seconds": round(self.last_run_seconds, 3),
+        }
+
+
+refresh_token_reaper = RefreshTokenReaper(
+    session_factory,
+    batch_size=settings.REFRESH_TOKEN_REAPER_BATCH_SIZE,
+    pause=settings.REFRESH_TOKEN_REAPER_PAUSE_SECONDS,
+)
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO)
+    asyncio.run(refresh_token_reaper.run_once())
+    print(refresh_token_reaper.stats())
@@ -0,0 +1,155 @@
+"""
+Замер задачи поиска дубликатов контактов.
+
+При --seed загружает в организацию указанное число контактов COPY,
+из них --duplicate-share — искажённые копии других (опечатка в имени,
+другой регистр или точки в email, тот же телефон с новым email).
+Затем запускает ContactDeduplicator и печатает отчёт, время и долю
+найденных подброшенных дубликатов. Запускается из корня репозитория
+с настройками БД в окружении:
+
+    PYTHONPATH=backend python benchmarks/contact_dedup.py \\
+        --organization-id 1 --owner-id 1 --seed 1000000
+"""
+import argparse
+import asyncio
+import random
+import string
+import time
+from datetime import datetime
+
+from sqlalchemy import select
+
+from models import ContactDuplicateModel
+from models.constants import normalize_phone
+from repositories.database import session_factory
+from repositories.duplicates_rep import ContactDuplicatesRepository
+from services.contact_dedup import ContactDeduplicator
+
+
+SYLLABLES = [
+    "ka", "lo", "mi", "ne", "ro", "sa", "tu", "vi", "da", "be",
+    "go", "ri", "ma", "no", "pe", "ze", "ha", "li", "mo", "ta",
+]
+SEED_CHUNK = 100000
+
+
+def make_name(rng: random.Random) -> str:
+    def word(syllables: int) -> str:
+        return "".join(
+            rng.choice(SYLLABLES) for _ in range(syllables)
+        ).capitalize()
+    return f"{word(rng.randint(2, 3))} {word(rng.randint(3, 4))}"
+
+
+def make_contact(rng: random.Random, i: int) -> tuple:
+    name = make_name(rng)
+    local = name.lower().replace(" ", ".") + str(i)
+    phone = f"+1{rng.randrange(10 ** 10):010d}"
+    return name, f"{local}@example.com", phone
+
+
+def distort(rng: random.Random, contact: tuple, i: int) -> tuple:
+    """Правдоподобная копия контакта с другим email."""
+    name, email, phone = contact
+    local, _, domain = email.partition("@")
+    variant = i % 3
+    if variant == 0:
+        position = rng.randrange(1, len(name) - 1)
+        letter = rng.choice(string.ascii_lowercase)
+        name = name[:position] + letter + name[position + 1:]
+        return name, f"{local}+crm@{domain}", phone
+    if variant == 1:
+        return name, f"{local.replace('.', '')}@{domain}".upper(), phone
+    return name, f"{local}@mail.example.org", phone
+
+
+async def seed(args) -> set[tuple[int, int]]:
+    """Загрузить контакты; вернуть пары id подброшенных дубликатов."""
+    rng = random.Random(args.random_seed)
+    originals = []
+    planted = []
+    emails = set()
+    async with session_factory() as session, session.begin():
+        connection = await session.connection()
+        raw = (await connection.get_raw_connection()).driver_connection
+        first_id = await raw.fetchval(
+            "SELECT coalesce(max(id), 0) + 1 FROM contacts"
+        )
+        await raw.execute(
+            "SELECT setval(pg_get_serial_sequence('contacts', 'id'), $1)",
+            first_id + args.seed
+        )
+        for start in range(0, args.seed, SEED_CHUNK):
+            records = []
+            for i in range(start, min(start + SEED_CHUNK, args.seed)):
+                contact = None
+                if originals and rng.random() < args.duplicate_share:
+                    original_id, original = rng.choice(originals)
+                    contact = distort(rng, original, i)
+                    if contact[1] in emails:
+                        contact = None
+                    else:
+                        planted.append((original_id, first_id + i))
+                if contact is None:
+                    contact = make_contact(rng, i)
+                    if len(originals) < 100000:
+                        originals.append((first_id + i, contact))
+                name, email, phone = contact
+                emails.add(email)
+                records.append((
+                    first_id + i, args.owner_id, args.organization_id,
+                    name, email, phone, normalize_phone(phone),
+                    datetime.now(),
+                ))
+            await raw.copy_records_to_table(
+                "contacts",
+                records=records,
+                columns=[
+                    "id", "owner_id", "organization_id", "name", "email",
+                    "phone", "phone_normalized", "created_at",
+                ],
+            )
+    return set(planted)
+
+
+async def main(args):
+    planted = set()
+    if args.seed:
+        started = time.perf_counter()
+        planted = await seed(args)
+        print(f"seeded={args.seed} in {time.perf_counter() - started:.1f}s")
+    started = time.perf_counter()
+    async with session_factory() as session, session.begin():
+        report = await ContactDeduplicator(
+            ContactDuplicatesRepository(session)
+        ).run(args.organization_id)
+    elapsed = time.perf_counter() - started
+    print(report)
+    print(f"time={elapsed:.1f}s")
+    if planted:
+        async with session_factory() as session:
+            result = await session.execute(
+                select(
+                    ContactDuplicateModel.contact_id,
+                    ContactDuplicateModel.duplicate_id,
+                ).where(
+                    ContactDuplicateModel.organization_id
+                    == args.organization_id
+                )
+            )
+            found = set(result.tuples().all())
+        print(
+            f"planted={len(planted)} "
+            f"recall={len(planted & found) / len(planted):.3f}"
+        )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--organization-id", type=int, required=True)
+    parser.add_argument("--owner-id", type=int, required=True)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--duplicate-share", type=float, default=0.05)
+    parser.add_argument("--random-seed", type=int, default=1)
+    asyncio.run(main(parser.parse_args()))
@@ -0,0 +1,61 @@
+"""
+Замер скорости импорта контактов.
+
+Генерирует CSV с заданным числом контактов, отправляет его в
+POST /contacts/import и печатает пропускную способность в строках
+в секунду. Запускается против поднятого сервера:
+
+    python benchmarks/contact_import.py --base-url http://localhost:8000 \\
+        --email user@example.com --password password123 \\
+        --organization-id 1 --rows 200000
+"""
+import argparse
+import asyncio
+import time
+import uuid
+
+import httpx
+
+
+def make_csv(rows: int) -> bytes:
+    prefix = uuid.uuid4().hex[:8]
+    lines = ["name,email,phone"]
+    lines.extend(
+        f"Contact {i},{prefix}.{i}@example.com,+1{i:09d}"
+        for i in range(rows)
+    )
+    return ("\n".join(lines) + "\n").encode()
+
+
+async def main(args):
+    credentials = {"email": args.email, "password": args.password}
+    body = make_csv(args.rows)
+    async with httpx.AsyncClient(base_url=args.base_url, timeout=600) as client:
+        response = await client.post("/api/v1/auth/login", json=credentials)
+        response.raise_for_status()
+        headers = {
+            "Authorization": "Bearer " + response.json()["access_token"],
+            "X-Organization-ID": str(args.organization_id),
+        }
+        started = time.perf_counter()
+        response = await client.post(
+            "/api/v1/contacts/import", headers=headers, content=body
+        )
+        elapsed = time.perf_counter() - started
+    response.raise_for_status()
+    report = response.json()
+    print(
+        f"rows={args.rows} inserted={report['inserted']} "
+        f"updated={report['updated']} failed={report['failed']} "
+        f"time={elapsed:.2f}s rows/s={args.rows / elapsed:,.0f}"
+    )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--base-url", default="http://localhost:8000")
+    parser.add_argument("--email", required=True)
+    parser.add_argument("--password", required=True)
+    parser.add_argument("--organization-id", type=int, required=True)
+    parser.add_argument("--rows", type=int, default=200000)
+    asyncio.run(main(parser.parse_args()))
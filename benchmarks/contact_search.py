@@ -0,0 +1,100 @@
+"""
+Замер задержки поиска контактов.
+
+При --seed загружает в организацию указанное число контактов через
+POST /contacts/import, затем по кругу выполняет GET /contacts/?search=
+для набора запросов и печатает p50/p99 по каждому. Чтобы сравнить
+поиск с trigram-индексами и без них, запустите замер дважды: на
+ревизии d2a6b9f4e013 (alembic downgrade d2a6b9f4e013) и на head.
+
+    python benchmarks/contact_search.py --base-url http://localhost:8000 \\
+        --email user@example.com --password password123 \\
+        --organization-id 1 --seed 1000000
+"""
+import argparse
+import asyncio
+import random
+import statistics
+import time
+import uuid
+
+import httpx
+
+
+FIRST_NAMES = ["Anna", "Boris", "Maria", "Ivan", "Olga", "Petr", "Elena"]
+LAST_NAMES = ["Smirnov", "Ivanova", "Kuznetsov", "Popova", "Sokolov"]
+SEED_CHUNK = 100000
+TERMS = ["smirnov", "ivanova@", "olga kuz", "+7912", "smrnov", "zzzqqq"]
+
+
+def percentile(values: list[float], q: float) -> float:
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    index = min(len(ordered) - 1, int(round(q * (len(ordered) - 1))))
+    return ordered[index]
+
+
+def make_csv(start: int, rows: int, prefix: str) -> bytes:
+    lines = ["name,email,phone"]
+    for i in range(start, start + rows):
+        first = random.choice(FIRST_NAMES)
+        last = random.choice(LAST_NAMES)
+        lines.append(
+            f"{first} {last},{last.lower()}.{prefix}{i}@example.com,"
+            f"+79{random.randrange(10 ** 9):09d}"
+        )
+    return ("\n".join(lines) + "\n").encode()
+
+
+async def seed(client, headers, rows: int):
+    prefix = uuid.uuid4().hex[:6]
+    for start in range(0, rows, SEED_CHUNK):
+        response = await client.post(
+            "/api/v1/contacts/import",
+            headers=headers,
+            content=make_csv(start, min(SEED_CHUNK, rows - start), prefix),
+        )
+        response.raise_for_status()
+    print(f"seeded {rows} contacts")
+
+
+async def main(args):
+    credentials = {"email": args.email, "password": args.password}
+    async with httpx.AsyncClient(base_url=args.base_url, timeout=600) as client:
+        response = await client.post("/api/v1/auth/login", json=credentials)
+        response.raise_for_status()
+        headers = {
+            "Authorization": "Bearer " + response.json()["access_token"],
+            "X-Organization-ID": str(args.organization_id),
+        }
+        if args.seed:
+            await seed(client, headers, args.seed)
+        for term in TERMS:
+            latencies = []
+            for _ in range(args.repeat):
+                started = time.perf_counter()
+                response = await client.get(
+                    "/api/v1/contacts/",
+                    headers=headers,
+                    params={"search": term, "order_by": args.order_by},
+                )
+                latencies.append((time.perf_counter() - started) * 1000)
+                response.raise_for_status()
+            print(
+                f"{term!r:<12} found={len(response.json()):<3} "
+                f"p50={statistics.median(latencies):8.1f}ms "
+                f"p99={percentile(latencies, 0.99):8.1f}ms"
+            )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--base-url", default="http://localhost:8000")
+    parser.add_argument("--email", required=True)
+    parser.add_argument("--password", required=True)
+    parser.add_argument("--organization-id", type=int, required=True)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--repeat", type=int, default=20)
+    parser.add_argument("--order-by", default="name")
+    asyncio.run(main(parser.parse_args()))
@@ -0,0 +1,83 @@
+"""
+Нагрузочный сценарий «шторм логинов».
+
+Параллельно с потоком POST /auth/login опрашивает лёгкий эндпоинт
+GET /organizations/me и показывает, насколько логины замедляют
+остальные запросы. Запускается против поднятого сервера:
+
+    python benchmarks/login_storm.py --base-url http://localhost:8000 \\
+        --email user@example.com --password password123
+"""
+import argparse
+import asyncio
+import statistics
+import time
+
+import httpx
+
+
+def percentile(values: list[float], q: float) -> float:
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    index = min(len(ordered) - 1, int(round(q * (len(ordered) - 1))))
+    return ordered[index]
+
+
+async def worker(client, method, url, deadline, latencies, errors, **kwargs):
+    while time.perf_counter() < deadline:
+        started = time.perf_counter()
+        response = await client.request(method, url, **kwargs)
+        latencies.append((time.perf_counter() - started) * 1000)
+        if response.status_code != 200:
+            errors.append(response.status_code)
+
+
+def report(name: str, latencies: list[float], errors: list, duration: float):
+    print(
+        f"{name:<10} requests={len(latencies):<6} "
+        f"rps={len(latencies) / duration:8.1f} "
+        f"p50={statistics.median(latencies) if latencies else 0:7.1f}ms "
+        f"p99={percentile(latencies, 0.99):7.1f}ms "
+        f"errors={len(errors)}"
+    )
+
+
+async def main(args):
+    credentials = {"email": args.email, "password": args.password}
+    async with httpx.AsyncClient(base_url=args.base_url, timeout=30) as client:
+        response = await client.post("/api/v1/auth/login", json=credentials)
+        response.raise_for_status()
+        headers = {
+            "Authorization": "Bearer " + response.json()["access_token"]
+        }
+        deadline = time.perf_counter() + args.duration
+        login_latencies, login_errors = [], []
+        probe_latencies, probe_errors = [], []
+        tasks = [
+            worker(
+                client, "POST", "/api/v1/auth/login", deadline,
+                login_latencies, login_errors, json=credentials
+            )
+            for _ in range(args.logins)
+        ] + [
+            worker(
+                client, "GET", "/api/v1/organizations/me", deadline,
+                probe_latencies, probe_errors, headers=headers
+            )
+            for _ in range(args.probes)
+        ]
+        await asyncio.gather(*tasks)
+    report("login", login_latencies, login_errors, args.duration)
+    report("probe", probe_latencies, probe_errors, args.duration)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--base-url", default="http://localhost:8000")
+    parser.add_argument("--email", required=True)
+    parser.add_argument("--password", required=True)
+    parser.add_argument("--logins", type=int, default=32)
+    parser.add_argument("--probes", type=int, default=4)
+    parser.add_argument("--duration", type=float, default=10.0)
+    asyncio.run(main(parser.parse_args()))
@@ -8,7 +8,7 @@ from dotenv import load_dotenv
 
 from fastapi import FastAPI
 from httpx import AsyncClient, ASGITransport
-from sqlalchemy import select
+from sqlalchemy import event, select, text
 from sqlalchemy.ext.asyncio import (
     create_async_engine,
     async_sessionmaker,
@@ -23,9 +23,15 @@ from models import (
     ContactModel
 )
 from models.constants import Currency, StageDeal, StatusDeal
+from repositories.cache import (
+    auth_cache,
+    contact_phone_cache,
+    contact_suggest_index,
+    count_cache,
+)
 from repositories.database import Base
 from api.v1.router import api_router
-from api.v1.dependencies import get_db_session
+from api.v1.dependencies import get_db_session, get_primary_db_session
 from services.auth_service import AuthService
 from services.activity_service import ActivityService
 from services.contacts_service import ContactService
@@ -54,6 +60,20 @@ DATABASE_URL = (
 )
 
 
+@pytest.fixture(autouse=True)
+def clear_auth_cache():
+    """Сбрасывает кэши процесса: id пересоздаются в каждом тесте."""
+    auth_cache.clear()
+    count_cache.clear()
+    contact_suggest_index.clear()
+    contact_phone_cache.clear()
+    yield
+    auth_cache.clear()
+    count_cache.clear()
+    contact_suggest_index.clear()
+    contact_phone_cache.clear()
+
+
 @pytest_asyncio.fixture(scope="function")
 async def db_engine():
     """
@@ -68,6 +88,15 @@ async def db_engine():
     )
 
     async with engine.begin() as conn:
+        # Поиск с pg_trgm проверяется везде, где сервер поставляет
+        # расширение (например, образ postgres из docker-compose).
+        await conn.execute(text(
+            "DO $$ BEGIN "
+            "IF EXISTS (SELECT 1 FROM pg_available_extensions "
+            "WHERE name = 'pg_trgm') THEN "
+            "CREATE EXTENSION IF NOT EXISTS pg_trgm; "
+            "END IF; END $$"
+        ))
         await conn.run_sync(Base.metadata.create_all)
 
     yield engine
@@ -78,6 +107,23 @@ async def db_engine():
     await engine.dispose()
 
 
+@pytest.fixture(scope="function")
+def query_log(db_engine):
+    """Список SQL-запросов, выполненных через engine во время теста."""
+    statements = []
+
+    def before_cursor_execute(conn, cursor, statement, *args):
+        statements.append(statement)
+
+    event.listen(
+        db_engine.sync_engine, "before_cursor_execute", before_cursor_execute
+    )
+    yield statements
+    event.remove(
+        db_engine.sync_engine, "before_cursor_execute", before_cursor_execute
+    )
+
+
 @pytest_asyncio.fixture(scope="function")
 async def db_session(db_engine) -> AsyncGenerator[AsyncSession, None]:
     """
@@ -106,6 +152,7 @@ async def test_app(db_session: AsyncSession):
         yield db_session
 
     app.dependency_overrides[get_db_session] = override_get_session
+    app.dependency_overrides[get_primary_db_session] = override_get_session
 
     return app
 
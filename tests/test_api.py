@@ -1,7 +1,13 @@
+import csv
+import io
+import json
 from datetime import date, timedelta
 
 import pytest
-from sqlalchemy import select
+from fastapi import APIRouter, Depends, FastAPI, HTTPException, Request
+from httpx import ASGITransport, AsyncClient
+from sqlalchemy import event, select
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
 
 from models import (
     ContactModel,
@@ -13,6 +19,14 @@ from models import (
     TaskModel,
 )
 from models.constants import Currency, MemberRole
+from api.v1 import dependencies
+from api.v1.dependencies import PRIMARY_UNTIL_COOKIE, UnitOfWorkRoute
+from api.v1.router import api_router
+from repositories.cache import auth_cache, contact_suggest_index
+from repositories.config import settings
+from repositories.duplicates_rep import ContactDuplicatesRepository
+from repositories.member_rep import OrganizationMemberRepository
+from services.contact_dedup import ContactDeduplicator
 
 
 @pytest.mark.asyncio
@@ -49,6 +63,97 @@ async def test_register_success(async_client, db_session):
     assert tokens[0].revoked is False
 
 
+@pytest.mark.asyncio
+async def test_unit_of_work_commits_only_successful_requests():
+    """Транзакция запроса фиксируется один раз и только при успехе."""
+    class FakeSession:
+        commits = 0
+
+        def in_transaction(self):
+            return True
+
+        async def commit(self):
+            FakeSession.commits += 1
+
+    router = APIRouter(route_class=UnitOfWorkRoute)
+
+    @router.post("/ok")
+    async def ok(request: Request):
+        request.state.db_session = FakeSession()
+        return {"ok": True}
+
+    @router.post("/fail")
+    async def fail(request: Request):
+        request.state.db_session = FakeSession()
+        raise HTTPException(status_code=400, detail="fail")
+
+    app = FastAPI()
+    app.include_router(router)
+    async with AsyncClient(
+        transport=ASGITransport(app=app),
+        base_url="http://test"
+    ) as client:
+        response = await client.post("/ok")
+        assert response.status_code == 200
+        assert PRIMARY_UNTIL_COOKIE in response.cookies
+        response = await client.post("/fail")
+        assert response.status_code == 400
+        assert PRIMARY_UNTIL_COOKIE not in response.cookies
+    assert FakeSession.commits == 1
+
+
+@pytest.mark.asyncio
+async def test_unit_of_work_with_db_session(db_engine, monkeypatch):
+    """
+    Через настоящий get_db_session запись фиксируется, ответ с ошибкой
+    откатывается, потоковый ответ читает из открытой сессии.
+    """
+    factory = async_sessionmaker(db_engine, expire_on_commit=False)
+    monkeypatch.setattr(dependencies, "session_factory", factory)
+    monkeypatch.setattr(dependencies, "replica_session_factory", factory)
+    router = APIRouter(route_class=UnitOfWorkRoute)
+
+    @router.post("/fail")
+    async def fail(db: AsyncSession = Depends(dependencies.get_db_session)):
+        db.add(OrganizationModel(name="Rolled Back Org"))
+        await db.flush()
+        raise HTTPException(status_code=400, detail="fail")
+
+    app = FastAPI()
+    app.include_router(api_router, prefix="/api")
+    app.include_router(router)
+    async with AsyncClient(
+        transport=ASGITransport(app=app),
+        base_url="http://test"
+    ) as client:
+        response = await client.post(
+            "/api/v1/auth/register",
+            json={
+                "email": "uow@example.com",
+                "password": "password123",
+                "name": "Unit Of Work",
+                "organization_name": "Committed Org"
+            }
+        )
+        assert response.status_code == 200, response.text
+        headers = {
+            "Authorization": "Bearer " + response.json()["access_token"]
+        }
+        assert (await client.post("/fail")).status_code == 400
+        response = await client.get(
+            "/api/v1/organizations/me", headers=headers
+        )
+        assert response.status_code == 200, response.text
+        headers["X-Organization-ID"] = str(response.json()[0]["id"])
+        response = await client.get("/api/v1/deals/export", headers=headers)
+        assert response.status_code == 200, response.text
+        assert response.text == ""
+    async with factory() as session:
+        result = await session.execute(select(OrganizationModel.name))
+        assert result.scalars().all() == ["Committed Org"]
+        result = await session.execute(select(UserModel.email))
+        assert result.scalars().all() == ["uow@example.com"]
+
 @pytest.mark.asyncio
 async def test_get_user_organizations_success(
     async_client,
@@ -142,6 +247,158 @@ async def test_add_member_to_organization_permission_denied(
     ] == "Вы не являетесь участником этой организации."
 
 
+@pytest.mark.asyncio
+async def test_auth_cache_hit_and_invalidation(
+    async_client,
+    access_token_test_user,
+    access_token_second_user,
+    ogranization_test_user,
+    second_user,
+):
+    """
+    Повторный запрос берёт пользователя и членство из кэша,
+    добавление участника сбрасывает закэшированное членство.
+    """
+    headers = {
+        "Authorization": "Bearer " + access_token_test_user,
+        "X-Organization-ID": str(ogranization_test_user.id)
+    }
+    response = await async_client.get("/api/v1/contacts/", headers=headers)
+    assert response.status_code == 200
+    hits = auth_cache.hits
+    response = await async_client.get("/api/v1/contacts/", headers=headers)
+    assert response.status_code == 200
+    assert auth_cache.hits == hits + 2
+
+    second_headers = {
+        "Authorization": "Bearer " + access_token_second_user,
+        "X-Organization-ID": str(ogranization_test_user.id)
+    }
+    response = await async_client.get(
+        "/api/v1/contacts/",
+        headers=second_headers
+    )
+    assert response.status_code == 403
+    payload = {"user_id": second_user.id, "role": MemberRole.MEMBER}
+    response = await async_client.post(
+        "/api/v1/organizations/organization-members",
+        headers=headers,
+        json=payload
+    )
+    assert response.status_code == 200
+    response = await async_client.get(
+        "/api/v1/contacts/",
+        headers=second_headers
+    )
+    assert response.status_code == 200
+
+
+@pytest.mark.asyncio
+async def test_membership_claims_in_access_token(
+    async_client,
+    auth_service,
+    member_service,
+    test_user,
+    second_user,
+    ogranization_test_user,
+    monkeypatch,
+):
+    """
+    Роли из claims токена избавляют от запроса членства,
+    после изменения членств токен со старой версией идёт в БД.
+    """
+    monkeypatch.setattr(settings, "ACCESS_TOKEN_MEMBERSHIP_CLAIMS", True)
+    token = await auth_service.issue_access_token(test_user.id)
+    second_token = await auth_service.issue_access_token(second_user.id)
+    get_member = OrganizationMemberRepository.get_member
+
+    async def fail_get_member(*args, **kwargs):
+        raise AssertionError("membership lookup is not expected")
+
+    monkeypatch.setattr(
+        OrganizationMemberRepository,
+        "get_member",
+        fail_get_member
+    )
+    response = await async_client.get(
+        "/api/v1/contacts/",
+        headers={
+            "Authorization": "Bearer " + token,
+            "X-Organization-ID": str(ogranization_test_user.id)
+        }
+    )
+    assert response.status_code == 200
+    response = await async_client.get(
+        "/api/v1/contacts/",
+        headers={
+            "Authorization": "Bearer " + second_token,
+            "X-Organization-ID": str(ogranization_test_user.id)
+        }
+    )
+    assert response.status_code == 403
+
+    monkeypatch.setattr(OrganizationMemberRepository, "get_member", get_member)
+    await member_service.add_member_to_organization(
+        ogranization_test_user.id,
+        second_user.id
+    )
+    response = await async_client.get(
+        "/api/v1/contacts/",
+        headers={
+            "Authorization": "Bearer " + second_token,
+            "X-Organization-ID": str(ogranization_test_user.id)
+        }
+    )
+    assert response.status_code == 200
+
+
+@pytest.mark.asyncio
+async def test_membership_claims_ignore_cached_version(
+    async_client,
+    auth_service,
+    organization_member_rep,
+    db_session,
+    test_user,
+    ogranization_test_user,
+    monkeypatch,
+):
+    """
+    Версия членств сверяется с БД, а не с пользователем из auth_cache:
+    кэш другого процесса не продлевает жизнь устаревшему токену.
+    """
+    monkeypatch.setattr(settings, "ACCESS_TOKEN_MEMBERSHIP_CLAIMS", True)
+    token = await auth_service.issue_access_token(test_user.id)
+    headers = {
+        "Authorization": "Bearer " + token,
+        "X-Organization-ID": str(ogranization_test_user.id)
+    }
+    response = await async_client.get("/api/v1/contacts/", headers=headers)
+    assert response.status_code == 200
+    stale_user = auth_cache.get((test_user.id, None))
+    member = await organization_member_rep.get_member(
+        test_user.id,
+        ogranization_test_user.id
+    )
+    member.role = MemberRole.MEMBER
+    await db_session.flush()
+    auth_cache.set((test_user.id, None), stale_user)
+    lookups = []
+    get_member = OrganizationMemberRepository.get_member
+
+    async def spy_get_member(self, *args, **kwargs):
+        lookups.append(args)
+        return await get_member(self, *args, **kwargs)
+
+    monkeypatch.setattr(
+        OrganizationMemberRepository,
+        "get_member",
+        spy_get_member
+    )
+    response = await async_client.get("/api/v1/contacts/", headers=headers)
+    assert response.status_code == 200
+    assert lookups == [(test_user.id, ogranization_test_user.id)]
+
+
 @pytest.mark.asyncio
 async def test_get_user_contacts_success(
     async_client,
@@ -306,6 +563,213 @@ async def test_get_user_deals_success(
     assert any(d["id"] == deal_by_test_user.id for d in data)
 
 
+@pytest.mark.asyncio
+async def test_get_contacts_cursor_pagination(
+    async_client,
+    access_token_test_user,
+    ogranization_test_user,
+    contacts_service,
+    test_user
+):
+    """Курсор по контактам сохраняет порядок (name, id) и фильтр search."""
+    for i, name in enumerate(["Bob", "Alice", "Bob", "Carol", "Bobby"]):
+        await contacts_service.create_contact(
+            organization_id=ogranization_test_user.id,
+            current_user_id=test_user.id,
+            name=name,
+            email=f"contact{i}@example.com",
+            phone="+100200300"
+        )
+    headers = {
+        "Authorization": "Bearer " + access_token_test_user,
+        "X-Organization-ID": str(ogranization_test_user.id)
+    }
+    seen = []
+    params = {"page_size": 1, "search": "bob"}
+    while True:
+        response = await async_client.get(
+            "/api/v1/contacts/", headers=headers, params=params
+        )
+        assert response.status_code == 200
+        seen.extend(
+            (contact["name"], contact["id"]) for contact in response.json()
+        )
+        if "X-Next-Cursor" not in response.headers:
+            break
+        params["cursor"] = response.headers["X-Next-Cursor"]
+    assert [name for name, _ in seen] == ["Bob", "Bob", "Bobby"]
+    assert seen == sorted(seen)
+
+
+@pytest.mark.asyncio
+async def test_get_deals_cursor_pagination(
+    async_client,
+    access_token_test_user,
+    ogranization_test_user,
+    contact_by_test_user,
+    deals_service,
+    test_user
+):
+    """Обход сделок по курсору возвращает каждую сделку ровно один раз."""
+    created = []
+    for i in range(5):
+        deal = await deals_service.create_deal(
+            contact_id=contact_by_test_user.id,
+            title=f"Deal {i}",
+            amount=100.0 * (i % 2),
+            currency=Currency.USD,
+            current_user_id=test_user.id,
+            organization_id=ogranization_test_user.id
+        )
+        created.append(deal.id)
+    headers = {
+        "Authorization": "Bearer " + access_token_test_user,
+        "X-Organization-ID": str(ogranization_test_user.id)
+    }
+    seen = []
+    params = {"page_size": 2, "order_by": "amount", "order": "asc"}
+    while True:
+        response = await async_client.get(
+            "/api/v1/deals/", headers=headers, params=params
+        )
+        assert response.status_code == 200
+        seen.extend(deal["id"] for deal in response.json())
+        next_cursor = response.headers.get("X-Next-Cursor")
+        if next_cursor is None:
+            break
+        params["cursor"] = next_cursor
+    assert sorted(seen) == sorted(created)
+    assert len(seen) == len(set(seen))
+
+    params["order"] = "desc"
+    response = await async_client.get(
+        "/api/v1/deals/", headers=headers, params=params
+    )
+    assert response.status_code == 400
+    response = await async_client.get(
+        "/api/v1/deals/",
+        headers=headers,
+        params={"cursor": "not-a-cursor"}
+    )
+    assert response.status_code == 400
+
+
+@pytest.mark.asyncio
+async def test_list_total_count_modes(
+    async_client,
+    access_token_test_user,
+    ogranization_test_user,
+    contact_by_test_user,
+    deals_service,
+    test_user,
+    query_log,
+    monkeypatch
+):
+    """X-Total-Count: точный, ограниченный и кэшированный подсчёт."""
+    monkeypatch.setattr(settings, "COUNT_ESTIMATE_CAP", 2)
+    for i in range(3):
+        await deals_service.create_deal(
+            contact_id=contact_by_test_user.id,
+            title=f"Deal {i}",
+            amount=100.0,
+            currency=Currency.USD,
+            current_user_id=test_user.id,
+            organization_id=ogranization_test_user.id
+        )
+    headers = {
+        "Authorization": "Bearer " + access_token_test_user,
+        "X-Organization-ID": str(ogranization_test_user.id)
+    }
+    response = await async_client.get(
+        "/api/v1/deals/", headers=headers, params={"count": "exact"}
+    )
+    assert response.headers["X-Total-Count"] == "3"
+    response = await async_client.get(
+        "/api/v1/deals/", headers=headers, params={"count": "estimated"}
+    )
+    assert response.headers["X-Total-Count"] == "2+"
+    response = await async_client.get(
+        "/api/v1/deals/",
+        headers=headers,
+        params={"count": "exact", "status": "won"}
+    )
+    assert response.headers["X-Total-Count"] == "0"
+    response = await async_client.get(
+        "/api/v1/contacts/", headers=headers, params={"count": "exact"}
+    )
+    assert response.headers["X-Total-Count"] == "1"
+
+    query_log.clear()
+    response = await async_client.get(
+        "/api/v1/deals/", headers=headers, params={"count": "exact"}
+    )
+    assert response.headers["X-Total-Count"] == "3"
+    assert not any("count(" in statement for statement in query_log)
+
+    await deals_service.create_deal(
+        contact_id=contact_by_test_user.id,
+        title="Deal 4",
+        amount=100.0,
+        currency=Currency.USD,
+        current_user_id=test_user.id,
+        organization_id=ogranization_test_user.id
+    )
+    response = await async_client.get(
+        "/api/v1/deals/", headers=headers, params={"count": "exact"}
+    )
+    assert response.headers["X-Total-Count"] == "4"
+    response = await async_client.get(
+        "/api/v1/deals/", headers=headers, params={"count": "all"}
+    )
+    assert response.status_code == 422
+
+
+@pytest.mark.asyncio
+async def test_export_deals_ndjson_and_csv(
+    async_client,
+    access_token_test_user,
+    access_token_second_user,
+    ogranization_test_user,
+    deal_by_test_user,
+    deal_amount_zero_by_test_user,
+    add_user_in_org
+):
+    """Выгрузка сделок потоком с фильтрами и видимостью списка."""
+    headers = {
+        "Authorization": "Bearer " + access_token_test_user,
+        "X-Organization-ID": str(ogranization_test_user.id)
+    }
+    response = await async_client.get(
+        "/api/v1/deals/export", headers=headers
+    )
+    assert response.status_code == 200
+    assert response.headers["content-type"] == "application/x-ndjson"
+    rows = [json.loads(line) for line in response.text.splitlines()]
+    assert {row["id"] for row in rows} == {
+        deal_by_test_user.id, deal_amount_zero_by_test_user.id
+    }
+
+    response = await async_client.get(
+        "/api/v1/deals/export",
+        headers=headers,
+        params={"format": "csv", "min_amount": 1}
+    )
+    assert response.status_code == 200
+    rows = list(csv.DictReader(io.StringIO(response.text)))
+    assert [int(row["id"]) for row in rows] == [deal_by_test_user.id]
+    assert rows[0]["currency"] == "USD"
+
+    response = await async_client.get(
+        "/api/v1/deals/export",
+        headers={
+            "Authorization": "Bearer " + access_token_second_user,
+            "X-Organization-ID": str(ogranization_test_user.id)
+        }
+    )
+    assert response.status_code == 200
+    assert response.text == ""
+
+
 @pytest.mark.asyncio
 async def test_update_deal_validation_failure(
     async_client,
@@ -474,6 +938,101 @@ async def test_get_tasks_with_filters(
     assert all(task["deal_id"] == deal_by_test_user.id for task in data)
 
 
+@pytest.mark.asyncio
+async def test_get_tasks_cursor_and_stream(
+    async_client,
+    access_token_test_user,
+    ogranization_test_user,
+    deal_by_test_user,
+    tasks_rep
+):
+    """Страницы по курсору и поток NDJSON отдают задачи в одном порядке."""
+    today = date.today()
+    for days in [0, 3, 0, -1, 3]:
+        await tasks_rep.create({
+            "deal_id": deal_by_test_user.id,
+            "organization_id": ogranization_test_user.id,
+            "title": "Task",
+            "description": "Task",
+            "due_date": today + timedelta(days=days),
+        })
+    headers = {
+        "Authorization": "Bearer " + access_token_test_user,
+        "X-Organization-ID": str(ogranization_test_user.id)
+    }
+    paged = []
+    params = {"limit": 2}
+    while True:
+        response = await async_client.get(
+            "/api/v1/tasks/", headers=headers, params=params
+        )
+        assert response.status_code == 200
+        assert len(response.json()) <= 2
+        paged.extend(response.json())
+        if "X-Next-Cursor" not in response.headers:
+            break
+        params["cursor"] = response.headers["X-Next-Cursor"]
+    keys = [(task["due_date"], task["id"]) for task in paged]
+    assert len(paged) == 5
+    assert keys == sorted(keys)
+
+    response = await async_client.get(
+        "/api/v1/tasks/", headers=headers, params={"stream": "true"}
+    )
+    assert response.status_code == 200
+    assert response.headers["content-type"] == "application/x-ndjson"
+    streamed = [json.loads(line) for line in response.text.splitlines()]
+    assert [task["id"] for task in streamed] == [
+        task["id"] for task in paged
+    ]
+
+
+@pytest.mark.asyncio
+async def test_activities_feed_since_cursor(
+    async_client,
+    access_token_test_user,
+    ogranization_test_user,
+    deal_by_test_user
+):
+    """Опрос ленты с since возвращает только новые активности."""
+    headers = {
+        "Authorization": "Bearer " + access_token_test_user,
+        "X-Organization-ID": str(ogranization_test_user.id)
+    }
+    url = f"/api/v1/deals/{deal_by_test_user.id}/activities"
+    for i in range(3):
+        await async_client.post(
+            url,
+            headers=headers,
+            json={"type": "comment", "payload": {"text": str(i)}}
+        )
+    response = await async_client.get(
+        url, headers=headers, params={"limit": 2}
+    )
+    assert [a["payload"]["text"] for a in response.json()] == ["0", "1"]
+    since = response.headers["X-Next-Cursor"]
+    response = await async_client.get(
+        url, headers=headers, params={"since": since}
+    )
+    assert [a["payload"]["text"] for a in response.json()] == ["2"]
+    since = response.headers["X-Next-Cursor"]
+
+    response = await async_client.get(
+        url, headers=headers, params={"since": since}
+    )
+    assert response.json() == []
+    assert response.headers["X-Next-Cursor"] == since
+    await async_client.post(
+        url,
+        headers=headers,
+        json={"type": "comment", "payload": {"text": "3"}}
+    )
+    response = await async_client.get(
+        url, headers=headers, params={"since": since}
+    )
+    assert [a["payload"]["text"] for a in response.json()] == ["3"]
+
+
 @pytest.mark.asyncio
 async def test_get_summary_of_deal(
     async_client,
@@ -527,4 +1086,886 @@ async def test_get_deals_funnel_success(
             assert isinstance(status, str)
             assert isinstance(count, int)
     for stage, value in data["conversion"].items():
-        assert value is None or isinstance(value, float)
\ No newline at end of file
+        assert value is None or isinstance(value, float)
+
+@pytest.mark.asyncio
+async def test_create_endpoints_query_count(
+    async_client,
+    access_token_test_user,
+    ogranization_test_user,
+    contact_test_user,
+    deal_test_user,
+    query_log
+):
+    """Создание объекта — один INSERT ... RETURNING без повторного SELECT."""
+    headers = {
+        "Authorization": "Bearer " + access_token_test_user,
+        "X-Organization-ID": str(ogranization_test_user.id)
+    }
+    # Прогрев кэша аутентификации, чтобы считать только запросы эндпоинта.
+    await async_client.get("/api/v1/contacts/", headers=headers)
+    cases = [
+        ("/api/v1/contacts/", "contacts", 1, {
+            "name": "Jane Roe",
+            "email": "jane@example.com",
+            "phone": "+100200300"
+        }),
+        ("/api/v1/deals/", "deals", 2, {
+            "contact_id": contact_test_user.id,
+            "title": "Support contract",
+            "amount": 500.0,
+            "currency": Currency.EUR
+        }),
+        ("/api/v1/tasks/", "tasks", 2, {
+            "deal_id": deal_test_user.id,
+            "title": "Send contract",
+            "description": "Final version",
+            "due_date": str(date.today() + timedelta(days=7))
+        }),
+        (
+            f"/api/v1/deals/{deal_test_user.id}/activities", "activities", 1,
+            {
+                "type": "comment",
+                "payload": {"text": "Called"}
+            }
+        ),
+    ]
+    for url, table, expected, payload in cases:
+        query_log.clear()
+        response = await async_client.post(url, headers=headers, json=payload)
+        assert response.status_code == 200, response.text
+        assert len(query_log) == expected
+        assert query_log[-1].startswith(f"INSERT INTO {table} ")
+        assert "RETURNING" in query_log[-1]
+
+
+@pytest.mark.asyncio
+async def test_import_contacts_csv(
+    async_client,
+    access_token_test_user,
+    ogranization_test_user,
+    contact_by_test_user
+):
+    """Импорт добавляет новые контакты, обновляет по email и считает ошибки."""
+    headers = {
+        "Authorization": "Bearer " + access_token_test_user,
+        "X-Organization-ID": str(ogranization_test_user.id)
+    }
+    body = (
+        "name,email,phone\n"
+        "Jane Roe,jane@example.com,+100200300\n"
+        "John Updated,john.doe@example.com,+999\n"
+        ",empty@example.com,+1\n"
+        "Bad Email,not-an-email,+1\n"
+        "Jane Again,jane@example.com,+2\n"
+    )
+    response = await async_client.post(
+        "/api/v1/contacts/import",
+        headers=headers,
+        content=body.encode()
+    )
+    assert response.status_code == 200, response.text
+    report = response.json()
+    assert report["received"] == 5
+    assert report["inserted"] == 1
+    assert report["updated"] == 1
+    assert report["failed"] == 3
+    assert [error["row"] for error in report["errors"]] == [3, 4, 5]
+    response = await async_client.get(
+        "/api/v1/contacts/",
+        headers=headers,
+        params={"count": "exact"}
+    )
+    assert response.headers["X-Total-Count"] == "2"
+    contacts = {c["email"]: c for c in response.json()}
+    assert contacts["john.doe@example.com"]["name"] == "John Updated"
+    assert contacts["jane@example.com"]["phone"] == "+100200300"
+    response = await async_client.post(
+        "/api/v1/contacts/import",
+        headers=headers,
+        params={"format": "ndjson"},
+        content=b'{"name": "Ann", "email": "ann@example.com", "phone": "+3"}\n'
+                b'not json\n'
+    )
+    assert response.status_code == 200, response.text
+    assert response.json()["inserted"] == 1
+    assert response.json()["errors"] == [
+        {"row": 2, "error": "Row must be a JSON object"}
+    ]
+    response = await async_client.post(
+        "/api/v1/contacts/import",
+        headers=headers,
+        content=b"name\nJane\n"
+    )
+    assert response.status_code == 400
+
+
+@pytest.mark.asyncio
+async def test_import_contacts_member_cannot_update_others(
+    async_client,
+    access_token_test_user,
+    access_token_second_user,
+    ogranization_test_user,
+    contact_by_test_user,
+    second_user,
+    add_user_in_org
+):
+    """MEMBER не может импортом перезаписать чужой контакт."""
+    body = (
+        "name,email,phone\n"
+        "Mine,mine@example.com,+1\n"
+        "Hijacked,john.doe@example.com,+666\n"
+        "Mine Updated,mine@example.com,+2\n"
+    )
+    response = await async_client.post(
+        "/api/v1/contacts/import",
+        headers={
+            "Authorization": "Bearer " + access_token_second_user,
+            "X-Organization-ID": str(ogranization_test_user.id)
+        },
+        params={"obj_owner_id": second_user.id},
+        content=body.encode()
+    )
+    assert response.status_code == 200, response.text
+    report = response.json()
+    assert report["inserted"] == 1
+    assert report["updated"] == 0
+    assert report["failed"] == 2
+    assert report["errors"] == [
+        {"row": 2, "error": "Contact with this email belongs to another user"},
+        {"row": 3, "error": "Duplicate email, first seen in row 1"},
+    ]
+    response = await async_client.get(
+        "/api/v1/contacts/",
+        headers={
+            "Authorization": "Bearer " + access_token_test_user,
+            "X-Organization-ID": str(ogranization_test_user.id)
+        }
+    )
+    contacts = {c["email"]: c["name"] for c in response.json()}
+    assert contacts["john.doe@example.com"] == contact_by_test_user.name
+
+@pytest.mark.asyncio
+async def test_create_deals_batch(
+    async_client,
+    access_token_test_user,
+    ogranization_test_user,
+    contact_by_test_user,
+    query_log
+):
+    """Пакет сделок создаётся одним SELECT контактов и одним INSERT."""
+    headers = {
+        "Authorization": "Bearer " + access_token_test_user,
+        "X-Organization-ID": str(ogranization_test_user.id)
+    }
+    await async_client.get("/api/v1/deals/", headers=headers)
+    deals = [
+        {
+            "contact_id": contact_by_test_user.id,
+            "title": f"Batch deal {i}",
+            "amount": 100.0 * i,
+            "currency": Currency.USD
+        }
+        for i in range(3)
+    ]
+    query_log.clear()
+    response = await async_client.post(
+        "/api/v1/deals/batch", headers=headers, json={"deals": deals}
+    )
+    assert response.status_code == 200, response.text
+    assert [deal["title"] for deal in response.json()] == [
+        "Batch deal 0", "Batch deal 1", "Batch deal 2"
+    ]
+    assert len(query_log) == 2
+    assert query_log[-1].startswith("INSERT INTO deals ")
+    assert "RETURNING" in query_log[-1]
+    response = await async_client.post(
+        "/api/v1/deals/batch",
+        headers=headers,
+        json={"deals": deals[:1] + [{**deals[1], "contact_id": 999999}]}
+    )
+    assert response.status_code == 400
+    assert "999999" in response.json()["detail"]
+    response = await async_client.get(
+        "/api/v1/deals/", headers=headers, params={"count": "exact"}
+    )
+    assert response.headers["X-Total-Count"] == "3"
+
+
+@pytest.mark.asyncio
+async def test_transition_deals_batch(
+    async_client,
+    access_token_test_user,
+    ogranization_test_user,
+    contact_by_test_user,
+    deals_service,
+    test_user,
+    query_log
+):
+    """Пакетная смена стадии: один UPDATE, один INSERT активностей."""
+    deals = [
+        await deals_service.create_deal(
+            contact_id=contact_by_test_user.id,
+            title=f"Quarter deal {i}",
+            amount=amount,
+            currency=Currency.USD,
+            current_user_id=test_user.id,
+            organization_id=ogranization_test_user.id
+        )
+        for i, amount in enumerate([100.0, 0.0, 250.0])
+    ]
+    headers = {
+        "Authorization": "Bearer " + access_token_test_user,
+        "X-Organization-ID": str(ogranization_test_user.id)
+    }
+    await async_client.get("/api/v1/deals/", headers=headers)
+    query_log.clear()
+    response = await async_client.patch(
+        "/api/v1/deals/batch",
+        headers=headers,
+        json={
+            "deal_ids": [deal.id for deal in deals] + [999999],
+            "status": "won",
+            "stage": "closed"
+        }
+    )
+    assert response.status_code == 200, response.text
+    assert response.json() == [
+        {"deal_id": deals[0].id, "success": True, "error": None},
+        {
+            "deal_id": deals[1].id,
+            "success": False,
+            "error": "Cannot close deal with status 'won' when amount <= 0"
+        },
+        {"deal_id": deals[2].id, "success": True, "error": None},
+        {
+            "deal_id": 999999,
+            "success": False,
+            "error": "Deal not found in organization"
+        },
+    ]
+    statements = [sql.split(" ", 1)[0] for sql in query_log]
+    assert statements == ["SELECT", "UPDATE", "INSERT"]
+    response = await async_client.get(
+        "/api/v1/deals/", headers=headers, params={"stage": "closed"}
+    )
+    assert {deal["id"] for deal in response.json()} == {
+        deals[0].id, deals[2].id
+    }
+    response = await async_client.get(
+        f"/api/v1/deals/{deals[0].id}/activities", headers=headers
+    )
+    assert [act["type"] for act in response.json()] == ["system"]
+
+
+@pytest.mark.asyncio
+async def test_won_status_requires_amount(
+    async_client,
+    access_token_test_user,
+    ogranization_test_user,
+    deal_by_test_user,
+    deal_amount_zero_by_test_user
+):
+    """Сделку с amount <= 0 нельзя перевести в won ни по одной."""
+    headers = {
+        "Authorization": "Bearer " + access_token_test_user,
+        "X-Organization-ID": str(ogranization_test_user.id)
+    }
+    error = "Cannot close deal with status 'won' when amount <= 0"
+    response = await async_client.patch(
+        f"/api/v1/deals/{deal_amount_zero_by_test_user.id}",
+        headers=headers,
+        json={"status": "won"}
+    )
+    assert response.status_code == 400
+    assert response.json()["detail"] == error
+
+    response = await async_client.patch(
+        "/api/v1/deals/batch",
+        headers=headers,
+        json={
+            "deal_ids": [
+                deal_by_test_user.id,
+                deal_amount_zero_by_test_user.id
+            ],
+            "status": "won"
+        }
+    )
+    assert response.status_code == 200, response.text
+    assert response.json() == [
+        {"deal_id": deal_by_test_user.id, "success": True, "error": None},
+        {
+            "deal_id": deal_amount_zero_by_test_user.id,
+            "success": False,
+            "error": error
+        },
+    ]
+    response = await async_client.get(
+        "/api/v1/deals/", headers=headers, params={"status": "won"}
+    )
+    assert [deal["id"] for deal in response.json()] == [
+        deal_by_test_user.id
+    ]
+
+@pytest.mark.asyncio
+async def test_create_and_complete_tasks_batch(
+    async_client,
+    access_token_test_user,
+    ogranization_test_user,
+    deal_test_user,
+    query_log
+):
+    """Пакет задач: один SELECT сделок и один INSERT, выполнение — UPDATE."""
+    headers = {
+        "Authorization": "Bearer " + access_token_test_user,
+        "X-Organization-ID": str(ogranization_test_user.id)
+    }
+    await async_client.get("/api/v1/tasks/", headers=headers)
+    due_date = str(date.today() + timedelta(days=3))
+    tasks = [
+        {
+            "deal_id": deal_test_user.id,
+            "title": f"Follow up {i}",
+            "description": "Call the client",
+            "due_date": due_date
+        }
+        for i in range(3)
+    ]
+    query_log.clear()
+    response = await async_client.post(
+        "/api/v1/tasks/batch", headers=headers, json={"tasks": tasks}
+    )
+    assert response.status_code == 200, response.text
+    created = response.json()
+    assert [task["title"] for task in created] == [
+        "Follow up 0", "Follow up 1", "Follow up 2"
+    ]
+    assert len(query_log) == 2
+    assert query_log[-1].startswith("INSERT INTO tasks ")
+    response = await async_client.post(
+        "/api/v1/tasks/batch",
+        headers=headers,
+        json={"tasks": [tasks[0], {**tasks[1], "description": " "}]}
+    )
+    assert response.status_code == 400
+    assert response.json()["detail"].startswith("Task 1: ")
+    query_log.clear()
+    response = await async_client.post(
+        "/api/v1/tasks/complete",
+        headers=headers,
+        json={"task_ids": [created[0]["id"], created[2]["id"], 999999]}
+    )
+    assert response.status_code == 200, response.text
+    assert [task["id"] for task in response.json()] == [
+        created[0]["id"], created[2]["id"]
+    ]
+    assert all(task["is_done"] for task in response.json())
+    assert len(query_log) == 1
+    assert query_log[0].startswith("UPDATE tasks ")
+    response = await async_client.get(
+        "/api/v1/tasks/",
+        headers=headers,
+        params={"deal_id": deal_test_user.id, "only_open": True}
+    )
+    assert [task["id"] for task in response.json()] == [created[1]["id"]]
+
+
+@pytest.mark.asyncio
+async def test_suggest_contacts(
+    async_client,
+    db_session,
+    access_token_test_user,
+    ogranization_test_user,
+    contact_by_test_user,
+    query_log
+):
+    """
+    Подсказки строятся одним запросом и дополняются новыми контактами
+    после коммита.
+    """
+    headers = {
+        "Authorization": "Bearer " + access_token_test_user,
+        "X-Organization-ID": str(ogranization_test_user.id)
+    }
+    # Фикстуры фиксируются до прогрева кэшей: их отложенные сбросы
+    # auth_cache выполняются при первом коммите.
+    await db_session.commit()
+    await async_client.get("/api/v1/contacts/", headers=headers)
+    query_log.clear()
+    response = await async_client.get(
+        "/api/v1/contacts/suggest", headers=headers, params={"q": "do"}
+    )
+    assert response.status_code == 200, response.text
+    assert response.json() == [{
+        "id": contact_by_test_user.id,
+        "name": "John Doe",
+        "email": "john.doe@example.com"
+    }]
+    assert len(query_log) == 1
+    response = await async_client.post(
+        "/api/v1/contacts/",
+        headers=headers,
+        json={
+            "name": "Dora Smith",
+            "email": "dora@example.com",
+            "phone": "+100200300"
+        }
+    )
+    assert response.status_code == 200, response.text
+    await db_session.commit()
+    query_log.clear()
+    response = await async_client.get(
+        "/api/v1/contacts/suggest",
+        headers=headers,
+        params={"q": "DO", "limit": 5}
+    )
+    assert [contact["name"] for contact in response.json()] == [
+        "John Doe", "Dora Smith"
+    ]
+    assert query_log == []
+    response = await async_client.get(
+        "/api/v1/contacts/suggest", headers=headers, params={"q": "smith"}
+    )
+    assert [contact["name"] for contact in response.json()] == ["Dora Smith"]
+    response = await async_client.post(
+        "/api/v1/contacts/",
+        headers=headers,
+        json={
+            "name": "Donna Rolled",
+            "email": "donna@example.com",
+            "phone": "+100200301"
+        }
+    )
+    assert response.status_code == 200, response.text
+    await db_session.rollback()
+    response = await async_client.get(
+        "/api/v1/contacts/suggest", headers=headers, params={"q": "donna"}
+    )
+    assert response.json() == []
+
+
+@pytest.mark.asyncio
+async def test_suggest_contacts_oversized_organization(
+    async_client,
+    access_token_test_user,
+    ogranization_test_user,
+    contact_by_test_user,
+    query_log,
+    monkeypatch
+):
+    """Большая организация загружается один раз, дальше только запросы."""
+    monkeypatch.setattr(contact_suggest_index, "max_items", 0)
+    headers = {
+        "Authorization": "Bearer " + access_token_test_user,
+        "X-Organization-ID": str(ogranization_test_user.id)
+    }
+    await async_client.get("/api/v1/contacts/", headers=headers)
+    query_log.clear()
+    for prefix in ("j", "jo", "joh"):
+        response = await async_client.get(
+            "/api/v1/contacts/suggest",
+            headers=headers,
+            params={"q": prefix}
+        )
+        assert [contact["id"] for contact in response.json()] == [
+            contact_by_test_user.id
+        ]
+    queries = [sql for sql in query_log if "pg_extension" not in sql]
+    assert len(queries) == 4
+    assert contact_suggest_index.stats()["oversized"] == 1
+
+
+@pytest.mark.asyncio
+async def test_search(    async_client,
+    access_token_test_user,
+    access_token_second_user,
+    second_user,
+    ogranization_test_user,
+    deal_test_user,
+    query_log
+):
+    """Поиск находит сущности, созданные любым путём, одним запросом."""
+    headers = {
+        "Authorization": "Bearer " + access_token_test_user,
+        "X-Organization-ID": str(ogranization_test_user.id)
+    }
+    due_date = str(date.today() + timedelta(days=3))
+    response = await async_client.post(
+        "/api/v1/tasks/batch",
+        headers=headers,
+        json={"tasks": [{
+            "deal_id": deal_test_user.id,
+            "title": "Prepare contract",
+            "description": "Send the draft to John",
+            "due_date": due_date
+        }]}
+    )
+    assert response.status_code == 200, response.text
+    task_id = response.json()[0]["id"]
+    response = await async_client.post(
+        f"/api/v1/deals/{deal_test_user.id}/activities",
+        headers=headers,
+        json={
+            "type": "comment",
+            "payload": {"text": "Johnny asked for a discount"}
+        }
+    )
+    assert response.status_code == 200, response.text
+    comment_id = response.json()["id"]
+    query_log.clear()
+    response = await async_client.get(
+        "/api/v1/search/", headers=headers, params={"q": "joh"}
+    )
+    assert response.status_code == 200, response.text
+    hits = response.json()
+    assert len(query_log) == 1
+    assert {(hit["type"], hit["id"]) for hit in hits} == {
+        ("contact", deal_test_user.contact_id),
+        ("deal", deal_test_user.id),
+        ("task", task_id),
+        ("comment", comment_id),
+    }
+    assert hits[-1]["type"] == "task"
+    response = await async_client.get(
+        "/api/v1/search/",
+        headers=headers,
+        params={"q": "john contract", "types": ["task", "deal"]}
+    )
+    assert [(hit["type"], hit["id"]) for hit in response.json()] == [
+        ("task", task_id)
+    ]
+    response = await async_client.post(
+        "/api/v1/contacts/import",
+        headers=headers,
+        content=(
+            "name,email,phone\n"
+            "Johann Sebastian,john.doe@example.com,+123456789\n"
+        ).encode()
+    )
+    assert response.status_code == 200, response.text
+    response = await async_client.get(
+        "/api/v1/search/", headers=headers, params={"q": "sebast"}
+    )
+    assert [(hit["type"], hit["title"]) for hit in response.json()] == [
+        ("contact", "Johann Sebastian")
+    ]
+    response = await async_client.get(
+        "/api/v1/search/", headers=headers, params={"q": "j"}
+    )
+    assert response.status_code == 400
+    response = await async_client.post(
+        "/api/v1/organizations/organization-members",
+        headers=headers,
+        json={"user_id": second_user.id, "role": MemberRole.MEMBER}
+    )
+    assert response.status_code == 200, response.text
+    response = await async_client.get(
+        "/api/v1/search/",
+        headers={
+            "Authorization": "Bearer " + access_token_second_user,
+            "X-Organization-ID": str(ogranization_test_user.id)
+        },
+        params={"q": "joh"}
+    )
+    assert response.status_code == 200, response.text
+    assert {hit["type"] for hit in response.json()} == {"task", "comment"}
+
+
+@pytest.mark.asyncio
+async def test_lookup_contacts_by_phone(
+    async_client,
+    access_token_test_user,
+    ogranization_test_user,
+    contact_by_test_user,
+    query_log
+):
+    """Номер в любом формате находит контакт, повтор отвечает из кэша."""
+    headers = {
+        "Authorization": "Bearer " + access_token_test_user,
+        "X-Organization-ID": str(ogranization_test_user.id)
+    }
+    await async_client.get("/api/v1/contacts/", headers=headers)
+    query_log.clear()
+    response = await async_client.get(
+        "/api/v1/contacts/lookup",
+        headers=headers,
+        params={"phone": "+1 (234) 567-89"}
+    )
+    assert response.status_code == 200, response.text
+    assert [c["id"] for c in response.json()] == [contact_by_test_user.id]
+    assert len(query_log) == 1
+    query_log.clear()
+    response = await async_client.get(
+        "/api/v1/contacts/lookup",
+        headers=headers,
+        params={"phone": "00123456789"}
+    )
+    assert [c["id"] for c in response.json()] == [contact_by_test_user.id]
+    assert query_log == []
+    for _ in range(2):
+        query_log.clear()
+        response = await async_client.get(
+            "/api/v1/contacts/lookup",
+            headers=headers,
+            params={"phone": "+1 555 010 2000"}
+        )
+        assert response.json() == []
+        assert len(query_log) == 1
+    response = await async_client.post(
+        "/api/v1/contacts/",
+        headers=headers,
+        json={
+            "name": "Dora Smith",
+            "email": "dora@example.com",
+            "phone": "1-555-010-2000"
+        }
+    )
+    assert response.status_code == 200, response.text
+    dora_id = response.json()["id"]
+    response = await async_client.post(
+        "/api/v1/contacts/import",
+        headers=headers,
+        content=(
+            "name,email,phone\n"
+            "Ann Lee,ann@example.com,+1 555 010 2000 ext. 4\n"
+        ).encode()
+    )
+    assert response.status_code == 200, response.text
+    response = await async_client.get(
+        "/api/v1/contacts/lookup",
+        headers=headers,
+        params={"phone": "+1 555 010 2000"}
+    )
+    assert [c["name"] for c in response.json()] == ["Dora Smith", "Ann Lee"]
+    assert response.json()[0]["id"] == dora_id
+    response = await async_client.get(
+        "/api/v1/contacts/lookup", headers=headers, params={"phone": "none"}
+    )
+    assert response.status_code == 400
+
+
+@pytest.mark.asyncio
+async def test_lookup_contacts_by_phone_member(
+    async_client,
+    access_token_test_user,
+    access_token_second_user,
+    ogranization_test_user,
+    contact_by_test_user,
+    second_user,
+    add_user_in_org,
+    monkeypatch
+):
+    """MEMBER находит свой контакт, даже если чужие не влезли в лимит."""
+    monkeypatch.setattr(settings, "CONTACT_PHONE_LOOKUP_LIMIT", 1)
+    headers = {
+        "Authorization": "Bearer " + access_token_second_user,
+        "X-Organization-ID": str(ogranization_test_user.id)
+    }
+    response = await async_client.post(
+        "/api/v1/contacts/",
+        headers=headers,
+        params={"obj_owner_id": second_user.id},
+        json={
+            "name": "Own Contact",
+            "email": "own@example.com",
+            "phone": contact_by_test_user.phone
+        }
+    )
+    assert response.status_code == 200, response.text
+    own_id = response.json()["id"]
+    response = await async_client.get(
+        "/api/v1/contacts/lookup",
+        headers={
+            "Authorization": "Bearer " + access_token_test_user,
+            "X-Organization-ID": str(ogranization_test_user.id)
+        },
+        params={"phone": contact_by_test_user.phone}
+    )
+    assert [c["id"] for c in response.json()] == [contact_by_test_user.id]
+    response = await async_client.get(
+        "/api/v1/contacts/lookup",
+        headers=headers,
+        params={"phone": contact_by_test_user.phone}
+    )
+    assert [c["id"] for c in response.json()] == [own_id]
+
+@pytest.mark.asyncio
+async def test_contact_duplicates_review(
+    async_client,
+    db_session,
+    access_token_test_user,
+    ogranization_test_user,
+    contact_by_test_user,
+    query_log
+):
+    """Задача находит дубликаты, отклонённая пара не пересоздаётся."""
+    headers = {
+        "Authorization": "Bearer " + access_token_test_user,
+        "X-Organization-ID": str(ogranization_test_user.id)
+    }
+    ids = {"john": contact_by_test_user.id}
+    for key, name, email, phone in [
+        ("upper", "JOHN DOE", "John.Doe@Example.com", "+1 234 567 89"),
+        ("typo", "Jon Doe", "jon.doe@example.com", "123-456-789"),
+        ("mary", "Mary Major", "mary@example.com", "+100200300"),
+    ]:
+        response = await async_client.post(
+            "/api/v1/contacts/",
+            headers=headers,
+            json={"name": name, "email": email, "phone": phone}
+        )
+        assert response.status_code == 200, response.text
+        ids[key] = response.json()["id"]
+    deduplicator = ContactDeduplicator(
+        ContactDuplicatesRepository(db_session)
+    )
+    report = await deduplicator.run(ogranization_test_user.id)
+    assert report["contacts"] == 4
+    assert report["duplicates"] == 3
+    query_log.clear()
+    response = await async_client.get(
+        "/api/v1/contacts/duplicates", headers=headers, params={"limit": 2}
+    )
+    assert response.status_code == 200, response.text
+    assert len(query_log) == 1
+    first_page = response.json()
+    assert first_page[0]["score"] == 1.0
+    assert {
+        first_page[0]["contact"]["id"], first_page[0]["duplicate"]["id"]
+    } == {ids["john"], ids["upper"]}
+    assert first_page[0]["reasons"] == ["name", "email", "phone"]
+    response = await async_client.get(
+        "/api/v1/contacts/duplicates",
+        headers=headers,
+        params={"limit": 2, "cursor": response.headers["X-Next-Cursor"]}
+    )
+    pairs = first_page + response.json()
+    assert len(pairs) == 3
+    assert all(ids["mary"] not in (
+        pair["contact"]["id"], pair["duplicate"]["id"]
+    ) for pair in pairs)
+    response = await async_client.patch(
+        f"/api/v1/contacts/duplicates/{pairs[-1]['id']}",
+        headers=headers,
+        json={"status": "dismissed"}
+    )
+    assert response.status_code == 200, response.text
+    assert response.json()["status"] == "dismissed"
+    report = await deduplicator.run(ogranization_test_user.id)
+    assert report["duplicates"] == 2
+    response = await async_client.get(
+        "/api/v1/contacts/duplicates", headers=headers
+    )
+    assert len(response.json()) == 2
+    response = await async_client.get(
+        "/api/v1/contacts/duplicates",
+        headers=headers,
+        params={"status": "dismissed"}
+    )
+    assert [pair["id"] for pair in response.json()] == [pairs[-1]["id"]]
+    response = await async_client.patch(
+        "/api/v1/contacts/duplicates/999999",
+        headers=headers,
+        json={"status": "confirmed"}
+    )
+    assert response.status_code == 404
+
+
+@pytest.mark.asyncio
+async def test_system_stats(
+    async_client,
+    access_token_test_user,
+    monkeypatch
+):
+    """Тест на счётчики пула соединений и фоновых задач процесса."""
+    response = await async_client.get("/api/v1/system/stats")
+    assert response.status_code == 403
+    monkeypatch.setattr(settings, "SYSTEM_OPS_TOKEN", "ops-secret")
+    response = await async_client.get(
+        "/api/v1/system/stats",
+        headers={"Authorization": "Bearer " + access_token_test_user}
+    )
+    assert response.status_code == 403
+    response = await async_client.get(
+        "/api/v1/system/stats",
+        headers={"X-Ops-Token": "wrong"}
+    )
+    assert response.status_code == 403
+    response = await async_client.get(
+        "/api/v1/system/stats",
+        headers={"X-Ops-Token": "ops-secret"}
+    )
+    assert response.status_code == 200, response.text
+    stats = response.json()
+    assert stats["pool"]["size"] == settings.DB_POOL_SIZE
+    assert stats["pool"]["waits"] >= 0
+    assert stats["refresh_token_reaper"]["runs"] >= 0
+
+
+@pytest.mark.asyncio
+async def test_cached_reads_use_primary(
+    test_app,
+    db_engine,
+    db_session,
+    access_token_test_user,
+    ogranization_test_user,
+    contact_by_test_user
+):
+    """Чтения, которые кэшируются в памяти процесса, идут в primary."""
+    await db_session.commit()
+    statements = {"replica": [], "primary": []}
+    factory = async_sessionmaker(db_engine, expire_on_commit=False)
+    event.listen(
+        db_session.sync_session,
+        "do_orm_execute",
+        lambda state: statements["replica"].append(str(state.statement))
+    )
+    headers = {
+        "Authorization": "Bearer " + access_token_test_user,
+        "X-Organization-ID": str(ogranization_test_user.id)
+    }
+    async with factory() as primary:
+        event.listen(
+            primary.sync_session,
+            "do_orm_execute",
+            lambda state: statements["primary"].append(str(state.statement))
+        )
+
+        async def override_get_primary_session():
+            yield primary
+
+        test_app.dependency_overrides[
+            dependencies.get_primary_db_session
+        ] = override_get_primary_session
+        async with AsyncClient(
+            transport=ASGITransport(app=test_app),
+            base_url="http://test"
+        ) as client:
+            response = await client.get(
+                "/api/v1/contacts/",
+                headers=headers,
+                params={"count": "exact"}
+            )
+            assert response.status_code == 200, response.text
+            assert response.headers["X-Total-Count"] == "1"
+            response = await client.get(
+                "/api/v1/contacts/suggest",
+                headers=headers,
+                params={"q": "jo"}
+            )
+            assert response.status_code == 200, response.text
+            response = await client.get(
+                "/api/v1/deals/",
+                headers=headers,
+                params={"count": "exact"}
+            )
+            assert response.status_code == 200, response.text
+    primary_sql = "\n".join(statements["primary"])
+    replica_sql = "\n".join(statements["replica"])
+    for table in ("users", "organization_members"):
+        assert f"FROM {table}" in primary_sql
+        assert f"FROM {table}" not in replica_sql
+    assert "FROM contacts" in replica_sql
+    assert primary_sql.count("count(") == 2
+    assert "count(" not in replica_sql
+    assert "contacts.owner_id, contacts.name, contacts.email" in primary_sql
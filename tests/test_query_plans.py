@@ -0,0 +1,292 @@
+import json
+from datetime import date, datetime, timedelta
+
+import pytest
+import pytest_asyncio
+from sqlalchemy import event, text
+
+from models.constants import MemberRole
+from repositories.activities_rep import ActivitiesRepository
+from repositories.contacts_rep import ContactsRepository
+from repositories.deals_rep import DealsRepository
+from repositories.search_rep import SearchRepository
+from repositories.tasks_rep import TasksRepository
+
+
+ORGANIZATIONS = 500
+DEALS_PER_ORGANIZATION = 100
+CONTACTS_PER_ORGANIZATION = 20
+LARGE_TABLES = {"contacts", "deals", "tasks", "activities"}
+
+SEED_SQL = [
+    """
+    INSERT INTO users (email, hashed_password, name, membership_version,
+                       created_at)
+    SELECT 'user' || g || '@example.com', 'x', 'User ' || g, 0, now()
+    FROM generate_series(1, :organizations) g
+    """,
+    """
+    INSERT INTO organizations (name, created_at)
+    SELECT 'Org ' || g, now() FROM generate_series(1, :organizations) g
+    """,
+    """
+    INSERT INTO contacts (owner_id, organization_id, name, email, phone,
+                          phone_normalized, created_at)
+    SELECT (g - 1) % :organizations + 1, (g - 1) % :organizations + 1,
+           'Contact ' || g, 'contact' || g || '@example.com',
+           '+1 555 ' || g, '1555' || g, now() - g * interval '1 minute'
+    FROM generate_series(1, :contacts) g
+    """,
+    """
+    INSERT INTO deals (organization_id, contact_id, owner_id, title, amount,
+                       currency, status, stage, created_at, updated_at)
+    SELECT g % :organizations + 1, g % :organizations + 1,
+           (g / :organizations) % :organizations + 1, 'Deal ' || g,
+           g % 5000, 'USD',
+           (ARRAY['NEW', 'IN_PROGRESS', 'WON', 'LOST'])[g % 4 + 1]
+               ::statusdeal,
+           (ARRAY['QUALIFICATION', 'PROPOSAL', 'NEGOTIATION', 'CLOSED'])
+               [g % 4 + 1]::stagedeal,
+           now() - g * interval '1 minute', now()
+    FROM generate_series(1, :deals) g
+    """,
+    """
+    INSERT INTO tasks (deal_id, organization_id, title, due_date, is_done,
+                       created_at)
+    SELECT d.id, d.organization_id, 'Task', current_date + (d.id + n) % 60,
+           (d.id + n) % 3 = 0, now()
+    FROM deals d, generate_series(1, 2) n
+    """,
+    """
+    INSERT INTO activities (deal_id, author_id, type, payload, created_at)
+    SELECT d.id, d.owner_id, 'COMMENT', '{}'::jsonb,
+           now() - n * interval '1 hour'
+    FROM deals d, generate_series(1, 2) n
+    """,
+]
+
+
+@pytest_asyncio.fixture(scope="function")
+async def seeded_db(db_engine):
+    """Заполняет таблицы объёмом, при котором важны индексы."""
+    async with db_engine.begin() as conn:
+        for statement in SEED_SQL:
+            await conn.execute(
+                text(statement),
+                {
+                    "organizations": ORGANIZATIONS,
+                    "contacts": ORGANIZATIONS * CONTACTS_PER_ORGANIZATION,
+                    "deals": ORGANIZATIONS * DEALS_PER_ORGANIZATION,
+                }
+            )
+    async with db_engine.connect() as conn:
+        conn = await conn.execution_options(isolation_level="AUTOCOMMIT")
+        await conn.exec_driver_sql("VACUUM ANALYZE")
+
+
+@pytest.fixture(scope="function")
+def captured_sql(db_engine):
+    """SQL и параметры запросов, выполненных репозиториями."""
+    captured = []
+
+    def before_cursor_execute(conn, cursor, statement, parameters, *args):
+        captured.append((statement, parameters))
+
+    event.listen(
+        db_engine.sync_engine, "before_cursor_execute", before_cursor_execute
+    )
+    yield captured
+    event.remove(
+        db_engine.sync_engine, "before_cursor_execute", before_cursor_execute
+    )
+
+
+def seq_scans(plan: dict) -> list[str]:
+    """Таблицы из LARGE_TABLES, которые план читает полным перебором."""
+    found = []
+    if (
+        plan["Node Type"] == "Seq Scan"
+        and plan["Relation Name"] in LARGE_TABLES
+    ):
+        found.append(plan["Relation Name"])
+    for child in plan.get("Plans", []):
+        found.extend(seq_scans(child))
+    return found
+
+
+def plan_nodes(plan: dict) -> list[dict]:
+    """Все узлы плана."""
+    nodes = [plan]
+    for child in plan.get("Plans", []):
+        nodes.extend(plan_nodes(child))
+    return nodes
+
+
+async def explain_all(db_session, captured) -> list[tuple[str, list[str]]]:
+    """Выполняет EXPLAIN для каждого перехваченного запроса."""
+    queries = list(captured)
+    assert queries
+    connection = await db_session.connection()
+    results = []
+    for statement, parameters in queries:
+        result = await connection.exec_driver_sql(
+            "EXPLAIN (FORMAT JSON) " + statement,
+            parameters
+        )
+        plan = result.scalar()
+        if isinstance(plan, str):
+            plan = json.loads(plan)
+        results.append((statement, seq_scans(plan[0]["Plan"])))
+    return results
+
+
+PLAN_CASES = {
+    "deals_admin": lambda session: DealsRepository(session).get_deals(
+        organization_id=1, user_id=1, page=1, page_size=20,
+        status=None, min_amount=None, max_amount=None, stage=None,
+        owner_id=None, order_by="created_at", order="desc",
+        user_role=MemberRole.ADMIN,
+    ),
+    "deals_member": lambda session: DealsRepository(session).get_deals(
+        organization_id=1, user_id=2, page=1, page_size=20,
+        status=None, min_amount=None, max_amount=None, stage=None,
+        owner_id=None, order_by="created_at", order="desc",
+        user_role=MemberRole.MEMBER,
+    ),
+    "deals_filtered": lambda session: DealsRepository(session).get_deals(
+        organization_id=1, user_id=1, page=1, page_size=20,
+        status=["won", "lost"], min_amount=100, max_amount=None,
+        stage="closed", owner_id=None, order_by="amount", order="asc",
+        user_role=MemberRole.OWNER,
+    ),
+    "deals_cursor": lambda session: DealsRepository(session).get_deals(
+        organization_id=1, user_id=1, page=1, page_size=20,
+        status=None, min_amount=None, max_amount=None, stage=None,
+        owner_id=None, order_by="created_at", order="desc",
+        user_role=MemberRole.ADMIN,
+        cursor=(datetime.now() - timedelta(days=20), 30000),
+    ),
+    "contacts": lambda session: ContactsRepository(
+        session
+    ).get_contacts_by_user(organization_id=1, user_id=1, search="contact"),
+    "contacts_cursor": lambda session: ContactsRepository(
+        session
+    ).get_contacts_by_user(
+        organization_id=1, user_id=1, order_by="created_at", order="desc",
+        cursor=(datetime.now() - timedelta(days=1), 5000),
+    ),
+    "contacts_by_phone": lambda session: ContactsRepository(
+        session
+    ).get_by_phone(organization_id=1, phone_normalized="15551", limit=20),
+    "contacts_suggest": lambda session: ContactsRepository(
+        session
+    ).suggest_contacts(organization_id=1, prefix="contact 1", limit=10),
+    "deals_count": lambda session: DealsRepository(session).count_deals(
+        organization_id=1, user_id=1, user_role=MemberRole.ADMIN,
+        status=["new"], cap=10000,
+    ),
+    "deals_summary": lambda session: DealsRepository(session).get_summary(
+        organization_id=1
+    ),
+    "deals_funnel": lambda session: DealsRepository(session).get_funnel(
+        organization_id=1
+    ),
+    "tasks": lambda session: TasksRepository(session).get_tasks(
+        organization_id=1, only_open=True
+    ),
+    "tasks_by_deal": lambda session: TasksRepository(session).get_tasks(
+        organization_id=1, deal_id=ORGANIZATIONS
+    ),
+    "tasks_cursor": lambda session: TasksRepository(session).get_tasks(
+        organization_id=1, deal_id=ORGANIZATIONS,
+        cursor=(date.today(), 1000),
+    ),
+    "activities": lambda session: ActivitiesRepository(
+        session
+    ).get_activities(organization_id=1, deal_id=ORGANIZATIONS),
+    "activities_since": lambda session: ActivitiesRepository(
+        session
+    ).get_activities(
+        organization_id=1, deal_id=ORGANIZATIONS,
+        since=(datetime.now() - timedelta(hours=1), 1000),
+    ),
+}
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("case", PLAN_CASES)
+async def test_repository_queries_use_indexes(
+    case,
+    seeded_db,
+    db_session,
+    captured_sql
+):
+    """Запросы списков и аналитики не читают большие таблицы целиком."""
+    await PLAN_CASES[case](db_session)
+    for statement, scanned in await explain_all(db_session, captured_sql):
+        assert not scanned, f"Seq Scan on {scanned}: {statement}"
+
+
+@pytest.mark.asyncio
+async def test_suggest_contacts_prefix_indexes(
+    seeded_db,
+    db_session,
+    captured_sql
+):
+    """
+    Подсказки вне кэша ищут префикс имени и email по индексам
+    организации, а не фильтром по всем её контактам.
+    """
+    await ContactsRepository(db_session).suggest_contacts(
+        organization_id=1,
+        prefix="Contact 1",
+        limit=10
+    )
+    statement, parameters = next(
+        (statement, parameters) for statement, parameters in captured_sql
+        if "UNION ALL" in statement
+    )
+    connection = await db_session.connection()
+    result = await connection.exec_driver_sql(
+        "EXPLAIN (FORMAT JSON) " + statement,
+        parameters
+    )
+    plan = result.scalar()
+    if isinstance(plan, str):
+        plan = json.loads(plan)
+    indexes = {node.get("Index Name") for node in plan_nodes(plan[0]["Plan"])}
+    assert {
+        "ix_contacts_org_lower_name",
+        "ix_contacts_org_lower_email",
+    } <= indexes
+
+
+@pytest.mark.asyncio
+async def test_search_documents_scoped_in_index(
+    seeded_db,
+    db_session,
+    captured_sql
+):
+    """
+    Полнотекстовый поиск ограничивает организацию в самом GIN-индексе,
+    а не фильтром по совпадениям всех организаций.
+    """
+    await SearchRepository(db_session).search(
+        organization_id=1,
+        tsquery="'contact':*"
+    )
+    statement, parameters = captured_sql[-1]
+    connection = await db_session.connection()
+    result = await connection.exec_driver_sql(
+        "EXPLAIN (FORMAT JSON) " + statement,
+        parameters
+    )
+    plan = result.scalar()
+    if isinstance(plan, str):
+        plan = json.loads(plan)
+    conditions = [
+        node.get("Index Cond", "") for node in plan_nodes(plan[0]["Plan"])
+        if node.get("Index Name") == "ix_search_documents_document"
+    ]
+    assert conditions
+    assert all("'#1'" in condition for condition in conditions)
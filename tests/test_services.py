@@ -1,9 +1,54 @@
 from datetime import date
 
+import asyncio
+import time
+from datetime import datetime, timedelta
+
 import pytest
 from fastapi import HTTPException
+from sqlalchemy import select
+from starlette.requests import Request
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
 
-from models.constants import Currency, StatusDeal, StageDeal, MemberRole
+from models.constants import (
+    Currency,
+    StatusDeal,
+    StageDeal,
+    DuplicateStatus,
+    MemberRole,
+    normalize_phone,
+)
+from api.v1 import dependencies
+from repositories.cache import (
+    OrgPrefixIndex,
+    PrefixIndexCache,
+    TTLCache,
+    auth_cache,
+    snapshot,
+)
+from repositories import contacts_rep as contacts_rep_module
+from repositories.config import settings
+from repositories.database import InstrumentedQueuePool
+from repositories.pagination import decode_cursor
+from repositories.activities_rep import ActivitiesRepository
+from repositories.contacts_rep import ContactsRepository
+from repositories.duplicates_rep import ContactDuplicatesRepository
+from repositories.member_rep import OrganizationMemberRepository
+from repositories.refresh_token_rep import RefreshTokenRepository
+from services.activity_service import ActivityService
+from services.auth_service import AuthService
+from services.contacts_service import ContactService
+from services.contact_dedup import (
+    ContactDeduplicator,
+    blocking_keys,
+    email_local_part,
+    make_contact,
+    score_pair,
+    soundex,
+)
+from services.password_hasher import PasswordHasher, password_hasher
+from services.token_reaper import RefreshTokenReaper
+from models import ContactDuplicateModel, RefreshTokenModel
 
 
 @pytest.mark.asyncio
@@ -67,6 +112,64 @@ async def test_authenticate_user(auth_service, test_user):
     assert user_none is None
 
 
+@pytest.mark.asyncio
+async def test_authenticate_rehashes_outdated_password(
+    auth_service,
+    test_user,
+    monkeypatch
+):
+    """Хеш со старой стоимостью пересчитывается при входе."""
+    monkeypatch.setattr(settings, "BCRYPT_ROUNDS", 5)
+    assert test_user.password_needs_rehash()
+    user = await auth_service.authenticate_user(test_user.email, "password123")
+    assert user.hashed_password.startswith("$2b$05$")
+    assert not user.password_needs_rehash()
+    assert user.check_password("password123")
+
+
+@pytest.mark.asyncio
+async def test_authenticate_releases_connection(
+    db_engine,
+    db_session,
+    test_user,
+    monkeypatch
+):
+    """Во время проверки пароля сессия не держит соединение из пула."""
+    await db_session.commit()
+    engine = create_async_engine(
+        db_engine.url,
+        poolclass=InstrumentedQueuePool,
+        pool_size=1,
+        max_overflow=0,
+    )
+    checked_out = []
+    verify_password = password_hasher.verify_password
+
+    async def verify(password, hashed_password):
+        checked_out.append(engine.pool.checkedout())
+        return await verify_password(password, hashed_password)
+
+    monkeypatch.setattr(password_hasher, "verify_password", verify)
+    async with async_sessionmaker(engine, expire_on_commit=False)() as session:
+        user = await AuthService(session).authenticate_user(
+            test_user.email,
+            "password123"
+        )
+    await engine.dispose()
+    assert user is not None
+    assert checked_out == [0]
+
+
+@pytest.mark.asyncio
+async def test_password_hasher_queue_limit():
+    """Переполненная очередь хеширования отвечает 503."""
+    hasher = PasswordHasher(max_workers=1, queue_limit=0)
+    with pytest.raises(HTTPException) as exc:
+        await hasher.hash_password("password123")
+    assert exc.value.status_code == 503
+    hasher.shutdown()
+
+
 @pytest.mark.asyncio
 async def test_create_access_token(auth_service, test_user):
     token = auth_service.create_access_token(test_user.id)
@@ -90,6 +193,420 @@ async def test_refresh_token_flow(auth_service, test_user):
     assert old_stored is None
 
 
+def test_ttl_cache_lru_and_expiry(monkeypatch):
+    """Тест на вытеснение и истечение записей кэша."""
+    now = [100.0]
+    monkeypatch.setattr("repositories.cache.time.monotonic", lambda: now[0])
+    cache = TTLCache(maxsize=2, ttl=10)
+    cache.set((1, None), "user")
+    cache.set((1, 1), "member")
+    assert cache.get((1, None)) == "user"
+    cache.set((2, None), "other")
+    assert cache.get((1, 1)) is None
+    assert cache.get((1, None)) == "user"
+    now[0] += 11
+    assert cache.get((1, None)) is None
+    assert cache.stats()["hits"] == 2
+    assert cache.stats()["misses"] == 2
+
+
+def test_prefix_index_cache_limit_and_updates():
+    """Тест на поиск по префиксу, лимит контактов и вытеснение."""
+    cache = PrefixIndexCache(max_items=3, ttl=60)
+    assert cache.set(1, OrgPrefixIndex([
+        (1, 10, "John Smith", "john@example.com"),
+        (2, 11, "Anna Smithson", "anna@example.com"),
+    ]))
+    assert cache.set(2, OrgPrefixIndex([(3, 10, "Bob", "bob@example.com")]))
+    index = cache.get(1)
+    assert [item[0] for item in index.search("smi", 10)] == [1, 2]
+    assert [item[0] for item in index.search("smi", 10, owner_id=11)] == [2]
+    cache.add(1, 4, 10, "Smita Patel", "smita@example.com")
+    assert cache.get(2) is None
+    assert cache.stats()["size"] == 3
+    assert [item[0] for item in cache.get(1).search("smi", 2)] == [4, 1]
+    assert not cache.set(3, OrgPrefixIndex(
+        (i, 1, f"Name {i}", f"{i}@example.com") for i in range(4)
+    ))
+    assert cache.is_oversized(3)
+    assert not cache.is_oversized(1)
+
+
+@pytest.mark.parametrize(
+    "phone,expected",
+    [
+        ("+1 (555) 010-2000", "15550102000"),
+        ("15550102000", "15550102000"),
+        ("001 555 010 2000", "15550102000"),
+        ("+1 555 010 2000 ext. 12", "15550102000"),
+        ("+7 916 123-45-67 доб. 3", "79161234567"),
+        ("call me", None),
+        ("+1234567890123456", None),
+        (None, None),
+    ]
+)
+def test_normalize_phone(phone, expected):
+    """Тест на приведение номеров к цифрам E.164."""
+    assert normalize_phone(phone) == expected
+
+
+def test_contact_dedup_blocking_and_scoring():
+    """Тест на ключи блоков и оценку пар при поиске дубликатов."""
+    assert soundex("Robert") == soundex("Rupert") == "R163"
+    assert soundex("Tymczak") == "T522"
+    assert soundex("Pfister") == "P236"
+    assert email_local_part("John.Doe+crm@Example.com") == "johndoe"
+    john = make_contact("John Smith", "john.smith@example.com", "15550102000")
+    jon = make_contact("Jon  Smith", "Jon.Smith@example.org", None)
+    assert blocking_keys(john) & blocking_keys(jon) == {"n:J500 S530"}
+    assert "n:J500 S530" in blocking_keys(
+        make_contact("Smith, John", "js@example.com", None)
+    )
+    same_email, _ = score_pair(john, john[:3] + (None,))
+    assert same_email == 0.8
+    typo, reasons = score_pair(john, jon)
+    assert 0.7 < typo < same_email
+    assert reasons == ["name", "email"]
+    mary = make_contact("Mary Major", "mary@example.com", "15550102000")
+    stranger, reasons = score_pair(john, mary)
+    assert stranger < 0.7
+    assert reasons == ["phone"]
+    assert score_pair(john, mary, min_score=0.7) is None
+
+
+@pytest.mark.asyncio
+async def test_refresh_token_concurrent_rotation(
+    db_engine,
+    db_session,
+    test_user
+):
+    """Один и тот же токен, предъявленный дважды, обменивается один раз."""
+    await db_session.commit()
+    factory = async_sessionmaker(db_engine, expire_on_commit=False)
+    async with factory() as session:
+        token = await AuthService(session).create_refresh_token(test_user.id)
+        await session.commit()
+
+    async def rotate(session):
+        async with session.begin():
+            return await AuthService(session).refresh_access_token(token)
+
+    async with factory() as first, factory() as second:
+        results = await asyncio.gather(
+            rotate(first), rotate(second), return_exceptions=True,
+        )
+    assert sum(isinstance(r, ValueError) for r in results) == 1
+    async with factory() as session:
+        assert await RefreshTokenRepository(session).get_valid(token) is None
+
+
+@pytest.mark.asyncio
+async def test_activities_feed_late_commit(
+    db_engine,
+    db_session,
+    test_user,
+    ogranization_test_user,
+    deal_by_test_user
+):
+    """
+    Активность транзакции, начатой раньше, но закоммиченной позже уже
+    отданных записей, приходит при следующем опросе ленты.
+    """
+    await db_session.commit()
+    factory = async_sessionmaker(db_engine, expire_on_commit=False)
+
+    async def poll(since=None):
+        async with factory() as session:
+            return await ActivityService(
+                ActivitiesRepository(session)
+            ).get_activities_feed(
+                deal_id=deal_by_test_user.id,
+                organization_id=ogranization_test_user.id,
+                since=since,
+            )
+
+    async def comment(session, text):
+        await ActivityService(
+            ActivitiesRepository(session)
+        ).create_activity_comment(
+            deal_id=deal_by_test_user.id,
+            payload={"text": text},
+            author_id=test_user.id
+        )
+
+    async with factory() as slow:
+        await comment(slow, "slow")
+        async with factory() as fast:
+            await comment(fast, "fast")
+            await fast.commit()
+        activities, since = await poll()
+        assert [act.payload["text"] for act in activities] == ["fast"]
+        await slow.commit()
+    activities, since = await poll(since)
+    assert [act.payload["text"] for act in activities] == ["slow"]
+    activities, next_since = await poll(since)
+    assert activities == []
+    assert next_since == since
+
+@pytest.mark.asyncio
+async def test_activities_feed_seen_limit(
+    activity_service,
+    test_user,
+    ogranization_test_user,
+    deal_by_test_user,
+    monkeypatch
+):
+    """
+    Когда отданных в окне перекрытия записей больше
+    ACTIVITY_FEED_SEEN_LIMIT, курсор переходит на строгую границу
+    (created_at, id) и не растёт, а записи не повторяются.
+    """
+    monkeypatch.setattr(settings, "ACTIVITY_FEED_SEEN_LIMIT", 2)
+    for i in range(5):
+        await activity_service.create_activity_comment(
+            deal_id=deal_by_test_user.id,
+            payload={"text": str(i)},
+            author_id=test_user.id
+        )
+    texts, since = [], None
+    while True:
+        activities, next_since = await activity_service.get_activities_feed(
+            deal_id=deal_by_test_user.id,
+            organization_id=ogranization_test_user.id,
+            limit=2,
+            since=since,
+        )
+        if not activities:
+            break
+        texts.extend(act.payload["text"] for act in activities)
+        since = next_since
+        assert len(decode_cursor(since)["seen"]) <= 2
+    assert texts == ["0", "1", "2", "3", "4"]
+    assert "floor" in decode_cursor(since)
+    assert next_since == since
+
+
+@pytest.mark.asyncio
+async def test_lookup_phone_invalidated_after_commit(
+    db_engine,
+    db_session,
+    test_user,
+    ogranization_test_user,
+    contact_by_test_user,
+    get_member_test_user
+):
+    """
+    Результат, закэшированный между flush и коммитом нового контакта,
+    сбрасывается после коммита.
+    """
+    await db_session.commit()
+    factory = async_sessionmaker(db_engine, expire_on_commit=False)
+
+    async def lookup():
+        async with factory() as session:
+            contacts = await ContactService(
+                ContactsRepository(session)
+            ).lookup_phone(
+                user_id=test_user.id,
+                organization_id=ogranization_test_user.id,
+                member=get_member_test_user,
+                phone=contact_by_test_user.phone,
+            )
+        return [contact.id for contact in contacts]
+
+    async with factory() as writer:
+        created = await ContactService(
+            ContactsRepository(writer)
+        ).create_contact(
+            name="Same Phone",
+            email="same.phone@example.com",
+            phone=contact_by_test_user.phone,
+            current_user_id=test_user.id,
+            organization_id=ogranization_test_user.id,
+        )
+        assert await lookup() == [contact_by_test_user.id]
+        await writer.commit()
+    assert await lookup() == [contact_by_test_user.id, created.id]
+
+@pytest.mark.asyncio
+async def test_auth_cache_invalidated_after_commit(
+    db_engine,
+    db_session,
+    test_user,
+    ogranization_test_user,
+    get_member_test_user
+):
+    """
+    Членство, закэшированное между flush и коммитом смены роли,
+    сбрасывается после коммита.
+    """
+    await db_session.commit()
+    factory = async_sessionmaker(db_engine, expire_on_commit=False)
+    key = (test_user.id, ogranization_test_user.id)
+    async with factory() as writer:
+        member = await OrganizationMemberRepository(writer).get_member(
+            test_user.id,
+            ogranization_test_user.id
+        )
+        member.role = MemberRole.MANAGER
+        await writer.flush()
+        assert auth_cache.get(key) is None
+        async with factory() as reader:
+            stale = await OrganizationMemberRepository(reader).get_member(
+                test_user.id,
+                ogranization_test_user.id
+            )
+        assert stale.role == get_member_test_user.role
+        auth_cache.set(key, snapshot(stale))
+        await writer.commit()
+    assert auth_cache.get(key) is None
+
+
+@pytest.mark.asyncio
+async def test_contact_dedup_concurrent_review(
+    db_session,
+    test_user,
+    ogranization_test_user,
+    contact_by_test_user,
+    contacts_service
+):
+    """
+    Пара, проверенная вручную после чтения проверенных пар, не
+    обрывает пересчёт и не перезаписывается.
+    """
+    upper = await contacts_service.create_contact(
+        organization_id=ogranization_test_user.id,
+        current_user_id=test_user.id,
+        name="JOHN DOE",
+        email="John.Doe@Example.com",
+        phone="+1 234 567 89"
+    )
+    dup_repo = ContactDuplicatesRepository(db_session)
+    get_reviewed_pairs = dup_repo.get_reviewed_pairs
+
+    async def review_concurrently(organization_id):
+        reviewed = await get_reviewed_pairs(organization_id)
+        db_session.add(ContactDuplicateModel(
+            organization_id=organization_id,
+            contact_id=contact_by_test_user.id,
+            duplicate_id=upper.id,
+            score=1.0,
+            reasons=["name"],
+            status=DuplicateStatus.DISMISSED,
+            created_at=datetime.now()
+        ))
+        await db_session.flush()
+        return reviewed
+
+    dup_repo.get_reviewed_pairs = review_concurrently
+    report = await ContactDeduplicator(dup_repo).run(
+        ogranization_test_user.id
+    )
+    assert report["duplicates"] == 0
+    result = await db_session.execute(
+        select(ContactDuplicateModel.status).where(
+            ContactDuplicateModel.organization_id
+            == ogranization_test_user.id
+        )
+    )
+    assert result.scalars().all() == [DuplicateStatus.DISMISSED]
+
+
+@pytest.mark.asyncio
+async def test_refresh_token_reaper(db_engine, db_session, test_user):
+    """Очистка удаляет отозванные и истёкшие токены пачками."""
+    now = datetime.utcnow()
+    db_session.add_all([
+        RefreshTokenModel(
+            user_id=test_user.id,
+            token_hash=f"{i:064d}",
+            expires_at=now + timedelta(days=1 if i % 3 else -1),
+            revoked=i % 3 == 1,
+        )
+        for i in range(6)
+    ])
+    await db_session.commit()
+    factory = async_sessionmaker(db_engine, expire_on_commit=False)
+    reaper = RefreshTokenReaper(factory, batch_size=2)
+    assert await reaper.run_once() == 4
+    assert reaper.stats()["rows_removed"] == 4
+    assert await reaper.run_once() == 0
+    async with factory() as session:
+        rows = (await session.execute(
+            select(RefreshTokenModel)
+        )).scalars().all()
+    assert len(rows) == 3
+    assert all(not row.revoked and row.expires_at > now for row in rows)
+
+
+@pytest.mark.asyncio
+async def test_instrumented_pool_counts_waits(db_engine):
+    """Пул учитывает ожидания соединения при исчерпании."""
+    engine = create_async_engine(
+        db_engine.url,
+        poolclass=InstrumentedQueuePool,
+        pool_size=1,
+        max_overflow=0,
+    )
+    factory = async_sessionmaker(engine)
+
+    async def query():
+        async with factory() as session:
+            await session.execute(select(1))
+
+    await asyncio.gather(*(query() for _ in range(3)))
+    snapshot = engine.pool.snapshot()
+    await engine.dispose()
+    assert snapshot["checkouts"] == 3
+    assert snapshot["waits"] == 2
+    assert snapshot["checked_out"] == 0
+
+
+@pytest.mark.asyncio
+async def test_db_session_replica_routing(monkeypatch):
+    """Чтение идёт в реплику, а по cookie после записи — в primary."""
+    class FakeSession:
+        def __init__(self, name):
+            self.name = name
+
+        async def __aenter__(self):
+            return self
+
+        async def __aexit__(self, *args):
+            return False
+
+    monkeypatch.setattr(
+        dependencies, "session_factory", lambda: FakeSession("primary")
+    )
+    monkeypatch.setattr(
+        dependencies,
+        "replica_session_factory",
+        lambda: FakeSession("replica")
+    )
+    async def session_for(method, primary_until=None):
+        headers = []
+        if primary_until is not None:
+            headers.append((
+                b"cookie",
+                f"{dependencies.PRIMARY_UNTIL_COOKIE}={primary_until}".encode()
+            ))
+        request = Request({
+            "type": "http",
+            "method": method,
+            "headers": headers,
+        })
+        async for session in dependencies.get_db_session(request):
+            return session.name
+
+    now = time.time()
+    assert await session_for("GET") == "replica"
+    assert await session_for("POST") == "primary"
+    assert await session_for("GET", now + 1) == "primary"
+    assert await session_for("GET", now - 1) == "replica"
+    assert await session_for("GET", now + 3600) == "replica"
+    assert await session_for("GET", "garbage") == "replica"
+
+
 @pytest.mark.asyncio
 async def test_get_contacts(
     ogranization_test_user,
@@ -107,6 +624,75 @@ async def test_get_contacts(
     assert len(contacts) == 1
 
 
+@pytest.mark.asyncio
+async def test_search_contacts(
+    ogranization_test_user,
+    contacts_service,
+    contacts_rep,
+    get_member_test_user,
+    test_user
+):
+    """Поиск по имени, email и телефону; короткий запрос отклоняется."""
+    for name, email, phone in [
+        ("Jonathan Smith", "jsmith@example.com", "+100200300"),
+        ("Mary Jones", "mary@jones.example.com", "+555123456"),
+        ("Peter Parker", "peter@example.com", "+700800900"),
+        ("Anna Smithson", "anna@smithson.example.com", "+700800901"),
+    ]:
+        await contacts_service.create_contact(
+            organization_id=ogranization_test_user.id,
+            current_user_id=test_user.id,
+            name=name,
+            email=email,
+            phone=phone
+        )
+
+    async def search(term, **kwargs):
+        contacts = await contacts_service.get_user_contacts_page(
+            organization_id=ogranization_test_user.id,
+            user_id=test_user.id,
+            member=get_member_test_user,
+            search=term,
+            **kwargs
+        )
+        return [contact.name for contact in contacts[0]]
+
+    assert await search("jones") == ["Mary Jones"]
+    assert await search("5551") == ["Mary Jones"]
+    assert await search("smith") == ["Anna Smithson", "Jonathan Smith"]
+    assert len(await search("smith", order_by="relevance")) == 2
+    with pytest.raises(HTTPException) as exc:
+        await search("j")
+    assert exc.value.status_code == 400
+    if not await contacts_rep.trigram_enabled():
+        pytest.skip("pg_trgm is not available on this server")
+    assert await search("jonathn") == ["Jonathan Smith"]
+    assert await search("smith", order_by="relevance") == [
+        "Jonathan Smith", "Anna Smithson"
+    ]
+
+
+@pytest.mark.asyncio
+async def test_trigram_enabled_rechecked(contacts_rep, monkeypatch):
+    """Наличие pg_trgm перепроверяется после интервала проверки."""
+    installed = await contacts_rep.trigram_enabled()
+    monkeypatch.setattr(
+        contacts_rep_module,
+        "_trigram_state",
+        (time.monotonic(), not installed)
+    )
+    assert await contacts_rep.trigram_enabled() is (not installed)
+    monkeypatch.setattr(
+        contacts_rep_module,
+        "_trigram_state",
+        (
+            time.monotonic()
+            - contacts_rep_module.TRIGRAM_CHECK_INTERVAL_SECONDS,
+            not installed
+        )
+    )
+    assert await contacts_rep.trigram_enabled() is installed
+
 @pytest.mark.asyncio
 async def test_create_contacts(
     ogranization_test_user,
@@ -343,6 +929,37 @@ async def test_get_task(
     assert len(tasks) == 1
 
 
+@pytest.mark.asyncio
+async def test_tasks_keyset_nulls_last(
+    tasks_rep,
+    ogranization_test_user,
+    deal_by_test_user
+):
+    """Задачи без срока идут в конце и не теряются между страницами."""
+    for due_date in [None, date(2030, 1, 2), None, date(2030, 1, 1)]:
+        await tasks_rep.create({
+            "deal_id": deal_by_test_user.id,
+            "organization_id": ogranization_test_user.id,
+            "title": "Task",
+            "due_date": due_date,
+        })
+    seen, cursor = [], None
+    while True:
+        tasks = await tasks_rep.get_tasks(
+            organization_id=ogranization_test_user.id,
+            limit=1,
+            cursor=cursor
+        )
+        if not tasks:
+            break
+        seen.extend(tasks)
+        cursor = tasks_rep.parse_cursor(tasks_rep.make_cursor(tasks[-1]))
+    assert [task.due_date for task in seen] == [
+        date(2030, 1, 1), date(2030, 1, 2), None, None
+    ]
+    assert seen[2].id < seen[3].id
+
+
 @pytest.mark.asyncio
 async def test_creat_task(
     test_user,